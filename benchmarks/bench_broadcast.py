@@ -0,0 +1,57 @@
+"""Fan-out latency of broadcast input to many terminals.
+
+Needs the built ``libkonsole_embed.so`` and a display (or
+``QT_QPA_PLATFORM=offscreen``). Run from the repository root::
+
+    python -m benchmarks.bench_broadcast [COUNT ...]
+
+For each ``COUNT`` (10, 40 and 100 by default) that many terminals run
+``cat``. A short line is sent to all of them with one ``send_input`` call
+per terminal and with a single batched ``send_input_many`` call, and the
+median time of each is reported.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+
+from PyQt5.QtWidgets import QApplication
+
+from sshmanager.util import konsole_embed
+
+ROUNDS = 50
+
+
+def median_ms(func) -> float:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv: list[str]) -> None:
+    counts = [int(a) for a in argv] or [10, 40, 100]
+    app = QApplication([])
+    widgets = []
+    print(f"{'terminals':>9} {'per widget ms':>13} {'batched ms':>10}")
+    for count in counts:
+        while len(widgets) < count:
+            widget = konsole_embed.create_part()
+            if widget is None:
+                sys.exit(konsole_embed.get_last_error() or "Konsole part not available")
+            konsole_embed.start_program(widget, "cat")
+            widgets.append(widget)
+        app.processEvents()
+        targets = widgets[:count]
+        single = median_ms(lambda: [konsole_embed.send_input(w, "echo hi") for w in targets])
+        batched = median_ms(lambda: konsole_embed.send_input_many(targets, "echo hi"))
+        app.processEvents()
+        print(f"{count:9d} {single:13.3f} {batched:10.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+"""Time to probe thousands of hosts for reachability.
+
+Needs no network: a local listener that sends an SSH banner answers on all
+of ``127.0.0.0/8``, so every target is a distinct loopback address. Run from
+the repository root::
+
+    python -m benchmarks.bench_probe [COUNT] [CONCURRENCY]
+
+Half of the ``COUNT`` targets (5000 by default) point at the listener and
+half at a closed port.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+from sshmanager import probe
+
+
+def start_listener() -> tuple[int, asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    port = 0
+
+    async def handle(reader, writer) -> None:
+        writer.write(b"SSH-2.0-bench\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def serve() -> None:
+        nonlocal port
+        server = await asyncio.start_server(handle, "0.0.0.0", 0, backlog=4096)
+        port = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=lambda: loop.run_until_complete(serve()), daemon=True).start()
+    ready.wait()
+    return port, loop
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main(argv: list[str]) -> None:
+    count = int(argv[0]) if argv else 5000
+    concurrency = int(argv[1]) if len(argv) > 1 else 256
+    open_port, _ = start_listener()
+    shut_port = closed_port()
+    targets = [
+        (f"127.{1 + i // 65536}.{i // 256 % 256}.{i % 256 or 1}", open_port if i % 2 else shut_port)
+        for i in range(count)
+    ]
+    start = time.perf_counter()
+    results = asyncio.run(probe.probe_all(targets, concurrency, timeout=2.0))
+    elapsed = time.perf_counter() - start
+    up = [r for r in results.values() if r.ok]
+    banners = sum(1 for r in up if r.banner)
+    rtts = sorted(r.rtt for r in up)
+    print(f"{len(results)} targets, concurrency {concurrency}: {elapsed:.2f} s")
+    print(f"reachable {len(up)}, with banner {banners}, down {len(results) - len(up)}")
+    if rtts:
+        print(f"connect ms: median {rtts[len(rtts) // 2]:.2f}, max {rtts[-1]:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
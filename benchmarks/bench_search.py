@@ -0,0 +1,98 @@
+"""Measure quick-open index build time and query latency.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_search [SIZE ...]
+
+A synthetic vault (50k connections by default) is indexed and a set of
+typical queries is run repeatedly. The queries are taken from labels in the
+vault and each must find something, so the ranking is measured rather than
+the path for queries without matches. The slowest run of each query must
+stay below one frame (16 ms) for the palette to keep up with typing. A
+connection labelled ``prod`` is added and must be the first result for
+``prod``, however many other labels contain it.
+"""
+
+from __future__ import annotations
+
+import re
+import statistics
+import sys
+import time
+
+from sshmanager.models import Connection
+from sshmanager.search import Frecency, SearchIndex
+
+FRAME_MS = 16.0
+
+
+def synthetic(size: int) -> list[Connection]:
+    roles = ["web", "db", "cache", "queue", "api", "batch", "proxy", "search"]
+    envs = ["prod", "staging", "dev", "qa"]
+    return [
+        Connection(
+            label=f"{roles[i % 8]}-{i:04d}.{envs[i % 4]}",
+            host=f"{roles[i % 8]}{i}.{envs[i % 4]}.example.internal",
+            username=["deploy", "root", "admin"][i % 3],
+            folder=f"Team {i % 40}",
+            item_id=f"id-{i}",
+        )
+        for i in range(size)
+    ]
+
+
+def queries(conns: list[Connection]) -> list[str]:
+    """Return typical queries that all match ``conns``."""
+    label = conns[len(conns) // 2].label
+    role, rest = label.split("-", 1)
+    number, env = rest.split(".")
+    return [
+        "w",
+        "db",
+        "web",
+        f"{role} {env}",
+        # Exact label and one of its prefixes
+        label,
+        f"{role}-{number[:-1]}",
+        "deploy@",
+        "team 7",
+        # Subsequence of the label, for the fuzzy fallback
+        re.sub(r"[aeiou.-]", "", label),
+    ]
+
+
+def main(argv: list[str]) -> None:
+    for size in [int(arg) for arg in argv] or [50_000]:
+        conns = synthetic(size)
+        exact = Connection(
+            label="prod", host="prod.example.internal", username="deploy", item_id="id-prod"
+        )
+        start = time.perf_counter()
+        index = SearchIndex([*conns, exact])
+        print(f"{size} connections, index built in {time.perf_counter() - start:.2f}s")
+        frecency = Frecency(None)
+        for conn in conns[::997]:
+            frecency.record(conn)
+        print(f"{'query':>16} {'results':>8} {'median ms':>10} {'max ms':>8}")
+        first = index.search("prod")
+        if not first or first[0] is not exact:
+            raise SystemExit(f"'prod' ranked {[c.label for c in first[:3]]} above the exact label")
+        for query in queries(conns):
+            # One untimed run so a garbage collection left over from
+            # building the index is not attributed to the query
+            if not index.search(query, frecency):
+                raise SystemExit(f"{query!r} found nothing")
+            times = []
+            for _ in range(20):
+                start = time.perf_counter()
+                results = index.search(query, frecency)
+                times.append((time.perf_counter() - start) * 1000)
+            flag = "" if max(times) < FRAME_MS else "  > frame"
+            print(
+                f"{query!r:>16} {len(results):>8} {statistics.median(times):>10.2f} "
+                f"{max(times):>8.2f}{flag}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
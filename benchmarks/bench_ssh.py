@@ -0,0 +1,59 @@
+"""Connect latency of ssh with and without a shared ControlMaster.
+
+Needs an ``sshd`` that accepts key authentication without a prompt, for
+example on localhost. Run from the repository root::
+
+    python -m benchmarks.bench_ssh [COUNT] [HOST] [USER] [PORT]
+
+``COUNT`` commands (10 by default) run ``true`` on the host, first each with
+its own connection and then through one master from
+:class:`sshmanager.ssh.ControlPool`. The first pooled command starts the
+master and is reported separately.
+"""
+
+from __future__ import annotations
+
+import getpass
+import statistics
+import subprocess
+import sys
+import time
+
+from sshmanager.models import Connection
+from sshmanager.ssh import ControlPool, build_ssh_args
+
+
+def run(conn: Connection, pool: ControlPool | None) -> float:
+    args = build_ssh_args(conn, pool)
+    args[1:1] = ["-o", "BatchMode=yes", "-o", "StrictHostKeyChecking=accept-new"]
+    start = time.perf_counter()
+    subprocess.run(args + ["true"], stdin=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def report(name: str, times: list[float]) -> None:
+    print(f"{name:>10} {statistics.median(times):9.1f} {min(times):9.1f} {max(times):9.1f}")
+
+
+def main(argv: list[str]) -> None:
+    count = int(argv[0]) if argv else 10
+    host = argv[1] if len(argv) > 1 else "localhost"
+    user = argv[2] if len(argv) > 2 else getpass.getuser()
+    port = int(argv[3]) if len(argv) > 3 else 22
+    conn = Connection("bench", host, user, port)
+    print(f"{count} connections to {user}@{host}:{port}")
+    print(f"{'':>10} {'median ms':>9} {'min ms':>9} {'max ms':>9}")
+    report("direct", [run(conn, None) for _ in range(count)])
+
+    pool = ControlPool()
+    try:
+        first = run(conn, pool)
+        report("master", [first])
+        report("pooled", [run(conn, pool) for _ in range(count)])
+        print(f"master alive: {pool.check(conn)}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,136 @@
+"""Compare ``ConnectionStore`` with the previous list of plain dataclasses.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_store [SIZE ...]
+
+For each size (100k connections by default) the memory held per connection,
+including its strings and the store's indexes, is measured with
+``tracemalloc``. It is compared with timings for grouping by
+folder, looking up an item id, updating and deleting entries, and a
+``to_dict``/``from_dict`` round trip.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass
+
+from sshmanager.models import Config, Connection, ConnectionStore
+
+
+@dataclass
+class LegacyConnection:
+    """The connection record as it was before ``__slots__``."""
+
+    label: str
+    host: str
+    username: str
+    port: int = 22
+    folder: str = "Default"
+    key_path: str | None = None
+    initial_cmd: str | None = None
+    item_id: str | None = None
+
+
+def rows(size: int) -> list[tuple]:
+    # Built from fresh strings, the way JSON decoding returns them
+    return [
+        (
+            f"server-{i:06d}",
+            f"host-{i:06d}.example.internal",
+            "".join(["de", "ploy"]),
+            2200 + i % 100,
+            f"Group {i % 50}",
+            None,
+            None,
+            str(uuid.UUID(int=i)),
+        )
+        for i in range(size)
+    ]
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure_memory(build) -> tuple[object, int]:
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def legacy_group(conns: list[LegacyConnection]) -> dict:
+    folders: dict[str, list] = {}
+    for conn in conns:
+        folders.setdefault(conn.folder, []).append(conn)
+    return folders
+
+
+def bench(size: int) -> None:
+    data = rows(size)
+    # Rows are created inside the measurement so the strings they keep
+    # alive are counted as well
+    legacy, legacy_mem = measure_memory(
+        lambda: [LegacyConnection(*r) for r in rows(size)]
+    )
+    store, store_mem = measure_memory(
+        lambda: ConnectionStore(Connection(*r) for r in rows(size))
+    )
+    probe = data[size // 2][7]
+    results = [
+        ("bytes/conn", legacy_mem / size, store_mem / size),
+        ("group s", timed(lambda: legacy_group(legacy)), timed(store.grouped)),
+        ("folder s", timed(lambda: [c for c in legacy if c.folder == "Group 7"]),
+         timed(lambda: store.by_folder("Group 7"))),
+        ("lookup s", timed(lambda: next(c for c in legacy if c.item_id == probe)),
+         timed(lambda: store.get(probe))),
+    ]
+
+    def legacy_upsert() -> None:
+        for i, conn in enumerate(legacy):
+            if conn.item_id == probe:
+                legacy[i] = LegacyConnection(*data[size // 2])
+                break
+
+    results.append(
+        ("upsert s", timed(legacy_upsert),
+         timed(lambda: store.upsert(Connection(*data[size // 2]))))
+    )
+    results.append(
+        ("delete s",
+         timed(lambda: legacy.remove(next(c for c in legacy if c.item_id == probe))),
+         timed(lambda: store.remove(probe)))
+    )
+    legacy_dict: list = []
+    store_dict: dict = {}
+    results.append(
+        ("to_dict s",
+         timed(lambda: legacy_dict.extend(asdict(c) for c in legacy)),
+         timed(lambda: store_dict.update(Config(store).to_dict())))
+    )
+    results.append(
+        ("from_dict s",
+         timed(lambda: [LegacyConnection(**c) for c in legacy_dict]),
+         timed(lambda: Config.from_dict(store_dict)))
+    )
+    print(f"{size} connections")
+    print(f"{'':>12} {'list':>12} {'store':>12}")
+    for name, old, new in results:
+        print(f"{name:>12} {old:>12.6g} {new:>12.6g}")
+
+
+def main(argv: list[str]) -> None:
+    for size in [int(arg) for arg in argv] or [100_000]:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
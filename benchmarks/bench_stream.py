@@ -0,0 +1,95 @@
+"""Compare peak memory of buffered and streamed ``bw list items`` parsing.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_stream [SIZE ...]
+
+A synthetic ``bw list items`` output is written to a temporary file for each
+vault size (1k, 10k and 100k items by default). Peak Python heap usage is
+measured with ``tracemalloc`` for the old path (read everything, decode,
+``json.loads``) and for the streaming parser used by ``list_connections``.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sshmanager.bitwarden import _iter_json_array
+from sshmanager.items import ConnectionCache
+
+
+def synthetic_item(index: int, folder_id: str) -> dict:
+    """Return an item shaped like the output of ``bw list items``."""
+    notes = json.dumps({"port": 2200 + index % 100, "folder": f"Group {index % 50}"})
+    return {
+        "passwordHistory": None,
+        "revisionDate": "2024-05-01T12:00:00.000Z",
+        "creationDate": "2023-01-01T12:00:00.000Z",
+        "deletedDate": None,
+        "object": "item",
+        "id": str(uuid.UUID(int=index)),
+        "organizationId": None,
+        "folderId": folder_id,
+        "type": 1,
+        "reprompt": 0,
+        "name": f"server-{index:06d}",
+        "notes": notes,
+        "favorite": False,
+        "login": {
+            "fido2Credentials": [],
+            "uris": [{"match": None, "uri": f"host-{index:06d}.example.internal"}],
+            "username": "deploy",
+            "password": "x" * 24,
+            "totp": None,
+            "passwordRevisionDate": None,
+        },
+        "collectionIds": [],
+    }
+
+
+def write_vault(path: str, size: int) -> None:
+    folder_id = str(uuid.UUID(int=0))
+    with open(path, "w") as fh:
+        json.dump([synthetic_item(i, folder_id) for i in range(size)], fh)
+
+
+def buffered(path: str) -> int:
+    with open(path, "rb") as fh:
+        output = fh.read().decode().strip()
+    return len(ConnectionCache().connections(json.loads(output)))
+
+
+def streamed(path: str) -> int:
+    with open(path, "rb") as fh:
+        return len(ConnectionCache().connections(_iter_json_array(fh)))
+
+
+def measure(func, path: str) -> tuple[int, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(arg) for arg in argv] or [1_000, 10_000, 100_000]
+    print(f"{'items':>8} {'mode':>9} {'time s':>8} {'peak MiB':>9}")
+    for size in sizes:
+        with tempfile.NamedTemporaryFile(suffix=".json") as tmp:
+            write_vault(tmp.name, size)
+            for name, func in (("buffered", buffered), ("streamed", streamed)):
+                count, elapsed, peak = measure(func, tmp.name)
+                assert count == size
+                print(f"{size:>8} {name:>9} {elapsed:>8.3f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
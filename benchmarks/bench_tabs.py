@@ -0,0 +1,90 @@
+"""Memory held by open terminal tabs: lazy, running and hibernated.
+
+Needs the built ``libkonsole_embed.so`` and a display (or
+``QT_QPA_PLATFORM=offscreen``). Run from the repository root::
+
+    python -m benchmarks.bench_tabs [COUNT] [HOST]
+
+``COUNT`` tabs (100 by default) connect to ``HOST`` (``localhost``). They are
+measured after three steps:
+
+- restored lazily, so only the current tab runs a terminal
+- shown once each, so every tab has a terminal
+- hibernated, except for the current tab
+
+Every step reports the resident memory of this process and of its
+descendants (shells and ssh clients), and the number of descendants.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QTabWidget
+
+from sshmanager import procstat
+from sshmanager.models import Connection
+from sshmanager.ui.terminal_tab import TerminalTab
+
+
+def process_tree() -> tuple[int, int, int]:
+    """Return own RSS, descendants' RSS (KiB) and the number of descendants."""
+    own = os.getpid()
+    others = procstat.descendants(own)
+    return procstat.rss_kib(own), sum(procstat.rss_kib(p) for p in others), len(others)
+
+
+def settle(app: QApplication, seconds: float = 1.0) -> None:
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        app.processEvents()
+        # Outside of exec() deleteLater() only happens when asked for
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        time.sleep(0.01)
+
+
+def report(name: str) -> None:
+    own, children, count = process_tree()
+    print(f"{name:>12} {own / 1024:10.1f} {children / 1024:12.1f} {count:9d}")
+
+
+def main(argv: list[str]) -> None:
+    count = int(argv[0]) if argv else 100
+    host = argv[1] if len(argv) > 1 else "localhost"
+    app = QApplication([])
+    tabs = QTabWidget()
+    tabs.resize(800, 600)
+    tabs.show()
+    settle(app)
+    print(f"{count} tabs to {host}")
+    print(f"{'':>12} {'own MiB':>10} {'children MiB':>12} {'processes':>9}")
+    report("empty")
+
+    items = []
+    for i in range(count):
+        tab = TerminalTab(Connection(f"tab-{i}", host, os.environ.get("USER", "root")), start=False)
+        tabs.addTab(tab, f"tab-{i}")
+        items.append(tab)
+    items[0].start()
+    settle(app)
+    report("lazy")
+
+    for i, tab in enumerate(items):
+        tabs.setCurrentIndex(i)
+        tab.start()
+        app.processEvents()
+    settle(app, 3.0)
+    report("running")
+
+    tabs.setCurrentIndex(0)
+    for tab in items[1:]:
+        tab.hibernate()
+    settle(app, 3.0)
+    report("hibernated")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,265 @@
+"""Headless timings of the main window, sidebar and terminal tabs.
+
+Needs neither a display nor the Konsole library: Qt runs with the
+``offscreen`` platform and :mod:`benchmarks.stub_konsole` replaces
+``sshmanager.util.konsole_embed``, so tabs get plain widgets and the ssh
+commands they would run are only recorded. Run from the repository root::
+
+    python -m benchmarks.bench_ui [--sizes 1000,10000,50000] [--tabs 200]
+        [--cycles 500] [--typed] [--output results.json]
+
+It reports:
+
+- window construction until the first paint
+- sidebar population when a vault with ``--sizes`` connections loads, until
+  the sidebar is painted and until the quick-open index is built
+- tabs opened and closed per second with ``--tabs`` tabs
+- memory, Python objects and widgets left over after ``--cycles`` tabs were
+  opened and closed one at a time
+
+``--typed`` simulates a library without ``createKonsolePart``, where ssh is
+typed into a shell. Probing, DNS prefetch and session restore are turned
+off and ``HOME`` points at a temporary directory, so nothing outside of it
+is touched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+WINDOWS = 5
+
+
+def settle(app, until=None, timeout: float = 30.0) -> None:
+    """Process events until ``until()`` is true, or the queue is drained."""
+    from PyQt5.QtCore import QEvent
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        # Outside of exec() deleteLater() only happens when asked for
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        if until is None or until():
+            return
+        time.sleep(0.001)
+    raise RuntimeError("timed out waiting for the UI")
+
+
+def new_window(app):
+    from sshmanager.ui.main_window import MainWindow
+
+    win = MainWindow()
+    win.resize(1200, 800)
+    win.show()
+    settle(app, lambda: win._painted)
+    return win
+
+
+def close_window(app, win) -> None:
+    settle(app, lambda: win._index_worker is None)
+    win.close()
+    win.deleteLater()
+    settle(app)
+
+
+def bench_window(app) -> dict:
+    times = []
+    for _ in range(WINDOWS):
+        start = time.perf_counter()
+        win = new_window(app)
+        times.append((time.perf_counter() - start) * 1000)
+        close_window(app, win)
+    print(f"window to first paint: median {statistics.median(times):.1f} ms, max {max(times):.1f} ms")
+    return {"median_ms": statistics.median(times), "max_ms": max(times)}
+
+
+def bench_sidebar(app, size: int) -> dict:
+    from benchmarks.bench_search import synthetic
+    from sshmanager import procstat
+    from sshmanager.models import Config
+    from sshmanager.ui.main_window import Account
+
+    conns = synthetic(size)
+    win = new_window(app)
+    settle(app, lambda: win._index_worker is None)
+    account = Account("bench@example.com", None, win)
+    account.vault_loaded = True
+    win.accounts.append(account)
+    rss = procstat.rss_kib(os.getpid())
+    start = time.perf_counter()
+    # What happens when the connections of a vault arrive
+    win._set_account_config(account, Config(conns))
+    populate = time.perf_counter() - start
+    win.tree.viewport().repaint()
+    settle(app)
+    painted = time.perf_counter() - start
+    settle(app, lambda: win._index_worker is None and win.search_index is not None)
+    indexed = time.perf_counter() - start
+    grown = procstat.rss_kib(os.getpid()) - rss
+    rows = len(win.model.folder_indexes())
+    print(
+        f"{size:>8} {populate * 1000:>12.1f} {painted * 1000:>10.1f} "
+        f"{indexed * 1000:>10.1f} {grown / 1024:>9.1f} {rows:>8}"
+    )
+    close_window(app, win)
+    return {
+        "connections": size,
+        "populate_ms": populate * 1000,
+        "painted_ms": painted * 1000,
+        "indexed_ms": indexed * 1000,
+        "rss_growth_kib": grown,
+        "folders": rows,
+    }
+
+
+def bench_tabs(app, count: int) -> dict:
+    from benchmarks import stub_konsole
+    from benchmarks.bench_search import synthetic
+
+    conns = synthetic(count)
+    win = new_window(app)
+    settle(app)
+    stub_konsole.reset()
+    start = time.perf_counter()
+    for conn in conns:
+        win.open_terminal(conn)
+        app.processEvents()
+    settle(app)
+    opened = time.perf_counter() - start
+    running = sum(1 for tab in win._terminal_tabs() if tab.running)
+    calls = len(stub_konsole.started) + len(stub_konsole.inputs)
+    # Including the shell tab opened at startup
+    total = win.tab_widget.count()
+    start = time.perf_counter()
+    while win.tab_widget.count():
+        win.close_tab(win.tab_widget.count() - 1)
+        app.processEvents()
+    settle(app)
+    closed = time.perf_counter() - start
+    print(
+        f"{count} tabs: opened {count / opened:.0f}/s ({running} running, "
+        f"{calls} terminal calls), closed {total / closed:.0f}/s"
+    )
+    close_window(app, win)
+    return {
+        "tabs": count,
+        "open_per_s": count / opened,
+        "close_per_s": total / closed,
+        "running": running,
+        "programs_started": len(stub_konsole.started),
+        "inputs_sent": len(stub_konsole.inputs),
+    }
+
+
+def bench_cycles(app, cycles: int) -> dict:
+    from PyQt5.QtWidgets import QApplication
+
+    from benchmarks import stub_konsole
+    from benchmarks.bench_search import synthetic
+    from sshmanager import procstat
+
+    # A few connections reused, so quick-open ranking does not grow
+    conns = synthetic(10)
+    win = new_window(app)
+    settle(app)
+
+    def cycle(conn) -> None:
+        win.open_terminal(conn)
+        app.processEvents()
+        win.close_tab(win.tab_widget.count() - 1)
+        settle(app)
+
+    def usage() -> tuple[int, int, int]:
+        # Recorded calls would count as growth
+        stub_konsole.reset()
+        gc.collect()
+        return procstat.rss_kib(os.getpid()), len(gc.get_objects()), len(QApplication.allWidgets())
+
+    # The first tabs fill caches and the terminal pool
+    warmup = max(1, cycles // 10)
+    for i in range(warmup):
+        cycle(conns[i % len(conns)])
+    rss, objects, widgets = usage()
+    start = time.perf_counter()
+    for i in range(warmup, cycles):
+        cycle(conns[i % len(conns)])
+    elapsed = time.perf_counter() - start
+    rss2, objects2, widgets2 = usage()
+    measured = cycles - warmup
+    print(
+        f"{measured} open/close cycles after {warmup} warm-up: {elapsed:.2f} s, "
+        f"RSS {(rss2 - rss) / 1024:+.1f} MiB ({(rss2 - rss) * 1024 / measured:+.0f} B/cycle), "
+        f"objects {objects2 - objects:+d}, widgets {widgets2 - widgets:+d}, "
+        f"lifecycle {len(win.lifecycle.usage())}"
+    )
+    close_window(app, win)
+    return {
+        "cycles": measured,
+        "warmup": warmup,
+        "seconds": elapsed,
+        "rss_growth_kib": rss2 - rss,
+        "object_growth": objects2 - objects,
+        "widget_growth": widgets2 - widgets,
+        "lifecycle_registered": len(win.lifecycle.usage()),
+    }
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_ui")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=500)
+    parser.add_argument("--typed", action="store_true", help="type ssh into shells")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    home = tempfile.mkdtemp(prefix="bench_ui_")
+    # Before sshmanager is imported; some paths are derived from HOME then
+    os.environ["HOME"] = home
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ.update(
+        SSHMANAGER_PROBE="0",
+        SSHMANAGER_DNS_PREFETCH="0",
+        SSHMANAGER_RESTORE_SESSION="0",
+    )
+    from PyQt5.QtWidgets import QApplication
+
+    from benchmarks import stub_konsole
+
+    stub_konsole.has_parts = not args.typed
+    stub_konsole.install()
+    app = QApplication([])
+    try:
+        report = {"benchmark": "ui", "window": bench_window(app)}
+        print(f"{'size':>8} {'populate ms':>12} {'painted ms':>10} {'indexed ms':>10} {'RSS MiB':>9} {'folders':>8}")
+        report["sidebar"] = [bench_sidebar(app, int(size)) for size in args.sizes.split(",")]
+        report["tabs"] = bench_tabs(app, args.tabs)
+        report["cycles"] = bench_cycles(app, args.cycles)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    from benchmarks.bench_vault import git_commit
+
+    report.update(
+        commit=git_commit(),
+        created=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        typed=args.typed,
+        python=platform.python_version(),
+        platform=platform.platform(),
+    )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,281 @@
+"""Wall time, ``bw`` processes and peak memory of vault operations.
+
+Needs no Bitwarden account: ``benchmarks/fakebw`` is put first on ``PATH``
+and its ``bw`` serves a synthetic vault. The ``native`` backend talks to
+:mod:`benchmarks.fakevault.server` instead, started in this process with an
+encrypted copy of the same vault. Run from the repository root::
+
+    python -m benchmarks.bench_vault [--sizes 100,1000,10000] [--backends cli,serve,native]
+        [--latency 0] [--repeat 3] [--output results.json] [--compare old.json]
+
+For every backend and vault size a fresh client runs ``login``,
+``fetch_credentials`` before and after the connections are listed,
+``list_connections``, ``sync`` and ``load_config``. Each operation reports
+the median wall time, the number of ``bw`` processes started and requests
+sent to ``bw serve`` or the fake server, and the peak RSS of this process and its children,
+sampled every few milliseconds. ``--output`` writes the results with the
+commit they were measured on; ``--compare`` prints the change against an
+earlier file. The peak RSS of ``native`` includes the fake server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from sshmanager import config, procstat
+from sshmanager.bitwarden import BitwardenClient
+
+FAKEBW_DIR = Path(__file__).resolve().parent / "fakebw"
+EMAIL = "bench@example.com"
+PASSWORD = "secret"
+OPERATIONS = (
+    "login",
+    "fetch_credentials",
+    "list_connections",
+    "fetch_credentials_cached",
+    "sync",
+    "load_config",
+)
+
+
+class PeakSampler:
+    """Highest RSS of this process tree while the sampler runs."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak_kib = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while True:
+            self.peak_kib = max(self.peak_kib, procstat.tree_usage(pid).rss_kib)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def read_log(path: str) -> list[str]:
+    try:
+        with open(path) as fh:
+            return fh.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+
+def measure(log_path: str, func: Callable[[], Any]) -> dict[str, Any]:
+    before = len(read_log(log_path))
+    with PeakSampler() as sampler:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    lines = read_log(log_path)[before:]
+    return {
+        "seconds": elapsed,
+        "processes": sum(1 for line in lines if not line.startswith("@")),
+        "requests": sum(1 for line in lines if line.startswith("@")),
+        "peak_rss_kib": sampler.peak_kib,
+        "ok": bool(result),
+    }
+
+
+def run_once(log_path: str, size: int, server: str | None = None) -> dict[str, dict[str, Any]]:
+    """Run every operation once against a fresh client."""
+    client = BitwardenClient()
+    # An item outside the first page of any listing
+    item_id = f"00000000-0000-0000-0000-{0x10000 + size - 1:012x}"
+    try:
+        results = {
+            "login": measure(log_path, lambda: client.login(EMAIL, PASSWORD, server)),
+            "fetch_credentials": measure(log_path, lambda: client.fetch_credentials(item_id)),
+        }
+        conns = []
+        results["list_connections"] = measure(
+            log_path, lambda: conns.extend(client.list_connections()) or conns
+        )
+        if len(conns) != size:
+            raise RuntimeError(f"listed {len(conns)} connections, expected {size}")
+        results["fetch_credentials_cached"] = measure(
+            log_path, lambda: client.fetch_credentials(item_id)
+        )
+        results["sync"] = measure(log_path, client.sync)
+        results["load_config"] = measure(
+            log_path, lambda: config.load_config(client).connections
+        )
+        return results
+    finally:
+        client.logout()
+        client.close()
+
+
+def summarize(runs: list[dict[str, dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+    summary = {}
+    for op in OPERATIONS:
+        samples = [run[op] for run in runs]
+        summary[op] = {
+            "seconds": statistics.median(s["seconds"] for s in samples),
+            "min_seconds": min(s["seconds"] for s in samples),
+            "processes": max(s["processes"] for s in samples),
+            "requests": max(s["requests"] for s in samples),
+            "peak_rss_kib": max(s["peak_rss_kib"] for s in samples),
+            "ok": all(s["ok"] for s in samples),
+        }
+    return summary
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    old = {(r["backend"], r["size"], r["operation"]): r for r in baseline["results"]}
+    print(f"\nChange against {baseline.get('commit') or baseline_path}:")
+    print(f"{'backend':>7} {'items':>7} {'operation':>24} {'time':>8} {'procs':>6} {'peak':>8}")
+    for r in results:
+        prev = old.get((r["backend"], r["size"], r["operation"]))
+        if prev is None:
+            continue
+        ratio = r["seconds"] / prev["seconds"] if prev["seconds"] else float("inf")
+        procs = r["processes"] - prev["processes"]
+        peak = (r["peak_rss_kib"] - prev["peak_rss_kib"]) / 1024
+        print(
+            f"{r['backend']:>7} {r['size']:>7} {r['operation']:>24} "
+            f"{ratio:>7.2f}x {procs:>+6} {peak:>+7.1f}M"
+        )
+
+
+def start_fakevault(size: int, log_path: str) -> Any:
+    from benchmarks.fakevault.server import FakeVaultServer, build_fixture
+
+    fixture = build_fixture(
+        size,
+        folders=int(os.environ["FAKEBW_FOLDERS"]),
+        other_items=int(os.environ["FAKEBW_OTHER_ITEMS"]),
+        notes=float(os.environ["FAKEBW_NOTES"]),
+        email=EMAIL,
+        password=PASSWORD,
+    )
+    latency = float(os.environ["FAKEBW_LATENCY"])
+    return FakeVaultServer(fixture, latency=latency, log_path=log_path).start()
+
+
+def run_all(
+    backends: list[str], sizes: list[int], repeat: int, log_path: str, results: list
+) -> None:
+    print(
+        f"{'backend':>7} {'items':>7} {'operation':>24} {'median s':>9} "
+        f"{'procs':>6} {'reqs':>5} {'peak MiB':>9}"
+    )
+    for backend in backends:
+        os.environ["SSHMANAGER_BW_BACKEND"] = backend
+        for size in sizes:
+            os.environ["FAKEBW_ITEMS"] = str(size)
+            server = start_fakevault(size, log_path) if backend == "native" else None
+            try:
+                url = server.url if server else None
+                runs = [run_once(log_path, size, url) for _ in range(max(1, repeat))]
+            finally:
+                if server:
+                    server.stop()
+            for op, r in summarize(runs).items():
+                results.append({"backend": backend, "size": size, "operation": op, **r})
+                print(
+                    f"{backend:>7} {size:>7} {op:>24} {r['seconds']:>9.3f} "
+                    f"{r['processes']:>6} {r['requests']:>5} {r['peak_rss_kib'] / 1024:>9.1f}"
+                    + ("" if r["ok"] else "  FAILED")
+                )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_vault")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--backends", default="cli,serve")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per bw call or request")
+    parser.add_argument("--folders", type=int, default=4)
+    parser.add_argument("--other-items", type=int, default=0)
+    parser.add_argument("--notes", type=float, default=1.0, help="share of items with notes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare with")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    workdir = tempfile.mkdtemp(prefix="bench_vault_")
+    log_path = os.path.join(workdir, "calls.log")
+    os.environ["PATH"] = f"{FAKEBW_DIR}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ.update(
+        FAKEBW_LOG=log_path,
+        FAKEBW_LATENCY=str(args.latency),
+        FAKEBW_FOLDERS=str(args.folders),
+        FAKEBW_OTHER_ITEMS=str(args.other_items),
+        FAKEBW_NOTES=str(args.notes),
+        # Temporary profiles, so every run starts with a cold login
+        SSHMANAGER_BW_PERSIST="0",
+    )
+    os.environ.pop("BW_SESSION", None)
+    os.environ.pop("BITWARDENCLI_APPDATA_DIR", None)
+
+    results = []
+    try:
+        run_all(backends, sizes, args.repeat, log_path, results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "vault",
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "latency": args.latency,
+            "folders": args.folders,
+            "other_items": args.other_items,
+            "notes": args.notes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,293 @@
+"""Vaultwarden-style HTTP server for the native vault client.
+
+Serves the endpoints :class:`sshmanager.vault_client.VaultClient` uses:
+prelogin, the password and refresh token grants, ``/api/sync`` and the
+account revision date. Vault contents are encrypted exactly like a real
+server stores them, with fixed IVs so the output is reproducible.
+``fixture.json`` next to this file is a small vault built this way; larger
+ones are built in memory. Run from the repository root::
+
+    python -m benchmarks.fakevault.server [--items N | --fixture PATH] [--port 8080]
+
+then log in with ``SSHMANAGER_BW_BACKEND=native`` to ``http://127.0.0.1:PORT``
+as ``bench@example.com`` with the password ``secret``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import hmac
+import http.server
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from sshmanager.vault_client import (
+    KDF_PBKDF2,
+    derive_master_key,
+    master_password_hash,
+    stretch_key,
+)
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixture.json"
+EMAIL = "bench@example.com"
+PASSWORD = "secret"
+SSH_FOLDER = str(uuid.UUID(int=1))
+ACCESS_TOKEN = "fake-access-token"
+REFRESH_TOKEN = "fake-refresh-token"
+
+
+class _Encryptor:
+    """Type 2 (AES-256-CBC + HMAC-SHA256) encryption with derived IVs."""
+
+    def __init__(self, seed: str) -> None:
+        self._seed = seed
+        self._counter = 0
+
+    def bytes(self, label: str, length: int) -> bytes:
+        digest = hashlib.sha512(f"{self._seed}:{label}".encode()).digest()
+        return digest[:length]
+
+    def encrypt(self, plain: bytes, key: bytes) -> str:
+        self._counter += 1
+        iv = self.bytes(f"iv{self._counter}", 16)
+        padder = padding.PKCS7(128).padder()
+        padded = padder.update(plain) + padder.finalize()
+        encryptor = Cipher(algorithms.AES(key[:32]), modes.CBC(iv)).encryptor()
+        data = encryptor.update(padded) + encryptor.finalize()
+        mac = hmac.new(key[32:], iv + data, hashlib.sha256).digest()
+        return "2." + "|".join(base64.b64encode(p).decode() for p in (iv, data, mac))
+
+    def text(self, value: Optional[str], key: bytes) -> Optional[str]:
+        return None if value is None else self.encrypt(value.encode(), key)
+
+
+def build_fixture(
+    items: int,
+    iterations: int = 600_000,
+    folders: int = 4,
+    other_items: int = 0,
+    notes: float = 1.0,
+    email: str = EMAIL,
+    password: str = PASSWORD,
+) -> dict[str, Any]:
+    """Return an encrypted vault with ``items`` connections in ``SSH``.
+
+    Item ids and contents match ``benchmarks/fakebw/bw`` with the same
+    ``folders``, ``other_items`` and ``notes`` settings. Every tenth item
+    has its own cipher key, and one deleted and one organisation item are
+    added; the client has to skip both.
+    """
+    enc = _Encryptor(f"{email}:{items}")
+    master_key = derive_master_key(password, email, KDF_PBKDF2, iterations)
+    user_key = enc.bytes("user-key", 64)
+    folder_list = [{"id": SSH_FOLDER, "name": enc.text("SSH", user_key), "revisionDate": None}]
+    for index in range(folders):
+        folder_list.append(
+            {"id": str(uuid.UUID(int=2 + index)), "name": enc.text(f"Folder {index}", user_key)}
+        )
+
+    def cipher(index: int, **extra: Any) -> dict[str, Any]:
+        key = user_key
+        cipher_key = None
+        if index % 10 == 0:
+            key = enc.bytes(f"item-key{index}", 64)
+            cipher_key = enc.encrypt(key, user_key)
+        if index < items:
+            folder_id = SSH_FOLDER
+            with_notes = int((index + 1) * notes) > int(index * notes)
+        else:
+            folder_id = str(uuid.UUID(int=2 + index % max(1, folders))) if folders else None
+            with_notes = False
+        settings = None
+        if with_notes:
+            settings = json.dumps(
+                {
+                    "port": 2200 + index % 100,
+                    "folder": f"Group {index % 50}",
+                    "initial_cmd": "tmux attach" if index % 7 == 0 else None,
+                }
+            )
+        return {
+            "id": str(uuid.UUID(int=0x10000 + index)),
+            "type": 1,
+            "folderId": folder_id,
+            "organizationId": None,
+            "deletedDate": None,
+            "revisionDate": "2024-05-01T12:00:00.000Z",
+            "key": cipher_key,
+            "name": enc.text(f"server-{index:06d}", key),
+            "notes": enc.text(settings, key),
+            "login": {
+                "username": enc.text("deploy", key),
+                "password": enc.text("x" * 24, key),
+                "uris": [{"uri": enc.text(f"host-{index:06d}.example.internal", key), "match": None}],
+            },
+            **extra,
+        }
+
+    total = items + other_items
+    ciphers = [cipher(i) for i in range(total)]
+    ciphers.append(cipher(total, folderId=SSH_FOLDER, deletedDate="2024-06-01T12:00:00.000Z"))
+    ciphers.append(
+        cipher(total + 1, folderId=SSH_FOLDER, organizationId=str(uuid.UUID(int=0xFFFF)))
+    )
+    return {
+        "email": email,
+        "prelogin": {"kdf": KDF_PBKDF2, "kdfIterations": iterations},
+        "passwordHash": master_password_hash(master_key, password),
+        "key": enc.encrypt(user_key, stretch_key(master_key)),
+        "revisionDate": "2024-05-01T12:00:00.000Z",
+        "sync": {
+            "object": "sync",
+            "profile": {"id": "00000000-0000-0000-0000-00000000beef", "email": email, "name": "Bench"},
+            "folders": folder_list,
+            "ciphers": ciphers,
+        },
+    }
+
+
+class FakeVaultServer:
+    """Serve ``fixture`` on a local port from a background thread.
+
+    Every request is appended to ``log_path`` as ``@ METHOD /path``, like the
+    requests to ``bw serve`` logged by the fake CLI. ``latency`` seconds are
+    added to every request.
+    """
+
+    def __init__(
+        self,
+        fixture: dict[str, Any],
+        port: int = 0,
+        latency: float = 0.0,
+        log_path: Optional[str] = None,
+    ) -> None:
+        self.fixture = fixture
+        self.latency = latency
+        self.log_path = log_path
+        self._sync_body = json.dumps(fixture["sync"]).encode()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def reply(self, status: int, data: Any = None, body: bytes | None = None) -> None:
+                if body is None:
+                    body = json.dumps(data).encode() if data is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                server._log(f"@ POST {self.path}")
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length).decode()
+                if self.path == "/identity/accounts/prelogin":
+                    return self.reply(200, server.fixture["prelogin"])
+                if self.path == "/identity/connect/token":
+                    form = {k: v[0] for k, v in urllib.parse.parse_qs(raw).items()}
+                    return self.reply(*server._token(form))
+                self.reply(404, {"message": "Not found"})
+
+            def do_GET(self) -> None:
+                server._log(f"@ GET {self.path}")
+                if self.headers.get("Authorization") != f"Bearer {ACCESS_TOKEN}":
+                    return self.reply(401, {"error": "invalid_token"})
+                path = urllib.parse.urlsplit(self.path).path
+                if path == "/api/sync":
+                    return self.reply(200, body=server._sync_body)
+                if path == "/api/accounts/revision-date":
+                    return self.reply(200, server.fixture["revisionDate"])
+                self.reply(404, {"message": "Not found"})
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def _log(self, line: str) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self.log_path:
+            with open(self.log_path, "a") as fh:
+                fh.write(line + "\n")
+
+    def _token(self, form: dict[str, str]) -> tuple[int, dict[str, Any]]:
+        grant = form.get("grant_type")
+        if grant == "password":
+            if (
+                form.get("username", "").strip().lower() != self.fixture["email"]
+                or form.get("password") != self.fixture["passwordHash"]
+            ):
+                return 400, {
+                    "error": "invalid_grant",
+                    "error_description": "Username or password is incorrect. Try again.",
+                }
+        elif grant != "refresh_token" or form.get("refresh_token") != REFRESH_TOKEN:
+            return 400, {"error": "invalid_grant"}
+        return 200, {
+            "access_token": ACCESS_TOKEN,
+            "refresh_token": REFRESH_TOKEN,
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "key": self.fixture["key"],
+        }
+
+    def start(self) -> "FakeVaultServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def load_fixture(path: Path = FIXTURE_PATH) -> dict[str, Any]:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fakevault.server")
+    parser.add_argument("--items", type=int, help="build a vault of this size")
+    parser.add_argument("--fixture", default=str(FIXTURE_PATH))
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--write", help="write the built vault to this file and exit")
+    args = parser.parse_args(argv)
+    fixture = build_fixture(args.items) if args.items is not None else load_fixture(Path(args.fixture))
+    if args.write:
+        with open(args.write, "w") as fh:
+            json.dump(fixture, fh, indent=1)
+            fh.write("\n")
+        return
+    server = FakeVaultServer(fixture, args.port)
+    print(f"Serving {len(fixture['sync']['ciphers'])} items on {server.url}")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
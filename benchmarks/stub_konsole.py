@@ -0,0 +1,96 @@
+"""Stand-in for ``sshmanager.util.konsole_embed`` without Konsole.
+
+Terminals are plain widgets and nothing is run in them; programs started
+and input sent are recorded instead. Call :func:`install` before the UI is
+imported so ``TerminalTab`` and ``TerminalPool`` pick it up.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Optional, Sequence
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QVBoxLayout, QWidget
+
+# Without parts only shells can be created and ssh is typed into them, like
+# with libraries built before createKonsolePart existed
+has_parts = True
+# (widget id, program, args) of every started program
+started: list[tuple[int, str, list[str]]] = []
+# (widget id, text) of every input sent, one entry per widget
+inputs: list[tuple[int, str]] = []
+
+
+def reset() -> None:
+    started.clear()
+    inputs.clear()
+
+
+def _widget(parent: Optional[QWidget]) -> QWidget:
+    widget = QWidget(parent)
+    if parent is not None:
+        # The library puts the part into a layout of the container
+        layout = QVBoxLayout(parent)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(widget)
+    return widget
+
+
+def create_part(parent: Optional[QWidget] = None) -> Optional[QWidget]:
+    return _widget(parent) if has_parts else None
+
+
+def create_shell_widget(
+    shell: str | None = None, parent: Optional[QWidget] = None
+) -> Optional[QWidget]:
+    return _widget(parent)
+
+
+def create_konsole_widget(
+    user: str,
+    host: str,
+    port: int = 22,
+    key: str | None = None,
+    initial_cmd: str | None = None,
+    parent: Optional[QWidget] = None,
+) -> Optional[QWidget]:
+    return _widget(parent)
+
+
+def start_program(widget: QWidget, program: str, args: Sequence[str] = ()) -> bool:
+    if not has_parts:
+        return False
+    started.append((id(widget), program, list(args)))
+    return True
+
+
+def terminal_pid(widget: QWidget) -> Optional[int]:
+    return None
+
+
+def watch_output(widget: QWidget, timer: Optional[QTimer]) -> bool:
+    return False
+
+
+def send_input(widget: QWidget, command: str) -> None:
+    inputs.append((id(widget), command + "\n"))
+
+
+def send_input_many(widgets: Sequence[QWidget], text: str, newline: bool = True) -> int:
+    text = text + "\n" if newline else text
+    inputs.extend((id(w), text) for w in widgets)
+    return len(widgets)
+
+
+def get_last_error() -> Optional[str]:
+    return None
+
+
+def install() -> None:
+    """Make ``sshmanager.util.konsole_embed`` refer to this module."""
+    import sshmanager.util
+
+    module = sys.modules[__name__]
+    sys.modules["sshmanager.util.konsole_embed"] = module
+    sshmanager.util.konsole_embed = module
@@ -9,25 +9,25 @@
 #include <cstdlib>
 #include <unordered_map>
 #include <QObject>
+#include <QMetaObject>
 
 static std::unordered_map<QWidget*, TerminalInterface*> g_ifaces;
+static std::unordered_map<QWidget*, QObject*> g_parts;
 
-static void register_iface(QWidget* widget, TerminalInterface* iface) {
+static void register_iface(QWidget* widget, TerminalInterface* iface, QObject* part) {
     if (!widget || !iface) {
         return;
     }
     g_ifaces[widget] = iface;
+    g_parts[widget] = part;
     QObject::connect(widget, &QObject::destroyed, [widget]() {
         g_ifaces.erase(widget);
+        g_parts.erase(widget);
     });
 }
 
-extern "C" QWidget* createKonsoleSshWidget(const char* user,
-                                            const char* host,
-                                            int port,
-                                            const char* key,
-                                            const char* initial_cmd,
-                                            QWidget* parent = nullptr) {
+// Instantiate the Konsole part and put its widget into parent's layout
+static QWidget* instantiate_part(QWidget* parent, TerminalInterface** iface_out) {
     auto result = KPluginFactory::instantiatePlugin<KParts::ReadOnlyPart>(
         KPluginMetaData(QStringLiteral("konsolepart")), parent);
     if (!result.plugin) {
@@ -43,6 +43,21 @@ extern "C" QWidget* createKonsoleSshWidget(const char* user,
     }
 
     TerminalInterface* iface = qobject_cast<TerminalInterface*>(result.plugin);
+    register_iface(widget, iface, result.plugin);
+    if (iface_out) {
+        *iface_out = iface;
+    }
+    return widget;
+}
+
+extern "C" QWidget* createKonsoleSshWidget(const char* user,
+                                            const char* host,
+                                            int port,
+                                            const char* key,
+                                            const char* initial_cmd,
+                                            QWidget* parent = nullptr) {
+    TerminalInterface* iface = nullptr;
+    QWidget* widget = instantiate_part(parent, &iface);
     if (iface) {
         QStringList args;
         if (key && key[0]) {
@@ -55,40 +70,73 @@ extern "C" QWidget* createKonsoleSshWidget(const char* user,
             iface->sendInput(QString::fromUtf8(initial_cmd));
             iface->sendInput(QStringLiteral("\n"));
         }
-        register_iface(widget, iface);
     }
-
     return widget;
 }
 
 extern "C" QWidget* createKonsoleShellWidget(const char* shell,
                                               QWidget* parent = nullptr) {
-    auto result = KPluginFactory::instantiatePlugin<KParts::ReadOnlyPart>(
-        KPluginMetaData(QStringLiteral("konsolepart")), parent);
-    if (!result.plugin) {
-        return nullptr;
-    }
-
-    QWidget* widget = result.plugin->widget();
-    if (parent) {
-        auto layout = new QVBoxLayout(parent);
-        layout->setContentsMargins(0, 0, 0, 0);
-        layout->addWidget(widget);
-        parent->setLayout(layout);
-    }
-
-    TerminalInterface* iface = qobject_cast<TerminalInterface*>(result.plugin);
+    TerminalInterface* iface = nullptr;
+    QWidget* widget = instantiate_part(parent, &iface);
     if (iface) {
         const char* env_shell = shell && shell[0] ? shell : std::getenv("SHELL");
         QString prog = env_shell ? QString::fromUtf8(env_shell)
                                  : QStringLiteral("bash");
         iface->startProgram(prog, QStringList());
-        register_iface(widget, iface);
     }
-
     return widget;
 }
 
+// Create a Konsole widget without starting a program. Without a parent the
+// widget is a hidden top-level widget that can be reparented later; deleting
+// the widget deletes the part.
+extern "C" QWidget* createKonsolePart(QWidget* parent = nullptr) {
+    return instantiate_part(parent, nullptr);
+}
+
+// Start program with the NULL-terminated argument list in a widget created
+// by createKonsolePart. Returns 0 when the widget is unknown.
+extern "C" int startProgramInWidget(QWidget* widget,
+                                    const char* program,
+                                    const char* const* args) {
+    auto it = g_ifaces.find(widget);
+    if (it == g_ifaces.end() || !it->second || !program) {
+        return 0;
+    }
+    QStringList list;
+    for (; args && *args; ++args) {
+        list << QString::fromUtf8(*args);
+    }
+    it->second->startProgram(QString::fromUtf8(program), list);
+    return 1;
+}
+
+// Return the PID of the program running in widget, or 0 when unknown
+extern "C" int terminalProcessIdOfWidget(QWidget* widget) {
+    auto it = g_ifaces.find(widget);
+    if (it == g_ifaces.end() || !it->second) {
+        return 0;
+    }
+    return it->second->terminalProcessId();
+}
+
+// Call receiver's start() slot, e.g. of a single-shot QTimer, whenever the
+// program in widget prints something after a quiet period. A NULL receiver
+// stops watching. Returns 0 when the widget is unknown.
+extern "C" int watchActivityOfWidget(QWidget* widget, QObject* receiver) {
+    auto it = g_parts.find(widget);
+    if (it == g_parts.end() || !it->second) {
+        return 0;
+    }
+    QObject* part = it->second;
+    QMetaObject::invokeMethod(part, "setMonitorActivityEnabled", Q_ARG(bool, receiver != nullptr));
+    if (!receiver) {
+        QObject::disconnect(part, SIGNAL(activityDetected()), nullptr, nullptr);
+        return 1;
+    }
+    return QObject::connect(part, SIGNAL(activityDetected()), receiver, SLOT(start())) ? 1 : 0;
+}
+
 extern "C" void sendInputToWidget(QWidget* widget, const char* input) {
     auto it = g_ifaces.find(widget);
     if (it == g_ifaces.end() || !it->second || !input) {
@@ -97,3 +145,29 @@ extern "C" void sendInputToWidget(QWidget* widget, const char* input) {
     it->second->sendInput(QString::fromUtf8(input));
     it->second->sendInput(QStringLiteral("\n"));
 }
+
+// Send input to count widgets in one call, e.g. to type into many terminals
+// at once. The text is converted once; unknown widgets are skipped. Returns
+// the number of widgets that received the input.
+extern "C" int sendInputToWidgets(QWidget* const* widgets,
+                                  int count,
+                                  const char* input,
+                                  int newline) {
+    if (!widgets || !input) {
+        return 0;
+    }
+    QString text = QString::fromUtf8(input);
+    if (newline) {
+        text += QLatin1Char('\n');
+    }
+    int sent = 0;
+    for (int i = 0; i < count; ++i) {
+        auto it = g_ifaces.find(widgets[i]);
+        if (it == g_ifaces.end() || !it->second) {
+            continue;
+        }
+        it->second->sendInput(text);
+        ++sent;
+    }
+    return sent;
+}
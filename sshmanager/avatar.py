@@ -0,0 +1,106 @@
+"""On-disk cache for profile images downloaded from the vault server.
+
+Images are stored per server and user id together with the ``ETag`` and
+``Last-Modified`` headers of the response, which are sent back as
+``If-None-Match``/``If-Modified-Since`` so an unchanged image costs a single
+``304 Not Modified`` round trip. When the server is slow or unreachable the
+cached copy is used. Nothing is written unless the caller asks for the
+cache; the application only does with ``SSHMANAGER_AVATAR_CACHE=1``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+AVATAR_DIR = Path.home() / ".sshmanager" / "avatars"
+
+
+def _cache_paths(server: str, user_id: str) -> tuple[Path, Path]:
+    name = hashlib.sha256(f"{server.rstrip('/')}\n{user_id}".encode()).hexdigest()[:16]
+    return AVATAR_DIR / f"{name}.img", AVATAR_DIR / f"{name}.json"
+
+
+def cached(server: str, user_id: str) -> Optional[bytes]:
+    """Return the cached image for a user without contacting the server."""
+    image_path, _ = _cache_paths(server, user_id)
+    try:
+        return image_path.read_bytes()
+    except OSError:
+        return None
+
+
+def forget(server: str, user_id: str) -> None:
+    """Delete the cached image of a user, if any."""
+    for path in _cache_paths(server, user_id):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logging.error("Failed to remove cached avatar: %s", exc)
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def fetch(server: str, user_id: str, timeout: float, cache: bool = True) -> Optional[bytes]:
+    """Return the user's profile image, revalidating the cached copy.
+
+    ``None`` is returned when the server has no image and nothing is cached.
+    Without ``cache`` the image is always downloaded and a cached copy left
+    from earlier runs is deleted.
+    """
+    image_path, meta_path = _cache_paths(server, user_id)
+    if not cache:
+        forget(server, user_id)
+    data = cached(server, user_id) if cache else None
+    meta: dict[str, str] = {}
+    if data is not None:
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            meta = {}
+    url = server.rstrip("/") + f"/identity/profile/images/{user_id}.jpg"
+    req = urllib.request.Request(url)
+    if meta.get("etag"):
+        req.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        req.add_header("If-Modified-Since", meta["last_modified"])
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            headers = resp.headers
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and data is not None:
+            logging.debug("Avatar of %s not modified", user_id)
+            return data
+        logging.error("Failed to fetch avatar: %s", exc)
+        return data
+    except Exception as exc:  # pragma: no cover - network failures
+        logging.error("Failed to fetch avatar: %s", exc)
+        return data
+    if not cache:
+        return body
+    meta = {
+        "etag": headers.get("ETag") or "",
+        "last_modified": headers.get("Last-Modified") or "",
+    }
+    try:
+        _write(image_path, body)
+        _write(meta_path, json.dumps(meta).encode())
+    except OSError as exc:
+        logging.error("Failed to cache avatar: %s", exc)
+    return body
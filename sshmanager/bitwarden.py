@@ -3,6 +3,20 @@
 The application interacts with the `bw` command line tool instead of calling the
 HTTP API directly. Only a few commands are required and this module abstracts
 those operations.
+
+All state of one login lives in a :class:`BitwardenClient`, so several
+accounts can be used at the same time from different threads. The
+module-level functions operate on :data:`default_client`.
+
+By default every command spawns a new ``bw`` process. Commands have a deadline
+(``SSHMANAGER_BW_TIMEOUT``), read-only commands are retried with jittered
+backoff and a circuit breaker stops calling an unhealthy server for a while,
+serving the last known connection list instead. Setting
+``SSHMANAGER_BW_BACKEND=serve`` starts a single ``bw serve`` process after
+login and sends read commands to its local REST API instead, falling back to
+the subprocess path whenever the server cannot be reached.
+``SSHMANAGER_BW_BACKEND=native`` skips the CLI entirely and uses the
+in-process client from :mod:`sshmanager.vault_client`.
 """
 
 from __future__ import annotations
@@ -10,180 +24,190 @@ from __future__ import annotations
 import json
 import logging
 import os
+import socket
 import subprocess
 import tempfile
 import shutil
 import atexit
-from typing import Any, List, Optional
-import urllib.request
+import codecs
+import threading
+import time
+import weakref
+import http.client
+from typing import IO, Any, Iterator, List, Optional
+import urllib.parse
 import hashlib
 
 from .models import Connection
+from .items import ConnectionCache, notes_config
+from .retry import CircuitBreaker, backoff_delays
+from . import avatar, settings
+
+
+# Commands that only read state and are safe to retry
+_IDEMPOTENT = frozenset({"list", "get", "status", "sync"})
+
+# Seconds to wait for ``bw serve`` to answer its first request
+SERVE_START_TIMEOUT = 30.0
+# Seconds to wait for a single ``bw serve`` response
+SERVE_REQUEST_TIMEOUT = 60.0
 
 
-_session: Optional[str] = None
-_last_error: Optional[str] = None
-_config_dir: Optional[str] = None
-_server_url: Optional[str] = None
-_user_email: Optional[str] = None
-_user_id: Optional[str] = None
-_user_name: Optional[str] = None
-_avatar_data: Optional[bytes] = None
+PROFILE_ROOT = os.path.join(os.path.expanduser("~"), ".sshmanager", "bw")
+
+# Every client created in this process, closed on exit
+_clients: "weakref.WeakSet[BitwardenClient]" = weakref.WeakSet()
 
 
 def _cleanup() -> None:
-    """Remove the temporary Bitwarden config directory on exit."""
-    if _config_dir:
-        shutil.rmtree(_config_dir, ignore_errors=True)
+    """Stop ``bw serve`` and remove temporary config directories on exit."""
+    for client in list(_clients):
+        client.close()
+
+
+def _profile_dir(email: str, server: str | None) -> str:
+    """Return the persistent ``bw`` appdata directory for an account."""
+    account = f"{email.strip().lower()}\n{(server or '').rstrip('/')}"
+    name = hashlib.sha256(account.encode()).hexdigest()[:16]
+    return os.path.join(PROFILE_ROOT, name)
 
 
 atexit.register(_cleanup)
 
 
-def _run_bw(args: List[str], parse_json: bool = True) -> Any:
-    """Run a Bitwarden CLI command and return the parsed output."""
-    env = os.environ.copy()
-    if _session:
-        env["BW_SESSION"] = _session
-    else:
-        env.pop("BW_SESSION", None)
-    if _config_dir:
-        env["BITWARDENCLI_APPDATA_DIR"] = _config_dir
-    else:
-        env.pop("BITWARDENCLI_APPDATA_DIR", None)
-    try:
-        result = subprocess.run(
-            ["bw", *args],
-            env=env,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-    except FileNotFoundError:
-        logging.error("bw CLI not found")
-        return None
-    except subprocess.CalledProcessError as exc:
-        logging.error("bw command failed: %s", exc.stderr.strip())
-        return None
-    output = result.stdout.strip()
-    if parse_json:
-        try:
-            return json.loads(output) if output else None
-        except json.JSONDecodeError as exc:
-            logging.error("Failed to parse bw output: %s", exc)
-            return None
-    return output
-
-
-def login(
-    email: str,
-    password: str,
-    server: str | None = None,
-    device_name: str | None = None,
-    device_identifier: str | None = None,
-) -> bool:
-    """Authenticate using the Bitwarden CLI."""
-
-    global _session, _last_error, _config_dir, _server_url, _user_email, _user_id, _user_name, _avatar_data
-    _last_error = None
-    _session = None
-    _server_url = None
-    _user_email = None
-    _user_id = None
-    _user_name = None
-    _avatar_data = None
-
-    # Use a temporary config directory so the user's bw CLI state is untouched
-    if _config_dir:
-        shutil.rmtree(_config_dir, ignore_errors=True)
-    _config_dir = tempfile.mkdtemp(prefix="sshmanager_bw_")
-
-    if not email or not password:
-        _last_error = "Email and password are required"
-        return False
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to a server listening on a Unix domain socket."""
 
-    # Use a clean environment when invoking the CLI to avoid interfering with
-    # any active command line sessions, but do not modify this process
-    # environment so embedded terminals can continue using the user's session.
-
-    env = os.environ.copy()
-    # Ensure any existing session token from the user's shell is ignored so the
-    # application remains isolated from command line usage.
-    env.pop("BW_SESSION", None)
-    env.pop("BW_SERVER", None)
-    env["BITWARDENCLI_APPDATA_DIR"] = _config_dir
-    if server:
-        try:
-            subprocess.run(
-                ["bw", "config", "server", server],
-                env=env,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-        except subprocess.CalledProcessError as exc:
-            _last_error = exc.stderr.strip() or "Failed to set server"
-            logging.error("bw config server failed: %s", _last_error)
-            return False
-    try:
-        result = subprocess.run(
-            ["bw", "login", email, password, "--raw"],
-            env=env,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        _session = result.stdout.strip()
-    except FileNotFoundError:
-        _last_error = "bw CLI not found"
-        logging.error(_last_error)
-        return False
-    except subprocess.CalledProcessError as exc:
-        _last_error = exc.stderr.strip() or "Bitwarden login failed"
-        logging.error("bw login failed: %s", _last_error)
-        return False
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
 
-    # Initial sync to ensure items are available
-    _run_bw(["sync"], parse_json=False)
-
-    # Retrieve user information for avatar support
-    info = _run_bw(["status"])
-    if isinstance(info, dict):
-        _server_url = info.get("serverUrl") or server
-        _user_email = info.get("userEmail")
-        _user_id = info.get("userId")
-        _user_name = (
-            info.get("userName")
-            or info.get("name")
-            or info.get("profileName")
-        )
-    return True
 
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
 
-def get_status() -> str:
-    """Return ``"unlocked"`` if a session is available."""
 
-    return "unlocked" if _session else "unauthenticated"
+def _serve_route(args: List[str]) -> Optional[tuple[str, str]]:
+    """Map CLI arguments to a ``bw serve`` request or ``None``."""
+    if args == ["list", "folders"]:
+        return "GET", "/list/object/folders"
+    if args[:2] == ["list", "items"]:
+        query = {}
+        rest = args[2:]
+        while rest:
+            if len(rest) < 2 or rest[0] not in ("--folderid", "--search"):
+                return None
+            query[rest[0][2:]] = rest[1]
+            rest = rest[2:]
+        path = "/list/object/items"
+        if query:
+            path += "?" + urllib.parse.urlencode(query)
+        return "GET", path
+    if args[:2] == ["get", "item"] and len(args) == 3:
+        return "GET", "/object/item/" + urllib.parse.quote(args[2], safe="")
+    if args == ["sync"]:
+        return "POST", "/sync"
+    if args == ["status"]:
+        return "GET", "/status"
+    return None
 
 
-def is_unlocked() -> bool:
-    return _session is not None
+_NOT_SERVED = object()
 
+# Outcomes of one ``bw`` call, as far as the circuit breaker is concerned
+_OK = "ok"  # the server answered, possibly with an error such as not found
+_UNHEALTHY = "unhealthy"  # timed out or could not reach the server; retried
+_CANCELLED = "cancelled"
 
-def get_last_error() -> Optional[str]:
-    return _last_error
+# Parts of ``bw`` error messages that mean the server was not reached or
+# failed, rather than rejecting the request
+_TRANSPORT_ERRORS = (
+    "econnrefused",
+    "econnreset",
+    "etimedout",
+    "enotfound",
+    "eai_again",
+    "ehostunreach",
+    "enetunreach",
+    "socket hang up",
+    "fetch failed",
+    "network",
+    "timed out",
+    "bad gateway",
+    "service unavailable",
+    "gateway timeout",
+    "internal server error",
+)
 
 
-def user_info() -> Optional[dict[str, str]]:
-    """Return server URL, email, user id and name when logged in."""
-    if not is_unlocked():
-        return None
-    return {
-        "server": _server_url or "",
-        "email": _user_email or "",
-        "user_id": _user_id or "",
-        "name": _user_name or "",
-    }
+def _is_transport_error(message: str) -> bool:
+    message = message.lower()
+    return any(marker in message for marker in _TRANSPORT_ERRORS)
+
+
+class _StreamError(Exception):
+    """Raised when streamed ``bw`` output is invalid or the command failed."""
+
+    def __init__(self, message: str, outcome: str = _OK) -> None:
+        super().__init__(message)
+        self.outcome = outcome
+
+
+# Bytes read from the CLI's stdout at a time while streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_array(stream: IO[bytes], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of a JSON array read incrementally from ``stream``.
+
+    Only the element currently being decoded and one chunk of input are held
+    in memory. Empty input yields nothing.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":
+                    raise _StreamError("bw output is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                value, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise _StreamError(f"Failed to parse bw output: {exc}") from exc
+            else:
+                yield value
+                continue
+        elif eof:
+            if started:
+                raise _StreamError("bw output ended before the JSON array was closed")
+            return
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buf = buf[pos:] + text.decode(chunk)
+        else:
+            eof = True
+            buf = buf[pos:] + text.decode(b"", final=True)
+        pos = 0
 
 
 def _generate_placeholder_avatar(text: str, size: int = 48) -> bytes:
@@ -210,104 +234,869 @@ def _generate_placeholder_avatar(text: str, size: int = 48) -> bytes:
     return svg.encode()
 
 
-def fetch_avatar() -> Optional[bytes]:
-    """Download the user's profile image if available.
+class BitwardenClient:
+    """Session and cached state of one Bitwarden account.
 
-    If no image can be retrieved from the server, a placeholder avatar is
-    generated from the user's name when available, otherwise the email address.
+    ``_lock`` guards the attributes and is only held for short reads and
+    writes, so the GUI thread never waits for a ``bw`` command. ``_op_lock``
+    serialises vault operations of this client because the CLI must not run
+    concurrently on the same appdata directory. Different clients do not
+    share any lock and can load in parallel.
     """
-    global _avatar_data
-    if _avatar_data is not None:
-        return _avatar_data
-    info = user_info()
-    if not info:
-        return None
-    email = info.get("email", "")
-    name = info.get("name")
-    server = info.get("server")
-    user_id = info.get("user_id")
-    if server and user_id:
-        url = server.rstrip("/") + f"/identity/profile/images/{user_id}.jpg"
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._op_lock = threading.RLock()
+        self._session: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._config_dir: Optional[str] = None
+        self._server_url: Optional[str] = None
+        self._user_email: Optional[str] = None
+        self._user_id: Optional[str] = None
+        self._user_name: Optional[str] = None
+        self._avatar_data: Optional[bytes] = None
+        # True when _config_dir is a per-profile directory kept between launches
+        self._config_persistent = False
+        # Set after a warm unlock until the cached vault has been synced
+        self._sync_pending = False
+        self._login_stats: dict[str, Any] = {}
+        self._serve_proc: Optional[subprocess.Popen] = None
+        self._serve_address: Optional[str] = None
+        # In-process client used when the native backend is selected
+        self._native: Any = None
+        # Parsed connections of the last listing, reused while items are unchanged
+        self._conn_cache = ConnectionCache()
+        self._revision: Optional[str] = None
+        # Returned while the circuit breaker rejects calls to the server
+        self._last_connections: List[Connection] = []
+        self._breaker = CircuitBreaker(
+            settings.get_int("bw_breaker_threshold", 3),
+            settings.get_float("bw_breaker_reset", 60.0),
+        )
+        # Running ``bw`` children, killed by cancel()
+        self._children: set[subprocess.Popen] = set()
+        self._children_lock = threading.Lock()
+        self._cancel_cond = threading.Condition()
+        self._cancel_gen = 0
+        _clients.add(self)
+
+    def _set_error(self, message: Optional[str]) -> None:
+        with self._lock:
+            self._last_error = message
+
+    def _bw_env(self) -> dict[str, str]:
+        """Return the environment used for ``bw`` child processes."""
+        env = os.environ.copy()
+        with self._lock:
+            session = self._session
+            config_dir = self._config_dir
+        if session:
+            env["BW_SESSION"] = session
+        else:
+            env.pop("BW_SESSION", None)
+        if config_dir:
+            env["BITWARDENCLI_APPDATA_DIR"] = config_dir
+        else:
+            env.pop("BITWARDENCLI_APPDATA_DIR", None)
+        return env
+
+    # ``bw serve`` backend
+
+    def _serve_connection(self, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            address = self._serve_address
+        if address is None:
+            raise ConnectionError("bw serve is not running")
+        if address.startswith("unix:"):
+            return _UnixHTTPConnection(address[5:], timeout)
+        host, port = address.rsplit(":", 1)
+        return http.client.HTTPConnection(host, int(port), timeout=timeout)
+
+    def _serve_request(
+        self, method: str, path: str, timeout: float = SERVE_REQUEST_TIMEOUT
+    ) -> Any:
+        """Send a request to ``bw serve`` and return the ``data`` member.
+
+        ``OSError`` and ``http.client.HTTPException`` are raised when the server
+        cannot be reached so callers can fall back to the subprocess path.
+        ``None`` is returned when the server reports a failed command.
+        """
+        conn = self._serve_connection(timeout)
         try:
-            with urllib.request.urlopen(url) as resp:
-                _avatar_data = resp.read()
-                return _avatar_data
-        except Exception as exc:  # pragma: no cover - network failures
-            logging.error("Failed to fetch avatar: %s", exc)
-    placeholder_key = name or email
-    if placeholder_key:
-        _avatar_data = _generate_placeholder_avatar(placeholder_key)
-        return _avatar_data
-    return None
+            conn.request(method, path, headers={"Accept": "application/json"})
+            resp = conn.getresponse()
+            body = resp.read()
+        finally:
+            conn.close()
+        try:
+            payload = json.loads(body) if body else {}
+        except json.JSONDecodeError as exc:
+            logging.error("Failed to parse bw serve output: %s", exc)
+            return None
+        if not payload.get("success"):
+            logging.error("bw serve %s %s failed: %s", method, path, payload.get("message"))
+            return None
+        return payload.get("data")
 
+    def _start_serve(self) -> bool:
+        """Start ``bw serve`` for the current session and wait until it answers."""
+        self._stop_serve()
+        with self._lock:
+            session = self._session
+            config_dir = self._config_dir
+        if not (session and config_dir):
+            return False
+        if settings.get_bool("bw_serve_socket", True):
+            # The config directory is private to this user so the socket is too
+            address = "unix:" + os.path.join(config_dir, "bw-serve.sock")
+            hostname_args = ["--hostname", address]
+        else:
+            port = _free_port()
+            address = f"127.0.0.1:{port}"
+            hostname_args = ["--hostname", "127.0.0.1", "--port", str(port)]
+        try:
+            proc = subprocess.Popen(
+                ["bw", "serve", *hostname_args],
+                env=self._bw_env(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            logging.error("bw CLI not found")
+            return False
+        with self._lock:
+            self._serve_proc = proc
+            self._serve_address = address
+        start = time.perf_counter()
+        deadline = time.monotonic() + SERVE_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                logging.error("bw serve exited with status %s", proc.returncode)
+                break
+            try:
+                self._serve_request("GET", "/status", timeout=1.0)
+            except (OSError, http.client.HTTPException):
+                time.sleep(0.05)
+                continue
+            logging.debug(
+                "bw serve ready on %s after %.3fs", address, time.perf_counter() - start
+            )
+            return True
+        else:
+            logging.error("bw serve did not start within %ss", SERVE_START_TIMEOUT)
+        self._stop_serve()
+        return False
 
-def _get_ssh_folder_id() -> Optional[str]:
-    data = _run_bw(["list", "folders"])
-    if not data:
-        return None
-    for folder in data:
-        if folder.get("name") == "SSH":
-            return folder.get("id")
-    return None
+    def _stop_serve(self) -> None:
+        """Terminate the ``bw serve`` process if one is running."""
+        with self._lock:
+            proc = self._serve_proc
+            self._serve_proc = None
+            self._serve_address = None
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
 
+    def _serve_running(self) -> bool:
+        with self._lock:
+            proc = self._serve_proc
+        return proc is not None and proc.poll() is None
 
-def fetch_credentials(item: str) -> Optional[dict[str, Any]]:
-    """Fetch connection configuration from a Bitwarden item."""
-    if not is_unlocked():
-        return None
-    data = _run_bw(["get", "item", item])
-    if not data:
-        return None
-    notes = data.get("notes") or data.get("notesPlain", "")
-    if not notes:
-        return None
-    try:
-        return json.loads(notes)
-    except json.JSONDecodeError as exc:
-        logging.error("Config in Bitwarden notes is invalid JSON: %s", exc)
+    def _run_bw_serve(self, args: List[str], parse_json: bool) -> Any:
+        """Run a command through ``bw serve``.
+
+        Returns ``_NOT_SERVED`` when the command has no REST equivalent or the
+        server is unreachable so the caller can spawn the CLI instead.
+        """
+        if not self._serve_running():
+            return _NOT_SERVED
+        route = _serve_route(args)
+        if route is None:
+            return _NOT_SERVED
+        try:
+            data = self._serve_request(*route)
+        except (OSError, http.client.HTTPException) as exc:
+            logging.error("bw serve request failed, using CLI: %s", exc)
+            return _NOT_SERVED
+        if data is None:
+            return None
+        kind = data.get("object") if isinstance(data, dict) else None
+        if kind == "list":
+            return data.get("data", [])
+        if kind == "template":
+            return data.get("template")
+        if kind == "message":
+            return data.get("title") if not parse_json else data
+        return data
+
+    # CLI subprocesses
+
+    def _spawn(
+        self, args: List[str], env: dict[str, str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        """Run ``bw`` and wait at most ``timeout`` seconds for it.
+
+        The child is killed when the deadline passes (``TimeoutExpired`` is
+        raised) or when :meth:`cancel` is called.
+        """
+        if timeout is None:
+            timeout = settings.get_float("bw_timeout", 60.0)
+        proc = subprocess.Popen(
+            ["bw", *args],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        with self._children_lock:
+            self._children.add(proc)
+        try:
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                stdout, stderr = proc.communicate()
+                raise subprocess.TimeoutExpired(proc.args, timeout, stdout, stderr)
+        finally:
+            with self._children_lock:
+                self._children.discard(proc)
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args, stdout, stderr)
+        return subprocess.CompletedProcess(proc.args, 0, stdout, stderr)
+
+    def cancel(self) -> None:
+        """Kill running ``bw`` commands and abort pending retries."""
+        with self._cancel_cond:
+            self._cancel_gen += 1
+            self._cancel_cond.notify_all()
+        with self._children_lock:
+            procs = list(self._children)
+        for proc in procs:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def _wait(self, delay: float, generation: int) -> bool:
+        """Sleep for ``delay`` seconds; return ``False`` if cancelled meanwhile."""
+        with self._cancel_cond:
+            self._cancel_cond.wait_for(lambda: self._cancel_gen != generation, timeout=delay)
+            return self._cancel_gen == generation
+
+    def _run_bw(self, args: List[str], parse_json: bool = True) -> Any:
+        """Run a Bitwarden CLI command and return the parsed output."""
+        generation = self._cancel_gen
+        retries = settings.get_int("bw_retries", 2) if args[0] in _IDEMPOTENT else 0
+        delays = backoff_delays(retries)
+        while True:
+            if not self._breaker.allow():
+                error = (
+                    f"Vault server unavailable, retrying in {self._breaker.retry_in():.0f}s"
+                )
+                self._set_error(error)
+                logging.warning("bw %s skipped: %s", args[0], error)
+                return None
+            outcome, result = self._run_bw_once(args, parse_json)
+            if outcome == _OK:
+                self._breaker.record_success()
+                return result
+            if outcome == _CANCELLED:
+                self._breaker.abandon()
+                return None
+            delay = next(delays, None)
+            if delay is None or self._cancel_gen != generation:
+                # One failure per call, however often it was attempted
+                self._breaker.record_failure()
+                return None
+            logging.info("Retrying bw %s in %.1fs", args[0], delay)
+            if not self._wait(delay, generation):
+                self._breaker.abandon()
+                return None
+
+    def _run_bw_once(self, args: List[str], parse_json: bool) -> tuple[str, Any]:
+        start = time.perf_counter()
+        result = self._run_bw_serve(args, parse_json)
+        if result is not _NOT_SERVED:
+            logging.debug("bw %s via serve took %.3fs", " ".join(args[:2]), time.perf_counter() - start)
+            return _OK, result
+        outcome, result = self._run_bw_process(args, parse_json)
+        logging.debug("bw %s via CLI took %.3fs", " ".join(args[:2]), time.perf_counter() - start)
+        return outcome, result
+
+    def _run_bw_process(self, args: List[str], parse_json: bool) -> tuple[str, Any]:
+        """Spawn the ``bw`` CLI for ``args`` and return its parsed output.
+
+        The first element of the result is ``_UNHEALTHY`` only when the
+        command timed out or the server could not be reached; errors such as
+        a missing item or a wrong password do not count against the circuit
+        breaker and are not retried.
+        """
+        env = self._bw_env()
+        try:
+            result = self._spawn(args, env)
+        except FileNotFoundError:
+            self._set_error("bw CLI not found")
+            logging.error("bw CLI not found")
+            return _OK, None
+        except subprocess.TimeoutExpired as exc:
+            error = f"bw {args[0]} timed out after {exc.timeout:g}s"
+            self._set_error(error)
+            logging.error(error)
+            return _UNHEALTHY, None
+        except subprocess.CalledProcessError as exc:
+            if exc.returncode < 0:
+                self._set_error("Cancelled")
+                logging.info("bw %s cancelled", args[0])
+                return _CANCELLED, None
+            error = (exc.stderr or "").strip() or f"bw {args[0]} failed"
+            self._set_error(error)
+            logging.error("bw command failed: %s", error)
+            return (_UNHEALTHY if _is_transport_error(error) else _OK), None
+        output = result.stdout.strip()
+        if parse_json:
+            try:
+                return _OK, json.loads(output) if output else None
+            except json.JSONDecodeError as exc:
+                logging.error("Failed to parse bw output: %s", exc)
+                return _OK, None
+        return _OK, output
+
+    def _stream_bw(self, args: List[str]) -> Iterator[Any]:
+        """Run ``bw`` and yield the elements of its JSON array output one by one.
+
+        Unlike :meth:`_run_bw` the output is never held in memory as a whole.
+        """
+        start = time.perf_counter()
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                proc = subprocess.Popen(
+                    ["bw", *args],
+                    env=self._bw_env(),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr,
+                )
+            except FileNotFoundError as exc:
+                raise _StreamError("bw CLI not found") from exc
+            timeout = settings.get_float("bw_timeout", 60.0)
+            timed_out = threading.Event()
+
+            def expire() -> None:
+                timed_out.set()
+                proc.kill()
+
+            # Killing the child ends the blocking read with EOF
+            watchdog = threading.Timer(timeout, expire)
+            watchdog.daemon = True
+            watchdog.start()
+            with self._children_lock:
+                self._children.add(proc)
+            try:
+                assert proc.stdout is not None
+                yield from _iter_json_array(proc.stdout)
+            finally:
+                watchdog.cancel()
+                with self._children_lock:
+                    self._children.discard(proc)
+                proc.stdout.close()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            if proc.returncode and proc.returncode < 0:
+                if timed_out.is_set():
+                    raise _StreamError(f"bw {args[0]} timed out after {timeout:g}s", _UNHEALTHY)
+                raise _StreamError(f"bw {args[0]} was cancelled", _CANCELLED)
+            if proc.returncode:
+                stderr.seek(0)
+                error = stderr.read().decode(errors="replace").strip() or "bw command failed"
+                raise _StreamError(error, _UNHEALTHY if _is_transport_error(error) else _OK)
+        logging.debug("bw %s streamed via CLI in %.3fs", " ".join(args[:2]), time.perf_counter() - start)
+
+    # Login
+
+    def login(
+        self,
+        email: str,
+        password: str,
+        server: str | None = None,
+        device_name: str | None = None,
+        device_identifier: str | None = None,
+    ) -> bool:
+        """Authenticate using the Bitwarden CLI."""
+        with self._op_lock:
+            return self._login(email, password, server, device_name, device_identifier)
+
+    def _login(
+        self,
+        email: str,
+        password: str,
+        server: str | None,
+        device_name: str | None,
+        device_identifier: str | None,
+    ) -> bool:
+        with self._lock:
+            self._last_error = None
+            self._session = None
+            self._native = None
+            self._conn_cache.clear()
+            self._revision = None
+            self._server_url = None
+            self._user_email = None
+            self._user_id = None
+            self._user_name = None
+            self._avatar_data = None
+            self._sync_pending = False
+            self._last_connections = []
+        self._breaker.reset()
+
+        self._stop_serve()
+        if not email or not password:
+            self._set_error("Email and password are required")
+            return False
+
+        if settings.get_str("bw_backend", "cli") == "native":
+            return self._login_native(email, password, server, device_name, device_identifier)
+
+        persistent = settings.get_bool("bw_persist", False)
+        # Use a separate config directory so the user's bw CLI state is untouched
+        with self._lock:
+            old_dir = None if self._config_persistent else self._config_dir
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        if persistent:
+            # Kept between launches so later logins only need ``bw unlock``
+            config_dir = _profile_dir(email, server)
+            os.makedirs(config_dir, mode=0o700, exist_ok=True)
+        else:
+            config_dir = tempfile.mkdtemp(prefix="sshmanager_bw_")
+        with self._lock:
+            self._config_dir = config_dir
+            self._config_persistent = persistent
+
+        # Use a clean environment when invoking the CLI to avoid interfering with
+        # any active command line sessions, but do not modify this process
+        # environment so embedded terminals can continue using the user's session.
+
+        env = os.environ.copy()
+        # Ensure any existing session token from the user's shell is ignored so the
+        # application remains isolated from command line usage.
+        env.pop("BW_SESSION", None)
+        env.pop("BW_SERVER", None)
+        env["BITWARDENCLI_APPDATA_DIR"] = config_dir
+        start = time.perf_counter()
+        info = None
+        if persistent and os.path.exists(os.path.join(config_dir, "data.json")):
+            info = self._profile_status(env, email)
+        if info is not None:
+            mode = "warm"
+            if not self._unlock(env, password):
+                return False
+        else:
+            mode = "cold"
+            if not self._full_login(env, email, password, server):
+                return False
+
+        if settings.get_str("bw_backend", "cli") == "serve":
+            # Subsequent commands go through one long-lived process; the CLI path
+            # stays in place as a fallback when it cannot be started.
+            self._start_serve()
+
+        if mode == "cold":
+            # Initial sync to ensure items are available
+            self._run_bw(["sync"], parse_json=False)
+            # Retrieve user information for avatar support
+            info = self._run_bw(["status"])
+        else:
+            # The vault cached in the profile is usable right away; the sync is
+            # left to the background scheduler
+            with self._lock:
+                self._sync_pending = True
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if isinstance(info, dict):
+                self._server_url = info.get("serverUrl") or server
+                self._user_email = info.get("userEmail")
+                self._user_id = info.get("userId")
+                self._user_name = (
+                    info.get("userName")
+                    or info.get("name")
+                    or info.get("profileName")
+                )
+            self._login_stats = {"mode": mode, "seconds": elapsed}
+        logging.info("Bitwarden %s login of %s took %.2fs", mode, email, elapsed)
+        return True
+
+    def _profile_status(self, env: dict[str, str], email: str) -> Optional[dict[str, Any]]:
+        """Return ``bw status`` of a persistent profile logged in as ``email``."""
+        try:
+            result = self._spawn(["status"], env)
+            info = json.loads(result.stdout)
+        except (OSError, subprocess.SubprocessError, json.JSONDecodeError):
+            return None
+        if not isinstance(info, dict) or info.get("status") not in ("locked", "unlocked"):
+            return None
+        if (info.get("userEmail") or "").lower() != email.strip().lower():
+            return None
+        return info
+
+    def _login_command(
+        self, args: List[str], env: dict[str, str], failure: str
+    ) -> Optional[str]:
+        """Run a login step and return its output, setting the last error on failure."""
+        try:
+            result = self._spawn(args, env, settings.get_float("bw_login_timeout", 120.0))
+        except FileNotFoundError:
+            error = "bw CLI not found"
+        except subprocess.TimeoutExpired as exc:
+            error = f"bw {args[0]} timed out after {exc.timeout:g}s"
+        except subprocess.CalledProcessError as exc:
+            if exc.returncode < 0:
+                error = "Cancelled"
+            else:
+                error = (exc.stderr or "").strip() or failure
+        else:
+            return result.stdout.strip()
+        self._set_error(error)
+        logging.error("bw %s failed: %s", args[0], error)
         return None
 
+    def _unlock(self, env: dict[str, str], password: str) -> bool:
+        """Unlock an already logged in profile and store the session key."""
+        unlock_env = dict(env, SSHMANAGER_BW_PASSWORD=password)
+        session = self._login_command(
+            ["unlock", "--passwordenv", "SSHMANAGER_BW_PASSWORD", "--raw"],
+            unlock_env,
+            "Bitwarden unlock failed",
+        )
+        if session is None:
+            return False
+        with self._lock:
+            self._session = session
+        return True
+
+    def _full_login(
+        self, env: dict[str, str], email: str, password: str, server: str | None
+    ) -> bool:
+        """Configure the server and log in, storing the session key."""
+        if server and self._login_command(
+            ["config", "server", server], env, "Failed to set server"
+        ) is None:
+            return False
+        session = self._login_command(
+            ["login", email, password, "--raw"], env, "Bitwarden login failed"
+        )
+        if session is None:
+            return False
+        with self._lock:
+            self._session = session
+        return True
+
+    def _login_native(
+        self,
+        email: str,
+        password: str,
+        server: str | None,
+        device_name: str | None,
+        device_identifier: str | None,
+    ) -> bool:
+        """Authenticate with the in-process client instead of the CLI."""
+        from .vault_client import VaultClient
+
+        client = VaultClient(server, device_name, device_identifier)
+        if not client.login(email, password):
+            self._set_error(client.last_error or "Bitwarden login failed")
+            return False
+        profile = client.profile
+        with self._lock:
+            self._native = client
+            self._session = client.access_token
+            self._server_url = client.server
+            self._user_email = profile.get("email") or profile.get("Email") or email
+            self._user_id = profile.get("id") or profile.get("Id")
+            self._user_name = profile.get("name") or profile.get("Name")
+        return True
 
-def list_connections() -> List[Connection]:
-    """Return all connections stored in the ``SSH`` folder."""
-    conns: List[Connection] = []
-    if not is_unlocked():
-        return conns
-    folder_id = _get_ssh_folder_id()
-    if folder_id is None:
-        logging.error("Bitwarden folder 'SSH' not found")
-        return conns
-    data = _run_bw(["list", "items", "--folderid", folder_id])
-    if not data:
-        return conns
-    for item in data:
-        login_data = item.get("login", {})
-        username = login_data.get("username")
-        uris = login_data.get("uris") or []
-        uri = uris[0].get("uri") if uris else None
-        if not (username and uri):
-            continue
-        label = item.get("name") or username
-        conns.append(Connection(label=label, host=uri, username=username))
-    return conns
-
-
-def sync() -> Any:
-    """Perform a Bitwarden sync using the CLI."""
-    if not is_unlocked():
+    # State
+
+    def needs_sync(self) -> bool:
+        """Return ``True`` when the vault was unlocked from a cached profile."""
+        with self._lock:
+            return self._sync_pending
+
+    def login_stats(self) -> dict[str, Any]:
+        """Return the mode (``cold``/``warm``) and duration of the last login."""
+        with self._lock:
+            return dict(self._login_stats)
+
+    def get_status(self) -> str:
+        """Return ``"unlocked"`` if a session is available."""
+        return "unlocked" if self.is_unlocked() else "unauthenticated"
+
+    def is_unlocked(self) -> bool:
+        with self._lock:
+            return self._session is not None
+
+    def get_last_error(self) -> Optional[str]:
+        with self._lock:
+            return self._last_error
+
+    def user_info(self) -> Optional[dict[str, str]]:
+        """Return server URL, email, user id and name when logged in."""
+        with self._lock:
+            if self._session is None:
+                return None
+            return {
+                "server": self._server_url or "",
+                "email": self._user_email or "",
+                "user_id": self._user_id or "",
+                "name": self._user_name or "",
+            }
+
+    def fetch_avatar(self) -> Optional[bytes]:
+        """Download the user's profile image if available.
+
+        The request gives up after ``SSHMANAGER_AVATAR_TIMEOUT`` seconds (5 by
+        default) and images are revalidated against an on-disk cache. If no
+        image can be retrieved, a placeholder avatar is generated from the
+        user's name when available, otherwise the email address.
+        """
+        with self._lock:
+            if self._avatar_data is not None:
+                return self._avatar_data
+        info = self.user_info()
+        if not info:
+            return None
+        email = info.get("email", "")
+        name = info.get("name")
+        server = info.get("server")
+        user_id = info.get("user_id")
+        data = None
+        if server and user_id:
+            data = avatar.fetch(
+                server,
+                user_id,
+                settings.get_float("avatar_timeout", 5.0),
+                # Off by default: nothing but the keyring is written unasked
+                cache=settings.get_bool("avatar_cache", False),
+            )
+        placeholder_key = name or email
+        if data is None and placeholder_key:
+            data = _generate_placeholder_avatar(placeholder_key)
+        with self._lock:
+            self._avatar_data = data
+        return data
+
+    # Vault access
+
+    @staticmethod
+    def _ssh_folder_id(folders: List[dict[str, Any]]) -> Optional[str]:
+        for folder in folders:
+            if folder.get("name") == "SSH":
+                return folder.get("id")
         return None
-    return _run_bw(["sync"])
-
-
-def logout() -> None:
-    """Clear the current session and temporary config."""
-    global _session, _config_dir, _server_url, _user_email, _user_id, _user_name, _avatar_data
-    _session = None
-    _server_url = None
-    _user_email = None
-    _user_id = None
-    _user_name = None
-    _avatar_data = None
-    if _config_dir:
-        shutil.rmtree(_config_dir, ignore_errors=True)
-        _config_dir = None
+
+    def fetch_credentials(self, item: str) -> Optional[dict[str, Any]]:
+        """Fetch connection configuration from a Bitwarden item."""
+        if not self.is_unlocked():
+            return None
+        with self._op_lock:
+            if self._native is not None:
+                return self._native.fetch_credentials(item)
+            if item in self._conn_cache:
+                # Notes were already read by the last ``list items`` call
+                return self._conn_cache.config(item)
+            data = self._run_bw(["get", "item", item])
+        if not data:
+            return None
+        return notes_config(data)
+
+    def list_connections(self) -> List[Connection]:
+        """Return all connections stored in the ``SSH`` folder.
+
+        Port, folder, key and initial command are read from the notes returned
+        by the same ``list items`` call, so no per-item ``get item`` is needed.
+        While the circuit breaker is open the last known list is returned.
+        """
+        if not self.is_unlocked():
+            return []
+        with self._op_lock:
+            conns = self._list_connections()
+        if conns is None:
+            with self._lock:
+                return list(self._last_connections)
+        with self._lock:
+            self._last_connections = conns
+            if self._native is not None:
+                self._revision = self._native.revision
+            else:
+                self._revision = self._conn_cache.revision
+        return list(conns)
+
+    def _list_connections(self) -> Optional[List[Connection]]:
+        """List connections; ``None`` means the last known list should be used.
+
+        Any failed ``bw`` command gives ``None``, so one transient error does
+        not empty the sidebar or the snapshot. An empty list means the vault
+        was read and has no ``SSH`` folder or no items in it.
+        """
+        if self._native is not None:
+            return self._native.list_connections()
+        if self._breaker.is_open():
+            logging.warning("Vault server unhealthy, using last known connections")
+            return None
+        folders = self._run_bw(["list", "folders"])
+        if folders is None:
+            logging.warning("bw list folders failed, using last known connections")
+            return None
+        folder_id = self._ssh_folder_id(folders)
+        if folder_id is None:
+            logging.error("Bitwarden folder 'SSH' not found")
+            return []
+        args = ["list", "items", "--folderid", folder_id]
+        if not self._serve_running() and settings.get_bool("bw_stream", True):
+            # Build connections item by item instead of holding the whole
+            # output as bytes, text and parsed list at once
+            try:
+                conns = self._conn_cache.connections(self._stream_bw(args))
+            except _StreamError as exc:
+                logging.error("bw list items failed: %s", exc)
+                if exc.outcome == _UNHEALTHY:
+                    self._breaker.record_failure()
+                elif exc.outcome == _CANCELLED:
+                    self._breaker.abandon()
+                else:
+                    self._breaker.record_success()
+                return None
+            self._breaker.record_success()
+            return conns
+        data = self._run_bw(args)
+        if data is None:
+            logging.warning("bw list items failed, using last known connections")
+            return None
+        if not data:
+            return []
+        return self._conn_cache.connections(data)
+
+    def vault_revision(self) -> Optional[str]:
+        """Return a digest identifying the state of the last connection listing."""
+        with self._lock:
+            return self._revision
+
+    def sync(self) -> Any:
+        """Perform a Bitwarden sync using the CLI."""
+        if not self.is_unlocked():
+            return None
+        with self._op_lock:
+            if self._native is not None:
+                from .vault_client import VaultError
+
+                try:
+                    return self._native.sync()
+                except VaultError as exc:
+                    logging.error("Native vault sync failed: %s", exc)
+                    return None
+            # ``bw sync`` prints a plain message rather than JSON
+            result = self._run_bw(["sync"], parse_json=False)
+        if result is not None:
+            with self._lock:
+                self._sync_pending = False
+        return result
+
+    def remote_revision(self) -> Optional[str]:
+        """Return the server-side vault revision if it can be queried cheaply.
+
+        Only the native backend can ask the server without a full sync; ``None``
+        means the revision is unknown and a sync is needed to detect changes.
+        """
+        with self._lock:
+            native = self._native if self._session is not None else None
+        if native is None:
+            return None
+        from .vault_client import VaultError
+
+        try:
+            return native.revision_date()
+        except VaultError as exc:
+            logging.error("Failed to query vault revision: %s", exc)
+            return None
+
+    def logout(self) -> None:
+        """Clear the current session and temporary config.
+
+        A persistent profile is logged out with ``bw logout`` and removed too, so
+        the next login starts from scratch.
+        """
+        # Abort a running load instead of waiting for it
+        self.cancel()
+        with self._op_lock:
+            with self._lock:
+                cli_profile = (
+                    self._config_persistent and self._session and self._native is None
+                )
+            if cli_profile:
+                self._run_bw(["logout"], parse_json=False)
+            with self._lock:
+                native = self._native
+                self._native = None
+                self._session = None
+                self._sync_pending = False
+                self._last_connections = []
+                self._conn_cache.clear()
+                self._revision = None
+                self._server_url = None
+                self._user_email = None
+                self._user_id = None
+                self._user_name = None
+                self._avatar_data = None
+            self._breaker.reset()
+            if native is not None:
+                native.logout()
+            self._stop_serve()
+            with self._lock:
+                config_dir = self._config_dir
+                self._config_dir = None
+                self._config_persistent = False
+            if config_dir:
+                shutil.rmtree(config_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        """Stop helper processes and remove a temporary config directory.
+
+        Unlike :meth:`logout` a persistent profile is kept for the next launch.
+        """
+        self._stop_serve()
+        with self._lock:
+            config_dir = None if self._config_persistent else self._config_dir
+            if config_dir:
+                self._config_dir = None
+        if config_dir:
+            shutil.rmtree(config_dir, ignore_errors=True)
+
+
+# Client used by the module-level functions below
+default_client = BitwardenClient()
+
+login = default_client.login
+logout = default_client.logout
+cancel = default_client.cancel
+needs_sync = default_client.needs_sync
+login_stats = default_client.login_stats
+get_status = default_client.get_status
+is_unlocked = default_client.is_unlocked
+get_last_error = default_client.get_last_error
+user_info = default_client.user_info
+fetch_avatar = default_client.fetch_avatar
+fetch_credentials = default_client.fetch_credentials
+list_connections = default_client.list_connections
+vault_revision = default_client.vault_revision
+sync = default_client.sync
+remote_revision = default_client.remote_revision
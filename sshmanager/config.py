@@ -1,10 +1,13 @@
+from __future__ import annotations
+
 from .models import Config
-from .bitwarden import list_connections
+from . import bitwarden
 
 
-def load_config() -> Config:
+def load_config(client: bitwarden.BitwardenClient | None = None) -> Config:
     """Load connections directly from Bitwarden."""
-    return Config(connections=list_connections())
+    client = client or bitwarden.default_client
+    return Config(connections=client.list_connections())
 
 
 def save_config(config: Config) -> None:
@@ -0,0 +1,144 @@
+"""Conversion of Bitwarden vault items into SSH Manager objects.
+
+Items use the JSON shape printed by ``bw list items``/``bw get item`` no
+matter which backend produced them. The item's login username and first URI
+provide the defaults; a JSON object in the notes may override any connection
+field, e.g. ``{"port": 2222, "folder": "Work", "key_path": "~/.ssh/id_work"}``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Iterable, List, Optional
+
+from .models import Connection
+
+# Connection fields that may be set from the notes JSON
+_STR_FIELDS = (
+    "label", "host", "username", "folder", "key_path", "initial_cmd", "proxy_jump"
+)
+
+
+def notes_config(item: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Return the JSON connection config stored in the item's notes."""
+    notes = item.get("notes") or item.get("notesPlain", "")
+    if not notes:
+        return None
+    try:
+        return json.loads(notes)
+    except json.JSONDecodeError as exc:
+        logging.error("Config in Bitwarden notes is invalid JSON: %s", exc)
+        return None
+
+
+def _validated_fields(config: dict[str, Any], name: str) -> dict[str, Any]:
+    """Return the connection fields in ``config`` that have valid values."""
+    fields: dict[str, Any] = {}
+    for key in _STR_FIELDS:
+        value = config.get(key)
+        if value is None:
+            continue
+        if isinstance(value, str) and value.strip():
+            fields[key] = value.strip()
+        else:
+            logging.error("Ignoring invalid %r in config of %s", key, name)
+    port = config.get("port")
+    if port is not None:
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = 0
+        if 0 < port < 65536:
+            fields["port"] = port
+        else:
+            logging.error("Ignoring invalid port in config of %s", name)
+    return fields
+
+
+def connection_from_item(
+    item: dict[str, Any], config: Optional[dict[str, Any]] = None
+) -> Optional[Connection]:
+    """Build a complete connection from an item and its notes config.
+
+    ``config`` is the already parsed notes JSON; it is read from the item
+    when omitted. ``None`` is returned when no username or host is known.
+    """
+    login_data = item.get("login") or {}
+    uris = login_data.get("uris") or []
+    fields: dict[str, Any] = {
+        "username": login_data.get("username"),
+        "host": uris[0].get("uri") if uris else None,
+    }
+    if config is None:
+        config = notes_config(item)
+    if isinstance(config, dict):
+        fields.update(_validated_fields(config, item.get("name") or item.get("id")))
+    if not (fields["username"] and fields["host"]):
+        return None
+    fields.setdefault("label", item.get("name") or fields["username"])
+    return Connection(item_id=item.get("id"), **fields)
+
+
+class ConnectionCache:
+    """Parsed connections keyed by item id and ``revisionDate``.
+
+    Items whose revision did not change since the last listing are not
+    parsed or validated again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[
+            str, tuple[str, Optional[Connection], Optional[dict[str, Any]]]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+        # Digest of the ids and revisions of the last listing
+        self.revision: Optional[str] = None
+
+    def _entry(self, item: dict[str, Any]):
+        item_id = item.get("id")
+        revision = item.get("revisionDate")
+        if not (item_id and revision):
+            config = notes_config(item)
+            return connection_from_item(item, config), config
+        cached = self._entries.get(item_id)
+        if cached is not None and cached[0] == revision:
+            self.hits += 1
+            return cached[1], cached[2]
+        self.misses += 1
+        config = notes_config(item)
+        conn = connection_from_item(item, config)
+        self._entries[item_id] = (revision, conn, config)
+        return conn, config
+
+    def connections(self, items: Iterable[dict[str, Any]]) -> List[Connection]:
+        """Return connections for ``items`` and drop entries no longer listed."""
+        conns: List[Connection] = []
+        seen: set[str] = set()
+        revisions: List[str] = []
+        for item in items:
+            if item.get("id"):
+                seen.add(item["id"])
+                revisions.append(f"{item['id']}:{item.get('revisionDate')}")
+            conn, _ = self._entry(item)
+            if conn is not None:
+                conns.append(conn)
+        for item_id in self._entries.keys() - seen:
+            del self._entries[item_id]
+        revisions.sort()
+        self.revision = hashlib.sha256("\n".join(revisions).encode()).hexdigest()
+        return conns
+
+    def config(self, item_id: str) -> Optional[dict[str, Any]]:
+        """Return the cached notes config for ``item_id`` if it is known."""
+        cached = self._entries.get(item_id)
+        return cached[2] if cached is not None else None
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._entries
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.revision = None
@@ -1,8 +1,9 @@
-from dataclasses import dataclass, asdict
-from typing import List
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Any, Iterable, Iterator, List
 
 
-@dataclass
+@dataclass(slots=True)
 class Connection:
     label: str
     host: str
@@ -11,16 +12,220 @@ class Connection:
     folder: str = "Default"
     key_path: str | None = None
     initial_cmd: str | None = None
+    item_id: str | None = None
+    # ProxyJump chain, e.g. ``bastion`` or ``user@jump1,jump2:2222``
+    proxy_jump: str | None = None
+
+
+FIELDS = tuple(f.name for f in fields(Connection))
+_MISSING = object()
+
+
+# Interns the fields whose values repeat across many connections
+def _intern(conn: Connection, intern=sys.intern) -> Connection:
+    conn.username = intern(conn.username)
+    conn.folder = intern(conn.folder)
+    if conn.key_path is not None:
+        conn.key_path = intern(conn.key_path)
+    if conn.initial_cmd is not None:
+        conn.initial_cmd = intern(conn.initial_cmd)
+    if conn.proxy_jump is not None:
+        conn.proxy_jump = intern(conn.proxy_jump)
+    return conn
+
+
+class ConnectionStore:
+    """Connections indexed by item id, label, host and folder.
+
+    Iteration follows insertion order; replacing an item keeps its position.
+    Stored connections must not be modified in place, since the indexes
+    would go stale. Use :meth:`upsert` instead. Connections without an
+    ``item_id`` (created locally) get an internal key and are never replaced.
+    """
+
+    __slots__ = ("_items", "_by_label", "_by_host", "_by_folder", "_next_local")
+
+    def __init__(self, connections: Iterable[Connection] = ()) -> None:
+        self._items: dict[Any, Connection] = {}
+        # Index value -> key into _items, or a dict of key -> connection once
+        # a second connection shares the value. Most labels and hosts are
+        # unique, so this avoids a small dict per connection.
+        self._by_label: dict[str, Any] = {}
+        self._by_host: dict[str, Any] = {}
+        self._by_folder: dict[str, Any] = {}
+        self._next_local = 0
+        for conn in connections:
+            self.upsert(conn)
+
+    def _add_key(self, index: dict[str, Any], value: str, key: Any, conn: Connection) -> None:
+        current = index.setdefault(value, key)
+        if current is key:
+            return
+        if type(current) is dict:
+            current[key] = conn
+        else:
+            index[value] = {current: self._items[current], key: conn}
+
+    @staticmethod
+    def _remove_key(index: dict[str, Any], value: str, key: Any) -> None:
+        current = index[value]
+        if type(current) is not dict:
+            del index[value]
+            return
+        del current[key]
+        if len(current) == 1:
+            index[value] = next(iter(current))
+
+    def _lookup(self, index: dict[str, Any], value: str) -> List[Connection]:
+        current = index.get(value, _MISSING)
+        if current is _MISSING:
+            return []
+        if type(current) is dict:
+            return list(current.values())
+        return [self._items[current]]
+
+    def _index(self, key: Any, conn: Connection) -> None:
+        self._add_key(self._by_label, conn.label, key, conn)
+        self._add_key(self._by_host, conn.host, key, conn)
+        self._add_key(self._by_folder, conn.folder, key, conn)
+
+    def _unindex(self, key: Any, conn: Connection) -> None:
+        self._remove_key(self._by_label, conn.label, key)
+        self._remove_key(self._by_host, conn.host, key)
+        self._remove_key(self._by_folder, conn.folder, key)
+
+    def upsert(self, conn: Connection) -> Connection | None:
+        """Add or replace a connection and return the one it replaced."""
+        key = conn.item_id
+        if key is None:
+            key = self._next_local
+            self._next_local += 1
+        previous = self._items.get(key)
+        if previous is not None:
+            self._unindex(key, previous)
+        self._items[key] = _intern(conn)
+        self._index(key, conn)
+        return previous
+
+    add = upsert
+
+    def remove(self, item_id: str) -> Connection | None:
+        """Remove the connection of a vault item and return it."""
+        conn = self._items.pop(item_id, None)
+        if conn is not None:
+            self._unindex(item_id, conn)
+        return conn
+
+    def get(self, item_id: str) -> Connection | None:
+        return self._items.get(item_id)
+
+    def by_label(self, label: str) -> List[Connection]:
+        return self._lookup(self._by_label, label)
+
+    def by_host(self, host: str) -> List[Connection]:
+        return self._lookup(self._by_host, host)
+
+    def by_folder(self, folder: str) -> List[Connection]:
+        return self._lookup(self._by_folder, folder)
+
+    def folders(self) -> List[str]:
+        """Return folder names in order of their first connection."""
+        return list(self._by_folder)
+
+    def grouped(self) -> dict[str, List[Connection]]:
+        """Return the connections of each folder."""
+        items = self._items
+        return {
+            folder: list(keys.values()) if type(keys) is dict else [items[keys]]
+            for folder, keys in self._by_folder.items()
+        }
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._by_label.clear()
+        self._by_host.clear()
+        self._by_folder.clear()
+
+    def to_rows(self) -> List[list]:
+        """Return one list of values per connection in :data:`FIELDS` order."""
+        return [[getattr(c, name) for name in FIELDS] for c in self._items.values()]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[Any]], names: Iterable[str] = FIELDS):
+        """Build a store from rows of values for the fields ``names``."""
+        names = tuple(names)
+        store = cls()
+        if names == FIELDS:
+            for row in rows:
+                store.upsert(Connection(*row))
+            return store
+        # Written by another version; unknown fields are dropped
+        known = [(i, name) for i, name in enumerate(names) if name in FIELDS]
+        for row in rows:
+            store.upsert(Connection(**{name: row[i] for i, name in known}))
+        return store
+
+    def __iter__(self) -> Iterator[Connection]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._items
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ConnectionStore):
+            return list(self) == list(other)
+        return NotImplemented
 
 
 @dataclass
 class Config:
-    connections: List[Connection]
+    connections: ConnectionStore
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.connections, ConnectionStore):
+            self.connections = ConnectionStore(self.connections)
 
     def to_dict(self):
-        return {"connections": [asdict(c) for c in self.connections]}
+        return {
+            "connections": [
+                {name: getattr(c, name) for name in FIELDS} for c in self.connections
+            ]
+        }
 
     @staticmethod
     def from_dict(data: dict) -> "Config":
         connections = [Connection(**c) for c in data.get("connections", [])]
         return Config(connections)
+
+
+@dataclass
+class ConnectionDiff:
+    """Changes between two connection lists keyed by Bitwarden item id."""
+
+    added: List[Connection] = field(default_factory=list)
+    removed: List[Connection] = field(default_factory=list)
+    # Pairs of (old, new) connections for the same item
+    modified: List[tuple[Connection, Connection]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def diff_connections(
+    old: Iterable[Connection], new: Iterable[Connection]
+) -> ConnectionDiff:
+    """Compare vault connections; entries without an ``item_id`` are ignored."""
+    before = {c.item_id: c for c in old if c.item_id}
+    after = {c.item_id: c for c in new if c.item_id}
+    diff = ConnectionDiff()
+    for item_id, conn in after.items():
+        previous = before.get(item_id)
+        if previous is None:
+            diff.added.append(conn)
+        elif previous != conn:
+            diff.modified.append((previous, conn))
+    diff.removed = [c for item_id, c in before.items() if item_id not in after]
+    return diff
@@ -0,0 +1,190 @@
+"""Reachability and round-trip time of connection hosts.
+
+Each host and port is probed with a TCP connect and, optionally, by
+reading the SSH identification line the server sends first. Thousands of
+probes run concurrently on one asyncio loop, so the caller runs
+:func:`probe_all` in a worker thread. Results are kept in a
+:class:`ProbeCache` for ``SSHMANAGER_PROBE_TTL`` seconds.
+
+Probing is opt-in (``SSHMANAGER_PROBE=1``), and so is reading the banner
+(``SSHMANAGER_PROBE_BANNER=1``): sshd logs every connection that closes
+before authentication, which can trip fail2ban or sshguard.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from . import settings
+from .models import Connection
+from .resolver import is_address
+
+Target = tuple[str, int]
+
+
+class ProbeResult(NamedTuple):
+    ok: bool
+    # Milliseconds until the TCP connection was established
+    rtt: Optional[float] = None
+    # SSH identification line, e.g. ``SSH-2.0-OpenSSH_9.6``
+    banner: Optional[str] = None
+    error: Optional[str] = None
+    checked: float = 0.0
+
+
+def target(conn: Connection) -> Optional[Target]:
+    """Return what to probe for ``conn``.
+
+    Hosts behind a ProxyJump are usually not reachable from here, so they
+    are not probed.
+    """
+    if conn.proxy_jump:
+        return None
+    return conn.host, conn.port
+
+
+def _error(exc: OSError) -> str:
+    # asyncio words connect errors with the address; keep only the reason
+    if exc.errno and not isinstance(exc, socket.gaierror):
+        return os.strerror(exc.errno)
+    return exc.strerror or str(exc)
+
+
+async def _address(host: str, port: int) -> str:
+    if is_address(host):
+        return host
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return infos[0][4][0]
+
+
+async def probe(host: str, port: int, timeout: float, read_banner: bool = True) -> ProbeResult:
+    """Return whether ``host:port`` accepts connections, and how fast.
+
+    The name is looked up first so the round-trip time covers only the TCP
+    connect.
+    """
+    try:
+        address = await asyncio.wait_for(_address(host, port), timeout)
+    except asyncio.TimeoutError:
+        return ProbeResult(False, error="name lookup timed out", checked=time.monotonic())
+    except OSError as exc:
+        return ProbeResult(False, error=_error(exc), checked=time.monotonic())
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    except asyncio.TimeoutError:
+        return ProbeResult(False, error="timed out", checked=time.monotonic())
+    except OSError as exc:
+        return ProbeResult(False, error=_error(exc), checked=time.monotonic())
+    rtt = (time.perf_counter() - start) * 1000
+    banner = None
+    try:
+        if read_banner:
+            remaining = max(0.1, timeout - rtt / 1000)
+            line = await asyncio.wait_for(reader.readline(), remaining)
+            text = line.decode("utf-8", "replace").strip()
+            if text.startswith("SSH-"):
+                banner = text
+    except (asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return ProbeResult(True, rtt, banner, checked=time.monotonic())
+
+
+async def probe_all(
+    targets: Iterable[Target],
+    concurrency: int = 256,
+    timeout: float = 2.0,
+    read_banner: bool = True,
+    stop: Optional[threading.Event] = None,
+) -> dict[Target, ProbeResult]:
+    """Probe every target with at most ``concurrency`` open at a time.
+
+    Setting ``stop`` cancels the probes still running or waiting; only the
+    finished ones are returned.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: dict[Target, ProbeResult] = {}
+
+    async def limited(target: Target) -> None:
+        async with semaphore:
+            results[target] = await probe(target[0], target[1], timeout, read_banner)
+
+    tasks = [asyncio.ensure_future(limited(t)) for t in set(targets)]
+
+    async def watch() -> None:
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        for task in tasks:
+            task.cancel()
+
+    watcher = asyncio.ensure_future(watch()) if stop is not None else None
+    try:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+    return results
+
+
+def run(
+    targets: Iterable[Target], stop: Optional[threading.Event] = None
+) -> dict[Target, ProbeResult]:
+    """Probe ``targets`` with the configured limits; blocks until done or
+    until ``stop`` is set."""
+    return asyncio.run(
+        probe_all(
+            targets,
+            settings.get_int("probe_concurrency", 256),
+            settings.get_float("probe_timeout", 2.0),
+            settings.get_bool("probe_banner", False),
+            stop,
+        )
+    )
+
+
+class ProbeCache:
+    """Probe results that expire after ``ttl`` seconds.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = settings.get_float("probe_ttl", 120.0) if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._results: dict[Target, ProbeResult] = {}
+
+    def get(self, target: Target) -> Optional[ProbeResult]:
+        """Return the last result for ``target``, even when it expired."""
+        with self._lock:
+            return self._results.get(target)
+
+    def stale(self, targets: Iterable[Target]) -> list[Target]:
+        """Return the targets without a result younger than the TTL."""
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            return [
+                t for t in set(targets)
+                if (r := self._results.get(t)) is None or r.checked < deadline
+            ]
+
+    def update(self, results: dict[Target, ProbeResult]) -> None:
+        with self._lock:
+            self._results.update(results)
+
+    def retain(self, targets: Iterable[Target]) -> None:
+        """Drop results of targets that are no longer used."""
+        keep = set(targets)
+        with self._lock:
+            self._results = {t: r for t, r in self._results.items() if t in keep}
@@ -0,0 +1,71 @@
+"""Resource usage of process trees read from ``/proc``.
+
+Used to account terminal tabs: the shell started by Konsole and everything
+it runs, such as the ssh client. Processes that exit while they are read
+count as using nothing.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import List, NamedTuple
+
+
+class Usage(NamedTuple):
+    rss_kib: int
+    fds: int
+    processes: int
+
+
+def children(pid: int) -> List[int]:
+    result: List[int] = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return result
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as fh:
+                result.extend(int(c) for c in fh.read().split())
+        except OSError:
+            continue
+    return result
+
+
+def descendants(pid: int) -> List[int]:
+    """Return all processes started by ``pid``, directly or not."""
+    result: List[int] = []
+    pending = children(pid)
+    while pending:
+        child = pending.pop()
+        result.append(child)
+        pending.extend(children(child))
+    return result
+
+
+def rss_kib(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def fd_count(pid: int) -> int:
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+def tree_usage(pid: int) -> Usage:
+    """Return the combined usage of ``pid`` and its descendants."""
+    pids = [pid, *descendants(pid)]
+    return Usage(
+        sum(rss_kib(p) for p in pids),
+        sum(fd_count(p) for p in pids),
+        sum(1 for p in pids if os.path.exists(f"/proc/{p}")),
+    )
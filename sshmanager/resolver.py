@@ -0,0 +1,158 @@
+"""Host names of connections resolved ahead of time.
+
+After the connection list loads, every host name is looked up in a worker
+thread and the addresses are cached. Python's resolver does not report
+record TTLs, so answers are kept for ``SSHMANAGER_DNS_TTL`` seconds (300)
+and failures for ``SSHMANAGER_DNS_NEGATIVE_TTL`` seconds (30). When a
+refresh fails the previous address is kept, so a resolver hiccup does not
+make a known host unreachable.
+
+With ``SSHMANAGER_DNS_PIN=1`` ssh is given the cached address through
+``HostName`` and the original name through ``HostKeyAlias``, so host keys
+are still checked against the name in ``known_hosts``.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from . import settings
+from .models import Connection
+
+
+@dataclass
+class _Entry:
+    addresses: tuple[str, ...]
+    expires: float
+    error: Optional[str] = None
+
+
+def is_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def _lookup(host: str) -> tuple[str, ...]:
+    infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    # Keep the resolver's order, which follows the system's preferences
+    return tuple(dict.fromkeys(info[4][0] for info in infos))
+
+
+class Resolver:
+    """Cache of resolved host names with hit and timing counters.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.resolve_count = 0
+        self.resolve_time = 0.0
+        self.resolve_max = 0.0
+
+    def stale(self, hosts: Iterable[str]) -> list[str]:
+        """Return the names in ``hosts`` whose cache entry expired."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                h for h in set(hosts)
+                if not is_address(h) and ((e := self._entries.get(h)) is None or e.expires <= now)
+            ]
+
+    def resolve(self, host: str) -> None:
+        """Look up ``host`` and store the answer."""
+        start = time.perf_counter()
+        try:
+            addresses = _lookup(host)
+            error = None
+        except (OSError, UnicodeError) as exc:
+            addresses = ()
+            error = str(exc)
+        elapsed = time.perf_counter() - start
+        now = time.monotonic()
+        with self._lock:
+            self.resolve_count += 1
+            self.resolve_time += elapsed
+            self.resolve_max = max(self.resolve_max, elapsed)
+            previous = self._entries.get(host)
+            if addresses:
+                ttl = settings.get_float("dns_ttl", 300.0)
+                self._entries[host] = _Entry(addresses, now + ttl)
+                return
+            self.failures += 1
+            negative_ttl = settings.get_float("dns_negative_ttl", 30.0)
+            if previous is not None and previous.addresses:
+                # Keep serving the last answer until the name resolves again
+                previous.expires = now + negative_ttl
+                previous.error = error
+            else:
+                self._entries[host] = _Entry((), now + negative_ttl, error)
+        logging.debug("Could not resolve %s: %s", host, error)
+
+    def resolve_all(self, hosts: Iterable[str], workers: int = 16) -> int:
+        """Resolve the expired names in ``hosts``; return how many were looked up."""
+        pending = self.stale(hosts)
+        if not pending:
+            return 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(self.resolve, pending))
+        return len(pending)
+
+    def address(self, host: str) -> Optional[str]:
+        """Return a cached address of ``host``, or None when none is known."""
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry.addresses:
+                self.hits += 1
+                return entry.addresses[0]
+            self.misses += 1
+            return None
+
+    def retain(self, hosts: Iterable[str]) -> None:
+        """Forget names that are no longer used by any connection."""
+        keep = set(hosts)
+        with self._lock:
+            self._entries = {h: e for h, e in self._entries.items() if h in keep}
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "names": len(self._entries),
+                "unresolved": sum(1 for e in self._entries.values() if not e.addresses),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "failures": self.failures,
+                "resolves": self.resolve_count,
+                "avg_ms": self.resolve_time / self.resolve_count * 1000 if self.resolve_count else 0.0,
+                "max_ms": self.resolve_max * 1000,
+            }
+
+
+def ssh_address(conn: Connection, resolver: Optional[Resolver] = None) -> Optional[str]:
+    """Return the address ssh should connect to for ``conn``, if pinned.
+
+    Only used with ``SSHMANAGER_DNS_PIN``; hosts behind a ProxyJump are
+    resolved by the jump host and are never pinned.
+    """
+    if not settings.get_bool("dns_pin", False) or conn.proxy_jump or is_address(conn.host):
+        return None
+    return (resolver or default_resolver).address(conn.host)
+
+
+default_resolver = Resolver()
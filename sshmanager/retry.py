@@ -0,0 +1,78 @@
+"""Retry delays and a circuit breaker for calls to the vault server."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Iterator
+
+
+def backoff_delays(
+    retries: int, base: float = 0.5, cap: float = 8.0
+) -> Iterator[float]:
+    """Yield ``retries`` exponentially growing delays with full jitter."""
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures until a cool-down has passed.
+
+    After ``threshold`` consecutive failures the breaker opens and
+    :meth:`allow` returns ``False`` for ``reset_timeout`` seconds. Then a
+    single trial call is let through; its outcome closes or reopens the
+    breaker.
+    """
+
+    def __init__(self, threshold: int = 3, reset_timeout: float = 60.0) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def is_open(self) -> bool:
+        """Return ``True`` while calls are being rejected."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+    def abandon(self) -> None:
+        """Note that a call ended without telling whether the server is healthy,
+        e.g. because it was cancelled, so another trial call may be made."""
+        with self._lock:
+            self._trial = False
+
+    def reset(self) -> None:
+        self.record_success()
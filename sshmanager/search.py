@@ -0,0 +1,309 @@
+"""Quick-open search over connections.
+
+:class:`SearchIndex` keeps one lower-case text per connection made of its
+label, ``username@host`` and folder. Every search term must occur in that
+text. Terms of three or more characters are looked up in a trigram index,
+and shorter ones in an index of word prefixes. Only the connections listed
+under the rarest trigram or prefix are checked, so a query touches a small
+part of a large vault. Those lists are capped, so connections whose label
+starts with a term are looked up in a sorted copy of the labels and checked
+first; an exact label is never lost behind thousands of weaker matches. When too few connections match exactly, the query is
+matched as a subsequence of the labels (``wbsrv`` finds ``web-server``). This
+fallback uses one regular expression per block of labels and stops once its
+time budget is spent, so a keystroke never costs more than about a frame.
+
+Results are ranked by match quality plus a frecency bonus. Frequently and
+recently opened connections come first. :class:`Frecency` keeps the use
+counts in memory, or in ``~/.sshmanager/frecency.json`` under hashed keys
+when given a path, so no host names are written to disk.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import time
+from array import array
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .models import Connection
+
+FRECENCY_PATH = Path.home() / ".sshmanager" / "frecency.json"
+
+# Connections checked at most for one query term before ranking, in
+# addition to as many whose label starts with a term
+MAX_CANDIDATES = 3000
+# Subsequence matches collected at most by the fuzzy fallback
+MAX_FUZZY = 400
+# Seconds the fuzzy fallback may take and labels it scans between checks
+FUZZY_BUDGET = 0.008
+FUZZY_BLOCK = 2000
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def clear(path: Path = FRECENCY_PATH) -> None:
+    """Delete saved use counts, e.g. ones written before saving was turned off."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logging.error("Failed to delete frecency data: %s", exc)
+
+
+def _key(conn: Connection) -> str:
+    """Return a stable, hashed identifier for a connection."""
+    raw = conn.item_id or f"{conn.username}@{conn.host}:{conn.port}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class Frecency:
+    """How often and how recently connections were opened.
+
+    A use counts fully when it is new and half as much after ``HALF_LIFE``
+    seconds. Without a ``path`` nothing is read or written.
+    """
+
+    HALF_LIFE = 7 * 24 * 3600.0
+    MAX_ENTRIES = 2000
+
+    def __init__(self, path: Path | None = FRECENCY_PATH) -> None:
+        self.path = path
+        # Hashed key -> [score at ``last``, last use]
+        self._entries: dict[str, list[float]] = {}
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logging.error("Failed to read frecency data: %s", exc)
+            return
+        if not isinstance(data, dict):
+            logging.error("Ignoring frecency data that is not an object")
+            return
+        for key, value in data.items():
+            # Skip entries damaged or edited by hand instead of failing
+            try:
+                if not isinstance(value, list) or len(value) != 2:
+                    raise ValueError(value)
+                score, last = float(value[0]), float(value[1])
+            except (TypeError, ValueError):
+                logging.warning("Ignoring invalid frecency entry %r", key)
+                continue
+            if math.isfinite(score) and math.isfinite(last):
+                self._entries[key] = [score, last]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logging.error("Failed to write frecency data: %s", exc)
+
+    def _decayed(self, entry: list[float], now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.HALF_LIFE)
+
+    def record(self, conn: Connection, now: float | None = None) -> None:
+        """Count one use of ``conn`` and save the data."""
+        now = time.time() if now is None else now
+        key = _key(conn)
+        entry = self._entries.get(key)
+        score = 1.0 + (self._decayed(entry, now) if entry else 0.0)
+        self._entries[key] = [score, now]
+        if len(self._entries) > self.MAX_ENTRIES:
+            ranked = sorted(
+                self._entries.items(), key=lambda kv: self._decayed(kv[1], now)
+            )
+            for key, _ in ranked[: len(ranked) - self.MAX_ENTRIES]:
+                del self._entries[key]
+        self.save()
+
+    def score(self, key: str, now: float) -> float:
+        entry = self._entries.get(key)
+        return self._decayed(entry, now) if entry else 0.0
+
+    def keys(self) -> Iterable[str]:
+        return self._entries.keys()
+
+
+class SearchIndex:
+    """Trigram and prefix index over a fixed list of connections.
+
+    Building takes a while for large vaults and is meant to run in a worker
+    thread; the finished index is read-only and :meth:`search` is fast
+    enough to run on every keystroke.
+    """
+
+    def __init__(self, connections: Iterable[Connection]) -> None:
+        self.connections: List[Connection] = list(connections)
+        self._texts: List[str] = []
+        self._labels: List[str] = []
+        self._ids: dict[str, int] = {}
+        grams: dict[str, list[int]] = {}
+        prefixes: dict[str, list[int]] = {}
+        for index, conn in enumerate(self.connections):
+            label = conn.label.lower()
+            text = f"{label}\n{conn.username.lower()}@{conn.host.lower()}\n{conn.folder.lower()}"
+            self._texts.append(text)
+            self._labels.append(label)
+            self._ids.setdefault(_key(conn), index)
+            for gram in {text[i : i + 3] for i in range(len(text) - 2)}:
+                grams.setdefault(gram, []).append(index)
+            for prefix in {w[:n] for w in _WORD.findall(text) for n in (1, 2)}:
+                prefixes.setdefault(prefix, []).append(index)
+        # Indexes ordered by label, to find label prefixes by bisection
+        order = sorted(range(len(self._labels)), key=self._labels.__getitem__)
+        self._by_label = array("I", order)
+        self._sorted_labels = [self._labels[i] for i in self._by_label]
+        self._grams = {k: array("I", v) for k, v in grams.items()}
+        self._prefixes = {k: array("I", v) for k, v in prefixes.items()}
+        # Labels joined into blocks of lines for the subsequence fallback
+        self._blocks = [
+            "\n".join(self._labels[i : i + FUZZY_BLOCK])
+            for i in range(0, len(self._labels), FUZZY_BLOCK)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def _postings(self, term: str) -> Optional[array]:
+        """Return the smallest posting list that must contain every match."""
+        if len(term) < 3:
+            words = _WORD.findall(term)
+            if not words:
+                return None
+            return self._prefixes.get(words[0][:2], array("I"))
+        best = None
+        for i in range(len(term) - 2):
+            posting = self._grams.get(term[i : i + 3])
+            if posting is None:
+                return array("I")
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best
+
+    def _label_prefixed(self, term: str) -> array:
+        """Return up to ``MAX_CANDIDATES`` connections whose label starts with ``term``.
+
+        Shorter labels sort first, so an exact match is always included.
+        """
+        lo = bisect.bisect_left(self._sorted_labels, term)
+        hi = bisect.bisect_left(self._sorted_labels, term + "\U0010ffff", lo)
+        return self._by_label[lo : min(hi, lo + MAX_CANDIDATES)]
+
+    def _score(self, index: int, terms: List[str]) -> Optional[float]:
+        text = self._texts[index]
+        label = self._labels[index]
+        score = 0.0
+        for term in terms:
+            pos = text.find(term)
+            if pos < 0:
+                return None
+            if label.startswith(term):
+                score += 100
+            elif pos == 0 or not text[pos - 1].isalnum():
+                score += 60
+            else:
+                score += 30
+            if term in label:
+                score += 15
+        return score - len(label) * 0.1
+
+    def _fuzzy(self, query: str, seen: set[int]) -> List[tuple[float, int]]:
+        chars = [c for c in query if not c.isspace()]
+        if len(chars) < 3:
+            return []
+        # Anchored pattern taking the earliest occurrence of every character.
+        # The class excludes the character that follows, so backtracking
+        # into it fails at once and each label is scanned about once
+        pattern = re.compile(
+            "^" + "".join(f"[^\n{re.escape(c)}]*{re.escape(c)}" for c in chars),
+            re.MULTILINE,
+        )
+        deadline = time.perf_counter() + FUZZY_BUDGET
+        results = []
+        for block_no, block in enumerate(self._blocks):
+            if time.perf_counter() > deadline:
+                break
+            base = block_no * FUZZY_BLOCK
+            for match in pattern.finditer(block):
+                index = base + block.count("\n", 0, match.start())
+                if index in seen:
+                    continue
+                label = self._labels[index]
+                spread = match.end() - match.start() - len(chars)
+                results.append((10.0 - spread * 0.5 - len(label) * 0.1, index))
+                if len(results) >= MAX_FUZZY:
+                    return results
+        return results
+
+    def search(
+        self, query: str, frecency: Frecency | None = None, limit: int = 50
+    ) -> List[Connection]:
+        """Return up to ``limit`` connections best matching ``query``."""
+        now = time.time()
+        terms = query.lower().split()
+        # Parallel lists of plain numbers; tuples per candidate would trigger
+        # garbage collections over the whole index while typing
+        scores: List[float] = []
+        hits: List[int] = []
+        # Frecently used connections are always considered
+        boost: dict[int, float] = {}
+        if frecency is not None:
+            for key in frecency.keys():
+                index = self._ids.get(key)
+                if index is not None:
+                    boost[index] = 40 * math.log2(1 + frecency.score(key, now))
+        if not terms:
+            for index in boost:
+                scores.append(0.0)
+                hits.append(index)
+            for index in range(min(len(self.connections), limit)):
+                if index not in boost:
+                    scores.append(-1.0 - index)
+                    hits.append(index)
+        else:
+            postings = [self._postings(t) for t in terms]
+            postings = [p for p in postings if p is not None]
+            candidates = min(postings, key=len) if postings else array("I")
+            checked: set[int] = set()
+            prefixed = [self._label_prefixed(t) for t in terms]
+            for index in chain(boost, *prefixed, candidates[:MAX_CANDIDATES]):
+                if index in checked:
+                    continue
+                checked.add(index)
+                score = self._score(index, terms)
+                if score is not None:
+                    scores.append(score)
+                    hits.append(index)
+            if len(hits) < limit:
+                for score, index in self._fuzzy(query.lower(), set(hits)):
+                    scores.append(score)
+                    hits.append(index)
+        if boost:
+            for pos, index in enumerate(hits):
+                scores[pos] += boost.get(index, 0.0)
+        # Ties keep index order
+        best = heapq.nlargest(
+            limit, range(len(hits)), key=lambda pos: scores[pos] - hits[pos] * 1e-9
+        )
+        return [self.connections[hits[pos]] for pos in best]
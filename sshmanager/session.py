@@ -0,0 +1,93 @@
+"""Open tabs saved between runs.
+
+Only used with ``SSHMANAGER_RESTORE_SESSION=1``. Each tab is stored as a
+small entry that identifies its connection: the vault item id and label, or
+host, user and port for connections that are not in a vault. Key paths and
+initial commands are not written, and passwords never are. Restoring only
+creates the tabs; their terminals are started when a tab is first shown.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from .models import Connection
+
+SESSION_PATH = Path.home() / ".sshmanager" / "session.json"
+_VERSION = 1
+
+
+def entry(conn: Optional[Connection]) -> dict:
+    """Return the session entry of a tab showing ``conn``."""
+    if conn is None:
+        return {"type": "shell"}
+    if conn.item_id:
+        return {"type": "vault", "item_id": conn.item_id, "label": conn.label}
+    data = {
+        "type": "local",
+        "label": conn.label,
+        "host": conn.host,
+        "username": conn.username,
+        "port": conn.port,
+    }
+    if conn.proxy_jump:
+        data["proxy_jump"] = conn.proxy_jump
+    return data
+
+
+def local_connection(data: dict) -> Optional[Connection]:
+    """Return the connection of a ``local`` entry."""
+    try:
+        return Connection(
+            str(data["label"]),
+            str(data["host"]),
+            str(data["username"]),
+            int(data["port"]),
+            proxy_jump=data.get("proxy_jump") or None,
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def load(path: Path = SESSION_PATH) -> tuple[list[dict], int]:
+    """Return the saved entries and the index of the tab that was current."""
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return [], 0
+    except (OSError, ValueError) as exc:
+        logging.error("Failed to read session: %s", exc)
+        return [], 0
+    if not isinstance(data, dict) or data.get("version") != _VERSION:
+        return [], 0
+    tabs = [t for t in data.get("tabs", []) if isinstance(t, dict) and "type" in t]
+    current = data.get("current", 0)
+    if not isinstance(current, int) or not 0 <= current < len(tabs):
+        current = 0
+    return tabs, current
+
+
+def clear(path: Path = SESSION_PATH) -> None:
+    """Delete a saved session, e.g. one written before restoring was turned off."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logging.error("Failed to delete session: %s", exc)
+
+
+def save(entries: list[dict], current: int, path: Path = SESSION_PATH) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"version": _VERSION, "current": current, "tabs": entries}, fh)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logging.error("Failed to write session: %s", exc)
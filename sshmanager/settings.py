@@ -0,0 +1,68 @@
+"""Runtime options for SSH Manager.
+
+Options are read from ``SSHMANAGER_*`` environment variables so no local
+configuration file has to be written. For example ``SSHMANAGER_BW_BACKEND``
+is returned by ``get_str("bw_backend", ...)``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional
+
+_PREFIX = "SSHMANAGER_"
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+
+def _raw(name: str) -> Optional[str]:
+    value = os.environ.get(_PREFIX + name.upper())
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def get_str(name: str, default: str) -> str:
+    """Return the option ``name`` as a string."""
+    value = _raw(name)
+    return default if value is None else value
+
+
+def get_int(name: str, default: int) -> int:
+    """Return the option ``name`` as an integer."""
+    value = _raw(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.error("Invalid integer for %s%s: %r", _PREFIX, name.upper(), value)
+        return default
+
+
+def get_float(name: str, default: float) -> float:
+    """Return the option ``name`` as a float."""
+    value = _raw(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logging.error("Invalid number for %s%s: %r", _PREFIX, name.upper(), value)
+        return default
+
+
+def get_bool(name: str, default: bool) -> bool:
+    """Return the option ``name`` as a boolean."""
+    value = _raw(name)
+    if value is None:
+        return default
+    lowered = value.lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    logging.error("Invalid boolean for %s%s: %r", _PREFIX, name.upper(), value)
+    return default
@@ -0,0 +1,210 @@
+"""Optional encrypted snapshot of the connection list.
+
+The snapshot lets the sidebar be populated as soon as the master password is
+entered while the real login and sync run in the background. Nothing is
+written unless the user enables the option in the login dialog.
+
+File layout (all integers big endian)::
+
+    magic "SSMS" | version u8 | argon2 time u8 | argon2 memory KiB u32 |
+    argon2 lanes u8 | salt 16 | nonce 12 | account sha256 32 | ciphertext
+
+The ciphertext is AES-256-GCM over zlib-compressed JSON and the whole header
+is authenticated as associated data. The key is derived from the master
+password with Argon2id and a random salt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from .models import FIELDS, Config, ConnectionStore
+
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+SNAPSHOT_PATH = Path.home() / ".sshmanager" / "snapshot.bin"
+# One snapshot per account when several vaults are logged in
+SNAPSHOT_DIR = Path.home() / ".sshmanager" / "snapshots"
+
+_MAGIC = b"SSMS"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBBIB16s12s32s")
+
+TIME_COST = 3
+MEMORY_COST = 64 * 1024
+PARALLELISM = 4
+# The header is not authenticated until the key is derived, so its Argon2
+# parameters may be anything; allow at most this multiple of the defaults
+_MAX_COST_FACTOR = 4
+
+
+def _account_digest(email: str, server: str | None) -> bytes:
+    account = f"{email.strip().lower()}\n{(server or '').rstrip('/')}"
+    return hashlib.sha256(account.encode()).digest()
+
+
+def account_path(email: str, server: str | None) -> Path:
+    """Return the snapshot file used for one account."""
+    return SNAPSHOT_DIR / f"{_account_digest(email, server).hex()[:16]}.bin"
+
+
+class SnapshotKey:
+    """Key derived from the master password for one account.
+
+    Keeping the derived key instead of the password allows the snapshot to be
+    rewritten after the background sync finishes.
+    """
+
+    def __init__(
+        self,
+        password: str,
+        email: str,
+        server: str | None,
+        salt: bytes | None = None,
+        time_cost: int = TIME_COST,
+        memory_cost: int = MEMORY_COST,
+        parallelism: int = PARALLELISM,
+    ) -> None:
+        self.salt = salt or os.urandom(16)
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self.account = _account_digest(email, server)
+        # Imported on first use to keep them off the startup path
+        from argon2.low_level import Type, hash_secret_raw
+
+        self._key = hash_secret_raw(
+            password.encode(),
+            self.salt,
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            hash_len=32,
+            type=Type.ID,
+        )
+
+    def aead(self) -> AESGCM:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        return AESGCM(self._key)
+
+
+def _read_header(data: bytes):
+    if len(data) < _HEADER.size:
+        return None
+    header = _HEADER.unpack_from(data)
+    if header[0] != _MAGIC or header[1] != _VERSION:
+        return None
+    return header
+
+
+def _params_ok(time_cost: int, memory_cost: int, parallelism: int) -> bool:
+    return (
+        1 <= time_cost <= TIME_COST * _MAX_COST_FACTOR
+        and 1 <= parallelism <= PARALLELISM * _MAX_COST_FACTOR
+        # Argon2 needs 8 KiB per lane
+        and 8 * parallelism <= memory_cost <= MEMORY_COST * _MAX_COST_FACTOR
+    )
+
+
+def load(
+    password: str, email: str, server: str | None, path: Path = SNAPSHOT_PATH
+) -> tuple[Optional[Config], Optional[str], SnapshotKey]:
+    """Decrypt the snapshot for the given account.
+
+    Returns the config, the vault revision it was taken at and a key that can
+    be used to save a new snapshot. Config and revision are ``None`` when no
+    usable snapshot exists. Snapshots of another account are deleted.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None, None, SnapshotKey(password, email, server)
+    except OSError as exc:
+        logging.error("Failed to read snapshot: %s", exc)
+        return None, None, SnapshotKey(password, email, server)
+    header = _read_header(data)
+    if header is None:
+        logging.info("Discarding snapshot with unknown format")
+        delete(path)
+        return None, None, SnapshotKey(password, email, server)
+    _, _, time_cost, memory_cost, parallelism, salt, nonce, account = header
+    if account != _account_digest(email, server):
+        logging.info("Discarding snapshot of a different account")
+        delete(path)
+        return None, None, SnapshotKey(password, email, server)
+    if not _params_ok(time_cost, memory_cost, parallelism):
+        logging.error(
+            "Discarding snapshot with Argon2 parameters out of range: "
+            "time %d, memory %d KiB, lanes %d",
+            time_cost,
+            memory_cost,
+            parallelism,
+        )
+        delete(path)
+        return None, None, SnapshotKey(password, email, server)
+    key = SnapshotKey(password, email, server, salt, time_cost, memory_cost, parallelism)
+    from cryptography.exceptions import InvalidTag
+
+    try:
+        plain = key.aead().decrypt(nonce, data[_HEADER.size :], data[: _HEADER.size])
+        payload = json.loads(zlib.decompress(plain))
+        connections = ConnectionStore.from_rows(payload["connections"], payload["fields"])
+    except InvalidTag:
+        # Wrong password; keep the file in case the vault password changed
+        return None, None, SnapshotKey(password, email, server)
+    except (ValueError, KeyError, TypeError, zlib.error) as exc:
+        logging.error("Discarding unreadable snapshot: %s", exc)
+        delete(path)
+        return None, None, key
+    return Config(connections), payload.get("revision"), key
+
+
+def save(
+    config: Config, revision: str | None, key: SnapshotKey, path: Path = SNAPSHOT_PATH
+) -> None:
+    """Encrypt ``config`` with ``key`` and atomically replace the snapshot."""
+    payload = json.dumps(
+        {
+            "revision": revision,
+            "fields": FIELDS,
+            "connections": config.connections.to_rows(),
+        },
+        separators=(",", ":"),
+    ).encode()
+    nonce = os.urandom(12)
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        key.time_cost,
+        key.memory_cost,
+        key.parallelism,
+        key.salt,
+        nonce,
+        key.account,
+    )
+    data = header + key.aead().encrypt(nonce, zlib.compress(payload), header)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def delete(path: Path = SNAPSHOT_PATH) -> None:
+    """Remove the snapshot if it exists."""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logging.error("Failed to delete snapshot: %s", exc)
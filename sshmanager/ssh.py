@@ -0,0 +1,220 @@
+"""Building ``ssh`` command lines and sharing connections between them.
+
+Every tab used to run its own ``ssh``, so a second tab to the same host or a
+reconnect paid for the TCP setup, key exchange and authentication again.
+:class:`ControlPool` hands out one OpenSSH ControlMaster socket per
+destination: the first ``ssh`` to a host becomes the master and stays in the
+background for ``SSHMANAGER_SSH_CONTROL_PERSIST`` seconds after its last
+session ends, and later commands to the same destination open a new session
+over it. Destinations differ by user, host, port, key and ProxyJump chain.
+
+Sockets live in a private directory that is removed on exit together with
+the masters. ``SSHMANAGER_SSH_MULTIPLEX=0`` turns sharing off.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional
+
+from . import settings
+from .models import Connection
+
+# Seconds to wait for ``ssh -O`` answers from a master
+CONTROL_TIMEOUT = 5.0
+
+
+def destination_key(conn: Connection) -> tuple:
+    """Return what decides whether two connections can share a master."""
+    return (conn.username, conn.host, conn.port, conn.key_path, conn.proxy_jump)
+
+
+def build_ssh_args(
+    conn: Connection,
+    pool: Optional["ControlPool"] = None,
+    command: Optional[str] = None,
+    address: Optional[str] = None,
+) -> List[str]:
+    """Return the ``ssh`` command line for ``conn``.
+
+    Options come before the destination, so callers can append a remote
+    command. With ``pool`` the command shares its destination's master.
+    ``command`` runs on a terminal in place of the login shell. ``address``
+    is connected to instead of resolving the host name, which is still
+    used for ssh_config matching and for checking the host key.
+    """
+    args = ["ssh"]
+    if conn.key_path:
+        args.extend(["-i", conn.key_path])
+    if conn.proxy_jump:
+        args.extend(["-J", conn.proxy_jump])
+    if pool is not None:
+        args.extend(pool.options(conn))
+    if address:
+        # known_hosts stores names on other ports as [host]:port
+        alias = conn.host if conn.port == 22 else f"[{conn.host}]:{conn.port}"
+        args.extend(["-o", f"HostName={address}", "-o", f"HostKeyAlias={alias}"])
+    if command:
+        args.append("-t")
+    args.extend(["-p", str(conn.port), f"{conn.username}@{conn.host}"])
+    if command:
+        args.append(command)
+    return args
+
+
+def interactive_command(conn: Connection) -> Optional[str]:
+    """Return the remote command of a terminal tab for ``conn``.
+
+    The initial command runs as soon as the session is set up and is
+    followed by the user's login shell, so nothing has to be typed in.
+    Interrupting it with Ctrl+C still leads to the shell. The wrapper needs
+    a POSIX login shell on the remote host and the command runs without the
+    interactive rc files, so tabs only use it with
+    ``SSHMANAGER_INITIAL_CMD_REMOTE=1``.
+    """
+    if not conn.initial_cmd:
+        return None
+    return f'trap : INT; {conn.initial_cmd}; trap - INT; exec "$SHELL" -l'
+
+
+class ControlPool:
+    """ControlMaster sockets of the destinations used in this process.
+
+    Masters are started by the first ``ssh`` that uses :meth:`options`; the
+    pool only picks the socket paths, notices masters that are gone and
+    stops them on :meth:`close`. It is safe to use from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._dir: Optional[str] = None
+        # Socket path -> destination key
+        self._sockets: dict[str, tuple] = {}
+        self.reused = 0
+        self.started = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.get_bool("ssh_multiplex", True)
+
+    def _socket_dir(self) -> str:
+        if self._dir is None:
+            # Socket paths are limited to about 100 bytes, so keep them short
+            base = os.environ.get("XDG_RUNTIME_DIR")
+            if not base or not os.path.isdir(base):
+                base = None
+            self._dir = tempfile.mkdtemp(prefix="sshmanager_cm_", dir=base)
+        return self._dir
+
+    def socket_path(self, conn: Connection) -> str:
+        key = destination_key(conn)
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        with self._lock:
+            path = os.path.join(self._socket_dir(), digest)
+            self._sockets[path] = key
+        return path
+
+    def options(self, conn: Connection) -> List[str]:
+        """Return the ``ssh`` options that share the master of ``conn``."""
+        if not self.enabled:
+            return []
+        path = self.socket_path(conn)
+        if os.path.exists(path):
+            self.reused += 1
+        else:
+            self.started += 1
+        persist = settings.get_int("ssh_control_persist", 600)
+        return [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={path}",
+            "-o", f"ControlPersist={persist if persist > 0 else 'no'}",
+        ]
+
+    def _control(self, path: str, command: str) -> bool:
+        try:
+            result = subprocess.run(
+                ["ssh", "-S", path, "-O", command, "sshmanager"],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=CONTROL_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            logging.error("ssh -O %s failed for %s: %s", command, path, exc)
+            return False
+        return result.returncode == 0
+
+    def check(self, conn: Connection) -> bool:
+        """Return whether a live master exists for ``conn``."""
+        path = self.socket_path(conn)
+        return os.path.exists(path) and self._control(path, "check")
+
+    def prune(self) -> int:
+        """Forget expired masters and remove stale sockets.
+
+        A master that exited after ``ControlPersist`` removes its socket. One
+        that was killed leaves it behind, and ``ssh`` would then refuse to
+        start a new master, so the socket is deleted. Returns the number of
+        live masters.
+        """
+        with self._lock:
+            paths = list(self._sockets)
+        alive = 0
+        for path in paths:
+            if not os.path.exists(path):
+                with self._lock:
+                    self._sockets.pop(path, None)
+                continue
+            if self._control(path, "check"):
+                alive += 1
+                continue
+            logging.info("Removing stale ssh control socket %s", path)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            with self._lock:
+                self._sockets.pop(path, None)
+        return alive
+
+    def close(self) -> None:
+        """Stop all masters and remove the socket directory."""
+        with self._lock:
+            paths = [p for p in self._sockets if os.path.exists(p)]
+            self._sockets.clear()
+            socket_dir, self._dir = self._dir, None
+        procs = []
+        for path in paths:
+            try:
+                procs.append(
+                    subprocess.Popen(
+                        ["ssh", "-S", path, "-O", "exit", "sshmanager"],
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                    )
+                )
+            except OSError as exc:
+                logging.error("Failed to stop ssh master %s: %s", path, exc)
+        for proc in procs:
+            try:
+                proc.wait(CONTROL_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if socket_dir:
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = len(self._sockets)
+        return {"sockets": count, "started": self.started, "reused": self.reused}
+
+
+default_pool = ControlPool()
+atexit.register(default_pool.close)
@@ -0,0 +1,63 @@
+"""Incremental vault refresh used by the background sync scheduler."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from . import bitwarden
+from .config import load_config
+from .models import Config
+
+
+@dataclass
+class SyncResult:
+    ok: bool
+    # True when the cheap revision check showed nothing changed
+    skipped: bool = False
+    remote_revision: Optional[str] = None
+    config: Optional[Config] = None
+    duration: float = 0.0
+
+
+@dataclass
+class SyncStats:
+    """Counters for background refreshes."""
+
+    polls: int = 0
+    syncs: int = 0
+    skipped: int = 0
+    failures: int = 0
+    total_sync_time: float = 0.0
+    last_sync_time: float = 0.0
+
+    def record(self, result: SyncResult) -> None:
+        self.polls += 1
+        if not result.ok:
+            self.failures += 1
+        elif result.skipped:
+            self.skipped += 1
+        else:
+            self.syncs += 1
+            self.total_sync_time += result.duration
+            self.last_sync_time = result.duration
+
+
+def refresh(
+    client: bitwarden.BitwardenClient, known_revision: Optional[str]
+) -> SyncResult:
+    """Sync the vault of ``client`` and reload connections unless nothing changed.
+
+    ``known_revision`` is the remote revision seen by the previous refresh.
+    """
+    start = time.perf_counter()
+    remote = client.remote_revision()
+    if remote is not None and remote == known_revision:
+        return SyncResult(True, True, remote, duration=time.perf_counter() - start)
+    if client.sync() is None:
+        logging.error("Background sync failed: %s", client.get_last_error() or "unknown error")
+        return SyncResult(False, remote_revision=known_revision, duration=time.perf_counter() - start)
+    config = load_config(client)
+    return SyncResult(True, False, remote, config, time.perf_counter() - start)
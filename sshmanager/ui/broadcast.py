@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QMenu,
+    QTabWidget,
+    QToolButton,
+    QWidget,
+)
+
+from .terminal_tab import TerminalTab
+
+
+class BroadcastBar(QWidget):
+    """Types the same input into several terminal tabs at once.
+
+    Enter sends the line to every target tab. With *Live* checked each
+    keystroke is mirrored as it is typed. Input for all targets goes through
+    one native call, so the cost barely grows with the number of tabs.
+    """
+
+    def __init__(self, tabs: QTabWidget, parent=None) -> None:
+        super().__init__(parent)
+        self._tabs = tabs
+        self._targets: list[TerminalTab] = []
+        self._typed = ""
+
+        self.targets_btn = QToolButton(self)
+        self.targets_btn.setPopupMode(QToolButton.InstantPopup)
+        self.targets_menu = QMenu(self.targets_btn)
+        self.targets_menu.aboutToShow.connect(self._fill_targets_menu)
+        self.targets_btn.setMenu(self.targets_menu)
+        self.edit = QLineEdit(self)
+        self.edit.setPlaceholderText("Command for all target tabs")
+        self.edit.returnPressed.connect(self._on_return)
+        self.edit.textEdited.connect(self._on_edited)
+        self.live_check = QCheckBox("Live", self)
+        self.live_check.setToolTip("Send every keystroke as it is typed")
+        self.live_check.toggled.connect(self._on_live_toggled)
+        interrupt_btn = QToolButton(self)
+        interrupt_btn.setText("Ctrl+C")
+        interrupt_btn.clicked.connect(lambda: self.send("\x03", newline=False))
+        close_btn = QToolButton(self)
+        close_btn.setText("Close")
+        close_btn.clicked.connect(self.hide)
+        self.status = QLabel(self)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Broadcast:", self))
+        layout.addWidget(self.targets_btn)
+        layout.addWidget(self.edit, 1)
+        layout.addWidget(self.live_check)
+        layout.addWidget(interrupt_btn)
+        layout.addWidget(self.status)
+        layout.addWidget(close_btn)
+        self._update_targets_label()
+
+    def _open_tabs(self) -> list[TerminalTab]:
+        tabs = (self._tabs.widget(i) for i in range(self._tabs.count()))
+        return [t for t in tabs if isinstance(t, TerminalTab)]
+
+    def targets(self) -> list[TerminalTab]:
+        """Return the target tabs that are still open."""
+        self._targets = [t for t in self._targets if not sip.isdeleted(t)]
+        return list(self._targets)
+
+    def set_targets(self, tabs: list[TerminalTab]) -> None:
+        self._targets = list(tabs)
+        self._update_targets_label()
+
+    def _update_targets_label(self) -> None:
+        count = len(self.targets())
+        self.targets_btn.setText(f"{count} tab{'s' if count != 1 else ''}")
+
+    def _fill_targets_menu(self) -> None:
+        self.targets_menu.clear()
+        open_tabs = self._open_tabs()
+        all_act = self.targets_menu.addAction("All Tabs")
+        all_act.triggered.connect(lambda: self.set_targets(open_tabs))
+        none_act = self.targets_menu.addAction("No Tabs")
+        none_act.triggered.connect(lambda: self.set_targets([]))
+        self.targets_menu.addSeparator()
+        targets = set(self.targets())
+        for tab in open_tabs:
+            act = self.targets_menu.addAction(self._tabs.tabText(self._tabs.indexOf(tab)))
+            act.setCheckable(True)
+            act.setChecked(tab in targets)
+            act.toggled.connect(lambda checked, tab=tab: self._toggle_target(tab, checked))
+
+    def _toggle_target(self, tab: TerminalTab, checked: bool) -> None:
+        targets = [t for t in self.targets() if t is not tab]
+        if checked:
+            targets.append(tab)
+        self.set_targets(targets)
+
+    def send(self, text: str, newline: bool = True) -> int:
+        """Send ``text`` to the running target tabs; return how many got it."""
+        from ..util.konsole_embed import send_input_many
+
+        self._update_targets_label()
+        widgets = [t.terminal for t in self._targets if t.running]
+        start = time.perf_counter()
+        sent = send_input_many(widgets, text, newline)
+        logging.debug(
+            "Broadcast to %d terminals in %.2f ms", sent, (time.perf_counter() - start) * 1000
+        )
+        self.status.setText(f"sent to {sent} of {len(self._targets)}")
+        return sent
+
+    def _on_return(self) -> None:
+        if self.live_check.isChecked():
+            # The line was already typed; only end it
+            self.send("\r", newline=False)
+        else:
+            self.send(self.edit.text())
+        self.edit.clear()
+        self._typed = ""
+
+    def _on_edited(self, text: str) -> None:
+        if not self.live_check.isChecked():
+            return
+        typed = self._typed
+        common = 0
+        while common < min(len(text), len(typed)) and text[common] == typed[common]:
+            common += 1
+        # Erase what differs, then type the rest
+        keys = "\x7f" * (len(typed) - common) + text[common:]
+        if keys:
+            self.send(keys, newline=False)
+        self._typed = text
+
+    def _on_live_toggled(self, live: bool) -> None:
+        self.edit.clear()
+        self._typed = ""
+        self.edit.setPlaceholderText(
+            "Keys are sent as typed" if live else "Command for all target tabs"
+        )
+        self.edit.setFocus(Qt.FocusReason.OtherFocusReason)
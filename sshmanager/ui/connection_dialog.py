@@ -25,6 +25,7 @@ class ConnectionDialog(QDialog):
         self.folder_edit = QLineEdit(self)
         self.key_edit = QLineEdit(self)
         self.initial_cmd_edit = QLineEdit(self)
+        self.proxy_jump_edit = QLineEdit(self)
 
         if connection:
             self.label_edit.setText(connection.label)
@@ -36,6 +37,8 @@ class ConnectionDialog(QDialog):
                 self.key_edit.setText(connection.key_path)
             if connection.initial_cmd:
                 self.initial_cmd_edit.setText(connection.initial_cmd)
+            if connection.proxy_jump:
+                self.proxy_jump_edit.setText(connection.proxy_jump)
 
         layout = QFormLayout(self)
         layout.addRow("Label:", self.label_edit)
@@ -45,6 +48,7 @@ class ConnectionDialog(QDialog):
         layout.addRow("Folder:", self.folder_edit)
         layout.addRow("SSH Key Path:", self.key_edit)
         layout.addRow("Initial Command:", self.initial_cmd_edit)
+        layout.addRow("Proxy Jump:", self.proxy_jump_edit)
 
         self.buttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self
@@ -62,6 +66,7 @@ class ConnectionDialog(QDialog):
         folder = self.folder_edit.text().strip() or "Default"
         key_path = self.key_edit.text().strip() or None
         initial_cmd = self.initial_cmd_edit.text().strip() or None
+        proxy_jump = self.proxy_jump_edit.text().strip() or None
         return Connection(
             label=label,
             host=host,
@@ -70,4 +75,5 @@ class ConnectionDialog(QDialog):
             folder=folder,
             key_path=key_path,
             initial_cmd=initial_cmd,
+            proxy_jump=proxy_jump,
         )
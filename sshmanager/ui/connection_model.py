@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QIcon, QPainter, QPalette, QPixmap
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+from .. import probe
+from ..models import Connection, ConnectionDiff
+
+_ROOT, _GROUP, _FOLDER, _CONN = range(4)
+
+# Status dots by reachability, created on first use
+_status_icons: dict[bool, QIcon] = {}
+
+
+def _status_icon(ok: bool) -> QIcon:
+    icon = _status_icons.get(ok)
+    if icon is None:
+        pixmap = QPixmap(12, 12)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#3a3") if ok else QColor("#c33"))
+        painter.drawEllipse(2, 2, 8, 8)
+        painter.end()
+        icon = _status_icons[ok] = QIcon(pixmap)
+    return icon
+
+
+class _Node:
+    __slots__ = (
+        "kind", "parent", "row", "children", "name", "key", "conn", "folders", "pending", "fetched"
+    )
+
+    def __init__(self, kind: int, parent: Optional["_Node"], name: str = "", key=None) -> None:
+        self.kind = kind
+        self.parent = parent
+        # Position in parent.children, kept up to date by _append and _remove
+        self.row = 0
+        self.children: list[_Node] = []
+        self.name = name
+        self.key = key
+        self.conn: Connection | None = None
+        # Folder nodes by name (root and group nodes)
+        self.folders: dict[str, _Node] = {}
+        # Connections of a folder that have no node yet, by key
+        self.pending: dict[tuple, Connection] = {}
+        self.fetched = False
+
+
+class ConnectionModel(QAbstractItemModel):
+    """Sidebar model of connections grouped by account and folder.
+
+    Each group (an account or the local connections) gets a top-level row
+    when ``show_roots`` is set; otherwise the folders of all groups are
+    merged at the top level. Connection rows of a folder are only created
+    once the folder is expanded (``fetchMore``). Changes are applied as row
+    insertions, removals and ``dataChanged`` so views keep their expansion
+    and selection.
+    """
+
+    ConnectionRole = Qt.ItemDataRole.UserRole
+    # ProbeResult of a connection row, or None while it was not probed
+    ProbeRole = Qt.ItemDataRole.UserRole + 1
+    # Emitted with the index of a folder created by an incremental update
+    folderAdded = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._root = _Node(_ROOT, None)
+        self._groups: dict[str, _Node] = {}
+        # Folder node of every connection key and nodes of fetched connections
+        self._locations: dict[tuple, _Node] = {}
+        self._nodes: dict[tuple, _Node] = {}
+        self._probes: probe.ProbeCache | None = None
+
+    # Qt model interface
+
+    def _node(self, index: QModelIndex) -> _Node:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        node = self._node(parent)
+        if column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        node = self._node(parent)
+        return bool(node.children or node.pending)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self._node(parent)
+        return node.kind == _FOLDER and not node.fetched and bool(node.pending)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        node = self._node(parent)
+        if node.kind != _FOLDER or node.fetched:
+            return
+        pending = node.pending
+        node.pending = {}
+        node.fetched = True
+        if not pending:
+            return
+        self.beginInsertRows(parent, 0, len(pending) - 1)
+        for key, conn in pending.items():
+            self._new_conn_node(node, key, conn)
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.conn.label if node.kind == _CONN else node.name
+        if node.kind != _CONN:
+            return None
+        if role == self.ConnectionRole:
+            return node.conn
+        if role == self.ProbeRole:
+            return self._probe_result(node.conn)
+        if role == Qt.ItemDataRole.DecorationRole:
+            result = self._probe_result(node.conn)
+            return _status_icon(result.ok) if result is not None else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            conn = node.conn
+            tip = f"{conn.username}@{conn.host}:{conn.port}"
+            result = self._probe_result(conn)
+            if result is None:
+                return tip
+            if result.ok:
+                return f"{tip}\nReachable in {result.rtt:.0f} ms" + (
+                    f"\n{result.banner}" if result.banner else ""
+                )
+            return f"{tip}\nUnreachable: {result.error}"
+        return None
+
+    def _probe_result(self, conn: Connection) -> probe.ProbeResult | None:
+        if self._probes is None:
+            return None
+        target = probe.target(conn)
+        return self._probes.get(target) if target is not None else None
+
+    # Helpers
+
+    def _index_of(self, node: _Node) -> QModelIndex:
+        if node is self._root or node.parent is None:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    @staticmethod
+    def _append(parent: _Node, node: _Node) -> None:
+        node.row = len(parent.children)
+        parent.children.append(node)
+
+    @staticmethod
+    def _remove(parent: _Node, row: int) -> None:
+        children = parent.children
+        del children[row]
+        for index in range(row, len(children)):
+            children[index].row = index
+
+    @staticmethod
+    def _key(group: str, conn: Connection) -> tuple:
+        # Local connections have no item id but are kept by the window
+        return (group, conn.item_id or id(conn))
+
+    def _new_conn_node(self, folder: _Node, key: tuple, conn: Connection) -> _Node:
+        node = _Node(_CONN, folder, key=key)
+        node.conn = conn
+        self._append(folder, node)
+        self._nodes[key] = node
+        return node
+
+    def _folder(self, group: str, name: str, notify: bool) -> _Node:
+        parent = self._groups[group]
+        node = parent.folders.get(name)
+        if node is None:
+            row = len(parent.children)
+            if notify:
+                self.beginInsertRows(self._index_of(parent), row, row)
+            node = _Node(_FOLDER, parent, name, key=name)
+            self._append(parent, node)
+            parent.folders[name] = node
+            if notify:
+                self.endInsertRows()
+                self.folderAdded.emit(self._index_of(node))
+        return node
+
+    def _place(self, group: str, conn: Connection, notify: bool, key: tuple | None = None) -> None:
+        folder = self._folder(group, conn.folder, notify)
+        key = key or self._key(group, conn)
+        self._locations[key] = folder
+        if not folder.fetched:
+            folder.pending[key] = conn
+            return
+        row = len(folder.children)
+        if notify:
+            self.beginInsertRows(self._index_of(folder), row, row)
+        self._new_conn_node(folder, key, conn)
+        if notify:
+            self.endInsertRows()
+
+    def _drop_folder_if_empty(self, folder: _Node) -> None:
+        if folder.children or folder.pending:
+            return
+        parent = folder.parent
+        row = folder.row
+        self.beginRemoveRows(self._index_of(parent), row, row)
+        self._remove(parent, row)
+        del parent.folders[folder.name]
+        self.endRemoveRows()
+
+    # Public API
+
+    def set_groups(
+        self, groups: Iterable[tuple[str, str, Iterable[Connection]]], show_roots: bool
+    ) -> None:
+        """Replace all data with ``(key, title, connections)`` groups."""
+        self.beginResetModel()
+        self._root = _Node(_ROOT, None)
+        self._groups = {}
+        self._locations = {}
+        self._nodes = {}
+        for key, title, connections in groups:
+            if show_roots:
+                node = _Node(_GROUP, self._root, title, key=key)
+                self._append(self._root, node)
+            else:
+                node = self._root
+            self._groups[key] = node
+            for conn in connections:
+                self._place(key, conn, notify=False)
+        self.endResetModel()
+
+    def has_group(self, group: str) -> bool:
+        return group in self._groups
+
+    def set_group_title(self, group: str, title: str) -> None:
+        node = self._groups.get(group)
+        if node is None or node.kind != _GROUP or node.name == title:
+            return
+        node.name = title
+        index = self._index_of(node)
+        self.dataChanged.emit(index, index)
+
+    def add_connection(self, group: str, conn: Connection) -> None:
+        self._place(group, conn, notify=True)
+
+    def remove_connection(self, group: str, item_id: str) -> None:
+        key = (group, item_id)
+        folder = self._locations.pop(key, None)
+        if folder is None:
+            return
+        node = self._nodes.pop(key, None)
+        if node is None:
+            del folder.pending[key]
+        else:
+            row = node.row
+            self.beginRemoveRows(self._index_of(folder), row, row)
+            self._remove(folder, row)
+            self.endRemoveRows()
+        self._drop_folder_if_empty(folder)
+
+    def update_connection(self, group: str, old: Connection, new: Connection) -> None:
+        key = (group, new.item_id)
+        folder = self._locations.get(key)
+        if folder is None:
+            self.add_connection(group, new)
+            return
+        if old.folder != new.folder:
+            self.remove_connection(group, new.item_id)
+            self._place(group, new, notify=True, key=key)
+            return
+        node = self._nodes.get(key)
+        if node is None:
+            folder.pending[key] = new
+            return
+        node.conn = new
+        index = self._index_of(node)
+        self.dataChanged.emit(index, index)
+
+    def apply_diff(self, group: str, diff: ConnectionDiff) -> None:
+        """Apply the changes of one group as row-level notifications."""
+        for conn in diff.removed:
+            self.remove_connection(group, conn.item_id)
+        for old, new in diff.modified:
+            self.update_connection(group, old, new)
+        for conn in diff.added:
+            self.add_connection(group, conn)
+
+    def connection(self, index: QModelIndex) -> Connection | None:
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        return node.conn if node.kind == _CONN else None
+
+    def set_probe_cache(self, cache: probe.ProbeCache) -> None:
+        """Show reachability from ``cache`` on connection rows."""
+        self._probes = cache
+        self.probes_updated()
+
+    def probes_updated(self) -> None:
+        """Repaint the connection rows after new probe results."""
+        for index in self.folder_indexes():
+            rows = self.rowCount(index)
+            if rows:
+                self.dataChanged.emit(
+                    self.index(0, 0, index),
+                    self.index(rows - 1, 0, index),
+                    [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole, self.ProbeRole],
+                )
+
+    def connections_under(self, index: QModelIndex) -> list[Connection]:
+        """Return the connections of a row and everything below it.
+
+        Folders that were never expanded are included without creating
+        their rows.
+        """
+        result: list[Connection] = []
+        nodes = [self._node(index)]
+        while nodes:
+            node = nodes.pop(0)
+            if node.kind == _CONN:
+                result.append(node.conn)
+                continue
+            nodes[:0] = node.children
+            result.extend(node.pending.values())
+        return result
+
+    def node_key(self, index: QModelIndex) -> tuple | None:
+        """Return a key identifying the row across model resets."""
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if node.kind == _GROUP:
+            return ("group", node.key)
+        if node.kind == _FOLDER:
+            group = node.parent.key if node.parent.kind == _GROUP else None
+            return ("folder", group, node.name)
+        return ("conn", *node.key)
+
+    def index_for_key(self, key: tuple) -> QModelIndex:
+        """Return the index of a row identified by :meth:`node_key`."""
+        if key[0] == "group":
+            node = self._groups.get(key[1])
+            return self._index_of(node) if node is not None and node.kind == _GROUP else QModelIndex()
+        if key[0] == "folder":
+            parent = self._groups.get(key[1]) if key[1] is not None else self._root
+            node = parent.folders.get(key[2]) if parent is not None else None
+            return self._index_of(node) if node is not None else QModelIndex()
+        conn_key = key[1:]
+        folder = self._locations.get(conn_key)
+        if folder is None:
+            return QModelIndex()
+        if not folder.fetched:
+            self.fetchMore(self._index_of(folder))
+        return self._index_of(self._nodes[conn_key])
+
+    def folder_indexes(self) -> list[QModelIndex]:
+        """Return the indexes of all folder rows."""
+        result = []
+        parents = [self._root] + [n for n in self._root.children if n.kind == _GROUP]
+        for parent in parents:
+            for node in parent.children:
+                if node.kind == _FOLDER:
+                    result.append(self._index_of(node))
+        return result
+
+    def group_indexes(self) -> list[QModelIndex]:
+        return [self._index_of(n) for n in self._root.children if n.kind == _GROUP]
+
+
+class ProbeBadgeDelegate(QStyledItemDelegate):
+    """Draws the round-trip time of reachable hosts at the end of their row."""
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        super().paint(painter, option, index)
+        result = index.data(ConnectionModel.ProbeRole)
+        if result is None or not result.ok:
+            return
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.ColorRole.PlaceholderText))
+        rect = option.rect.adjusted(0, 0, -4, 0)
+        painter.drawText(
+            rect, int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter), f"{result.rtt:.0f} ms"
+        )
+        painter.restore()
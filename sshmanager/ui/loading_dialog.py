@@ -1,13 +1,28 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QProgressBar
+from PyQt5.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QVBoxLayout,
+    QLabel,
+    QProgressBar,
+)
 from PyQt5.QtGui import QMovie
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 
 
 class LoadingDialog(QDialog):
-    """Simple modal dialog showing a spinner while a task runs."""
+    """Simple modal dialog showing a spinner while a task runs.
 
-    def __init__(self, text: str = "Please wait...", parent=None) -> None:
+    With ``cancellable`` a Cancel button is shown; pressing it or Escape emits
+    ``cancelled`` instead of just hiding the dialog.
+    """
+
+    cancelled = pyqtSignal()
+
+    def __init__(
+        self, text: str = "Please wait...", parent=None, cancellable: bool = False
+    ) -> None:
         super().__init__(parent)
+        self._cancellable = cancellable
         self.setWindowTitle(text)
         self.setModal(True)
         layout = QVBoxLayout(self)
@@ -25,5 +40,16 @@ class LoadingDialog(QDialog):
         text_label = QLabel(text, self)
         text_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(text_label)
-        self.setFixedSize(150, 100)
+        if cancellable:
+            buttons = QDialogButtonBox(QDialogButtonBox.Cancel, parent=self)
+            buttons.rejected.connect(self.reject)
+            layout.addWidget(buttons)
+            self.setFixedSize(150, 140)
+        else:
+            self.setFixedSize(150, 100)
+
+    def reject(self) -> None:
+        if self._cancellable:
+            self.cancelled.emit()
+        super().reject()
 
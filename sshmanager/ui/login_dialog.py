@@ -3,9 +3,9 @@ from PyQt5.QtWidgets import (
     QDialogButtonBox,
     QLineEdit,
     QFormLayout,
+    QCheckBox,
 )
 from PyQt5.QtGui import QIcon
-import keyring
 
 
 class LoginDialog(QDialog):
@@ -27,19 +27,31 @@ class LoginDialog(QDialog):
         self._toggle_action.toggled.connect(self._toggle_password)
         self.server_edit = QLineEdit(self)
         self.server_edit.setPlaceholderText("https://vault.bitwarden.com")
-        # Pre-fill fields from the system keyring when available
+        # Pre-fill fields from the system keyring when available. keyring is
+        # slow to import, so it is only loaded once a login is started.
+        import keyring
+
         saved_email = keyring.get_password("sshmanager", "email")
         if saved_email:
             self.email_edit.setText(saved_email)
         saved_server = keyring.get_password("sshmanager", "server")
         if saved_server:
             self.server_edit.setText(saved_server)
+        self.snapshot_check = QCheckBox("Keep encrypted offline copy", self)
+        self.snapshot_check.setToolTip(
+            "Store the connection list encrypted with your master password so "
+            "it can be shown immediately on the next login"
+        )
+        self.snapshot_check.setChecked(
+            keyring.get_password("sshmanager", "snapshot") == "1"
+        )
         self.email_edit.setFocus()
 
         layout = QFormLayout(self)
         layout.addRow("Email:", self.email_edit)
         layout.addRow("Master Password:", self.password_edit)
         layout.addRow("Server:", self.server_edit)
+        layout.addRow(self.snapshot_check)
         self.buttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel,
             parent=self,
@@ -50,7 +62,8 @@ class LoginDialog(QDialog):
 
         self.setTabOrder(self.email_edit, self.password_edit)
         self.setTabOrder(self.password_edit, self.server_edit)
-        self.setTabOrder(self.server_edit, self.buttons)
+        self.setTabOrder(self.server_edit, self.snapshot_check)
+        self.setTabOrder(self.snapshot_check, self.buttons)
 
     def values(self):
         server = self.server_edit.text().strip() or None
@@ -60,6 +73,10 @@ class LoginDialog(QDialog):
             server,
         )
 
+    def keep_snapshot(self) -> bool:
+        """Return whether an encrypted local snapshot should be kept."""
+        return self.snapshot_check.isChecked()
+
     def _toggle_password(self, checked: bool) -> None:
         """Show or hide the password field contents."""
         self._pw_visible = checked
@@ -2,149 +2,318 @@ from __future__ import annotations
 
 import logging
 import subprocess
+import threading
+import time
 from PyQt5.QtWidgets import (
     QMainWindow,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
     QTabWidget,
     QVBoxLayout,
     QWidget,
     QSplitter,
     QToolBar,
-    QLabel,
     QMenu,
     QShortcut,
     QMessageBox,
     QToolButton,
     QAction,
     QSizePolicy,
+    QAbstractItemView,
+    QProgressBar,
+    QPushButton,
 )
-from PyQt5.QtCore import Qt, QPoint, QTimer, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QPoint, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QKeySequence, QIcon, QPixmap
-import keyring
 
-from ..models import Connection, Config
+from ..models import Connection, Config, ConnectionDiff, diff_connections
 from ..config import load_config
-from .. import bitwarden
+from .. import bitwarden, probe, resolver, search, session, settings, snapshot, ssh, startup
+from ..search import Frecency, SearchIndex
 from .login_dialog import LoginDialog
 from .loading_dialog import LoadingDialog
 from .connection_dialog import ConnectionDialog
+from .broadcast import BroadcastBar
+from .connection_model import ConnectionModel, ProbeBadgeDelegate
+from .open_scheduler import OpenScheduler
+from .sync_scheduler import SyncScheduler
+from .quick_open import IndexWorker, QuickOpenDialog
+from .terminal_pool import TerminalPool
+from .tab_lifecycle import TabLifecycle, TabResourcesDialog
+from .terminal_tab import TerminalTab
 
 
-class TerminalTab(QWidget):
-    """Embeds KDE Konsole for an SSH connection or local shell."""
+class LoginWorker(QThread):
+    """Run the Bitwarden login in a background thread."""
 
-    def __init__(self, connection: Connection | None = None, parent=None) -> None:
-        super().__init__(parent)
-        self._conn = connection
+    finished = pyqtSignal(bool, str)
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
+    def __init__(
+        self,
+        client: bitwarden.BitwardenClient,
+        email: str,
+        password: str,
+        server: str | None,
+    ):
+        super().__init__()
+        self.client = client
+        self.email = email
+        self.password = password
+        self.server = server
 
-        from ..util.konsole_embed import (
-            create_shell_widget,
-            get_last_error,
-            send_input,
-        )
+    def run(self) -> None:
+        success = self.client.login(self.email, self.password, self.server)
+        err = self.client.get_last_error() or ""
+        self.finished.emit(success, err)
 
-        # Use a dedicated container so the helper library can set up its own
-        # layout without touching this widget's layout. This avoids duplicate
-        # layout warnings when opening terminal tabs.
-        embed_container = QWidget(self)
-        if connection is None:
-            widget = create_shell_widget(parent=embed_container)
-        else:
-            widget = create_shell_widget(parent=embed_container)
-
-        if widget is None:
-            error_msg = get_last_error() or "Failed to load Konsole"
-            logging.error(
-                "Failed to create Konsole widget for %s@%s: %s",
-                connection.username,
-                connection.host,
-                error_msg,
-            )
-            self.container = QLabel(error_msg, self)
-            layout.addWidget(self.container)
-        else:
-            self.container = embed_container
-            layout.addWidget(embed_container)
-            self._term_widget = widget
-            if connection is not None:
-                cmd_parts = ["ssh"]
-                if connection.key_path:
-                    cmd_parts.extend(["-i", connection.key_path])
-                cmd_parts.extend([f"{connection.username}@{connection.host}", "-p", str(connection.port)])
-                ssh_cmd = " ".join(cmd_parts)
-                send_input(widget, f"clear && {ssh_cmd}")
-                if connection.initial_cmd:
-                    QTimer.singleShot(1000, lambda: send_input(widget, connection.initial_cmd))
-            self._check_timer = QTimer(self)
-            self._check_timer.timeout.connect(self._check_widget)
-            self._check_timer.start(2000)
-
-    def _check_widget(self):
-        from PyQt5 import sip
-        if sip.isdeleted(self._term_widget):
-            logging.error(
-                "Konsole widget closed unexpectedly%s",
-                f" for {self._conn.username}@{self._conn.host}" if self._conn else "",
-            )
-            self._check_timer.stop()
-            layout = self.layout()
-            layout.removeWidget(self.container)
-            self.container.deleteLater()
-            self.container = QLabel("Konsole closed unexpectedly", self)
-            layout.addWidget(self.container)
 
-    def closeEvent(self, event) -> None:
-        if hasattr(self, "_check_timer"):
-            self._check_timer.stop()
-        super().closeEvent(event)
+class DataWorker(QThread):
+    """Load connections in the background."""
 
+    finished = pyqtSignal(object)
 
-class LoginWorker(QThread):
-    """Run the Bitwarden login in a background thread."""
+    def __init__(self, client: bitwarden.BitwardenClient):
+        super().__init__()
+        self.client = client
 
-    finished = pyqtSignal(bool, str)
+    def run(self) -> None:
+        self.finished.emit(load_config(self.client))
+
+
+class AvatarWorker(QThread):
+    """Fetch the profile image without holding up the connection list."""
 
-    def __init__(self, email: str, password: str, server: str | None):
+    finished = pyqtSignal(object)
+
+    def __init__(self, client: bitwarden.BitwardenClient):
+        super().__init__()
+        self.client = client
+
+    def run(self) -> None:
+        self.finished.emit(self.client.fetch_avatar())
+
+
+class LogoutWorker(QThread):
+    """End a vault session without blocking the GUI.
+
+    ``logout`` waits for a running load or sync and may run ``bw logout``.
+    """
+
+    finished = pyqtSignal()
+
+    def __init__(self, client: bitwarden.BitwardenClient):
+        super().__init__()
+        self.client = client
+
+    def run(self) -> None:
+        self.client.logout()
+        self.finished.emit()
+
+
+class SnapshotWorker(QThread):
+    """Decrypt the local connection snapshot in the background."""
+
+    finished = pyqtSignal(object, object, object)
+
+    def __init__(self, password: str, email: str, server: str | None, path):
         super().__init__()
-        self.email = email
         self.password = password
+        self.email = email
         self.server = server
+        self.path = path
 
     def run(self) -> None:
-        success = bitwarden.login(self.email, self.password, self.server)
-        err = bitwarden.get_last_error() or ""
-        self.finished.emit(success, err)
+        cfg, revision, key = snapshot.load(self.password, self.email, self.server, self.path)
+        self.finished.emit(cfg, revision, key)
 
 
-class DataWorker(QThread):
-    """Load connections and avatar in the background."""
+class KeyringWorker(QThread):
+    """Store values in the system keyring without blocking the GUI."""
+
+    finished = pyqtSignal()
+
+    def __init__(self, values: dict[str, str]):
+        super().__init__()
+        self.values = values
+
+    def run(self) -> None:
+        import keyring
+        from keyring.errors import KeyringError
+
+        for name, value in self.values.items():
+            try:
+                keyring.set_password("sshmanager", name, value)
+            except KeyringError as exc:
+                logging.error("Failed to store %s in the keyring: %s", name, exc)
+        self.finished.emit()
+
+
+class ControlCheckWorker(QThread):
+    """Check the shared ssh masters without blocking the GUI."""
+
+    finished = pyqtSignal(int)
+
+    def __init__(self, pool: ssh.ControlPool):
+        super().__init__()
+        self.pool = pool
+
+    def run(self) -> None:
+        self.finished.emit(self.pool.prune())
+
+
+class ProbeWorker(QThread):
+    """Probe connection hosts on an asyncio loop of its own."""
+
+    finished = pyqtSignal(object)
 
-    finished = pyqtSignal(object, object)
+    def __init__(self, targets: list[probe.Target]):
+        super().__init__()
+        self.targets = targets
+        self._stop = threading.Event()
+
+    def cancel(self) -> None:
+        """Abandon the probes that have not finished."""
+        self._stop.set()
+
+    def run(self) -> None:
+        self.finished.emit(probe.run(self.targets, self._stop))
+
+
+class ResolveWorker(QThread):
+    """Resolve connection host names ahead of the first connect."""
+
+    finished = pyqtSignal(int)
+
+    def __init__(self, hosts: list[str]):
+        super().__init__()
+        self.hosts = hosts
 
     def run(self) -> None:
-        cfg = load_config()
-        avatar = bitwarden.fetch_avatar()
-        self.finished.emit(cfg, avatar)
+        workers = settings.get_int("dns_workers", 16)
+        self.finished.emit(resolver.default_resolver.resolve_all(self.hosts, workers))
+
+
+class Account:
+    """One logged in vault with its own client, connections and sync schedule.
+
+    Every account loads in its own worker threads, so several vaults are
+    fetched concurrently.
+    """
+
+    def __init__(self, email: str, server: str | None, parent=None) -> None:
+        self.email = email
+        self.server = server
+        self.key = self.account_key(email, server)
+        self.client = bitwarden.BitwardenClient()
+        self.config = Config([])
+        self.avatar_data: bytes | None = None
+        # (icon size, device pixel ratio) and the decoded avatar icon
+        self.avatar_icon: tuple[tuple, QIcon | None] | None = None
+        # True while the sidebar shows the decrypted snapshot before the vault
+        # has been loaded
+        self.offline = False
+        self.vault_loaded = False
+        self.snapshot_key: snapshot.SnapshotKey | None = None
+        self.snapshot_revision: str | None = None
+        self.snapshot_path = snapshot.account_path(email, server)
+        self.scheduler = SyncScheduler(self.client, parent)
+        self.workers: set[QThread] = set()
+
+    @staticmethod
+    def account_key(email: str, server: str | None) -> str:
+        return f"{email.strip().lower()}\n{(server or '').rstrip('/')}"
+
+    def title(self) -> str:
+        if self.vault_loaded or self.offline:
+            return self.email
+        return f"{self.email} (loading...)"
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("SSH Manager")
-        self.config: Config = load_config()
-        self.avatar_data: bytes | None = None
+        # Logged in vaults; each one gets its own sidebar root when there are
+        # several
+        self.accounts: list[Account] = []
+        # Connections created in this session that are not stored in a vault
+        self.local_connections: list[Connection] = []
+        # All connections of every account plus the local ones
+        self.config = Config([])
+        self.loading_dlg: LoadingDialog | None = None
+        self._loading_account: Account | None = None
+        # Quick-open index, rebuilt in a worker whenever self.config changes
+        if settings.get_bool("frecency", False):
+            self.frecency = Frecency()
+        else:
+            # Counted for this run only
+            self.frecency = Frecency(None)
+            search.clear()
+        self.search_index: SearchIndex | None = None
+        self._index_worker: IndexWorker | None = None
+        self._index_dirty = False
+        self.quick_open_dlg: QuickOpenDialog | None = None
+        self._keyring_workers: set[QThread] = set()
+        self._logout_workers: set[QThread] = set()
+        # Konsole parts created in idle time for the next tabs
+        self.terminal_pool = TerminalPool(settings.get_int("terminal_pool_size", 2), self)
+        # Notices exited terminals and accounts their resources
+        self.lifecycle = TabLifecycle(self)
+        # Set by the first paint, after which deferred startup work runs
+        self._painted = False
+        self._current_tab: TerminalTab | None = None
+        # Open tabs are saved shortly after they change
+        self._session_timer = QTimer(self)
+        self._session_timer.setSingleShot(True)
+        self._session_timer.timeout.connect(self._save_session)
+        # Background connection tabs idle for this long release their
+        # terminal; 0 disables hibernation
+        self._hibernate_after = settings.get_float("hibernate_after", 0.0) * 60
+        self._hibernate_timer = QTimer(self)
+        self._hibernate_timer.timeout.connect(self._hibernate_idle_tabs)
+        if self._hibernate_after > 0:
+            self._hibernate_timer.start(60_000)
+        # Drops expired or dead ssh masters so new tabs start fresh ones
+        self._control_worker: ControlCheckWorker | None = None
+        self._control_timer = QTimer(self)
+        self._control_timer.timeout.connect(self._check_ssh_masters)
+        check_interval = settings.get_int("ssh_control_check", 60)
+        if ssh.default_pool.enabled and check_interval > 0:
+            self._control_timer.start(check_interval * 1000)
 
         self.splitter = QSplitter(self)
-        self.tree = QTreeWidget(self)
+        # Connection rows are only created for expanded folders
+        self.model = ConnectionModel(self)
+        self.model.folderAdded.connect(self._on_folder_added)
+        self.tree = QTreeView(self)
         self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.model)
+        self.tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        # Reachability of every host, shown as a dot and round-trip time
+        self.probes = probe.ProbeCache()
+        self.model.set_probe_cache(self.probes)
+        self.tree.setItemDelegate(ProbeBadgeDelegate(self.tree))
+        self._probe_worker: ProbeWorker | None = None
+        self._probe_timer = QTimer(self)
+        self._probe_timer.timeout.connect(self._probe_hosts)
+        # Opt-in, since sshd logs every probe as a dropped connection
+        if settings.get_bool("probe", False):
+            self._probe_timer.start(30_000)
+        # Host names are resolved after every load and refreshed as they
+        # expire
+        self._resolve_worker: ResolveWorker | None = None
+        self._resolve_timer = QTimer(self)
+        self._resolve_timer.timeout.connect(self._resolve_hosts)
+        if settings.get_bool("dns_prefetch", True):
+            self._resolve_timer.start(60_000)
         self.tab_widget = QTabWidget(self)
         self.tab_widget.setTabsClosable(True)
         self.tab_widget.setMovable(True)
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+        self.tab_widget.tabBar().tabMoved.connect(self._schedule_session_save)
+        self.tab_widget.tabBar().setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tab_widget.tabBar().customContextMenuRequested.connect(self.show_tab_context_menu)
 
         self.splitter.addWidget(self.tree)
         self.splitter.addWidget(self.tab_widget)
@@ -153,6 +322,10 @@ class MainWindow(QMainWindow):
         container = QWidget()
         layout = QVBoxLayout(container)
         layout.addWidget(self.splitter)
+        # Types into several tabs at once; hidden until used
+        self.broadcast_bar = BroadcastBar(self.tab_widget, container)
+        self.broadcast_bar.hide()
+        layout.addWidget(self.broadcast_bar)
         self.setCentralWidget(container)
 
         toolbar = QToolBar("Main", self)
@@ -183,31 +356,243 @@ class MainWindow(QMainWindow):
         new_tab_shortcut = QShortcut(QKeySequence("Ctrl+T"), self)
         new_tab_shortcut.activated.connect(self.open_shell_tab)
 
+        quick_open_shortcut = QShortcut(QKeySequence("Ctrl+P"), self)
+        quick_open_shortcut.activated.connect(self.show_quick_open)
+
+        broadcast_shortcut = QShortcut(QKeySequence("Ctrl+Shift+B"), self)
+        broadcast_shortcut.activated.connect(self.toggle_broadcast)
+
+        # Opens whole folders a few tabs at a time, with progress in the
+        # status bar
+        self.open_scheduler = OpenScheduler(self._open_in_background, self)
+        self.open_progress = QProgressBar(self)
+        self.open_progress.setMaximumWidth(200)
+        self.open_cancel_btn = QPushButton("Cancel", self)
+        self.open_cancel_btn.clicked.connect(self.open_scheduler.cancel)
+        self.statusBar().addPermanentWidget(self.open_progress)
+        self.statusBar().addPermanentWidget(self.open_cancel_btn)
+        self.open_progress.hide()
+        self.open_cancel_btn.hide()
+        self.open_scheduler.progress.connect(self._on_open_progress)
+        self.open_scheduler.finished.connect(self._on_open_finished)
+
         self.load_connections()
-        self.tree.itemDoubleClicked.connect(self.open_connection)
+        self.tree.doubleClicked.connect(self.open_connection)
         self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.show_context_menu)
-        self.open_shell_tab()
         self.update_ui_state()
+        startup.mark("window created")
+
+    def event(self, event) -> bool:
+        handled = super().event(event)
+        if event.type() == QEvent.Type.Paint and not self._painted:
+            self._painted = True
+            startup.mark("first paint")
+            QTimer.singleShot(0, self._after_first_paint)
+        return handled
+
+    def _after_first_paint(self) -> None:
+        """Start work that is not needed to show the window."""
+        # Loading the Konsole part takes longer than everything else at startup
+        if not self._restore_session():
+            self.open_shell_tab()
+        self.terminal_pool.start()
+
+    def closeEvent(self, event) -> None:
+        self._save_session()
+        self._control_timer.stop()
+        if self._control_worker is not None:
+            self._control_worker.wait()
+        self._probe_timer.stop()
+        if self._probe_worker is not None:
+            self._probe_worker.cancel()
+            self._probe_worker.wait()
+        self._resolve_timer.stop()
+        if self._resolve_worker is not None:
+            self._resolve_worker.wait()
+        # Temporary bw profiles are only removed once logout finished
+        for worker in list(self._logout_workers):
+            worker.wait()
+        ssh.default_pool.close()
+        super().closeEvent(event)
+
+    def _update_config(self) -> None:
+        connections: list[Connection] = []
+        for account in self.accounts:
+            connections.extend(account.config.connections)
+        connections.extend(self.local_connections)
+        self.config = Config(connections)
+        self._rebuild_search_index()
+        self._probe_hosts()
+        self._resolve_hosts()
+        # A restored tab waiting for its vault opens once it is loaded
+        tab = self.tab_widget.currentWidget()
+        if isinstance(tab, TerminalTab) and tab.pending is not None:
+            self._activate_tab(tab)
+
+    def _probe_hosts(self) -> None:
+        """Probe hosts without a fresh result in a worker thread."""
+        if self._probe_worker is not None or not self._probe_timer.isActive():
+            return
+        targets = {t for t in map(probe.target, self.config.connections) if t is not None}
+        self.probes.retain(targets)
+        stale = self.probes.stale(targets)
+        if not stale:
+            return
+        worker = ProbeWorker(stale)
+        self._probe_worker = worker
+
+        def finished(results: dict) -> None:
+            worker.wait()
+            self._probe_worker = None
+            worker.deleteLater()
+            self.probes.update(results)
+            self.model.probes_updated()
+            up = sum(r.ok for r in results.values())
+            logging.debug("Probed %d hosts, %d reachable", len(results), up)
+
+        worker.finished.connect(finished)
+        worker.start()
+
+    def _resolve_hosts(self) -> None:
+        """Resolve host names without a fresh cache entry in a worker thread."""
+        if self._resolve_worker is not None or not self._resolve_timer.isActive():
+            return
+        hosts = {c.host for c in self.config.connections if not c.proxy_jump}
+        resolver.default_resolver.retain(hosts)
+        stale = resolver.default_resolver.stale(hosts)
+        if not stale:
+            return
+        worker = ResolveWorker(stale)
+        self._resolve_worker = worker
+
+        def finished(count: int) -> None:
+            worker.wait()
+            self._resolve_worker = None
+            worker.deleteLater()
+            logging.debug("Resolved %d host names: %s", count, resolver.default_resolver.stats())
+
+        worker.finished.connect(finished)
+        worker.start()
+
+    def _rebuild_search_index(self) -> None:
+        """Index the current connections for quick-open in a worker thread."""
+        if self._index_worker is not None:
+            # Rebuilt again once the running build finishes
+            self._index_dirty = True
+            return
+        self._index_dirty = False
+        self._index_worker = IndexWorker(list(self.config.connections))
+        self._index_worker.finished.connect(self._on_index_built)
+        self._index_worker.start()
+
+    def _on_index_built(self, index: SearchIndex) -> None:
+        self._index_worker.wait()
+        self._index_worker.deleteLater()
+        self._index_worker = None
+        self.search_index = index
+        if self.quick_open_dlg is not None:
+            self.quick_open_dlg.set_index(index)
+        if self._index_dirty:
+            self._rebuild_search_index()
+
+    def show_quick_open(self) -> None:
+        """Open the Ctrl+P palette to search and open any connection."""
+        dlg = QuickOpenDialog(self.search_index, self.frecency, self)
+        dlg.selected.connect(self.open_terminal)
+        self.quick_open_dlg = dlg
+        dlg.exec()
+        self.quick_open_dlg = None
+        dlg.deleteLater()
 
     def load_connections(self):
-        self.tree.clear()
-        folders = {}
-        for conn in self.config.connections:
-            folder_item = folders.get(conn.folder)
-            if folder_item is None:
-                folder_item = QTreeWidgetItem(self.tree, [conn.folder])
-                folders[conn.folder] = folder_item
-            item = QTreeWidgetItem(folder_item, [conn.label])
-            item.setData(0, Qt.ItemDataRole.UserRole, conn)
-        self.tree.expandAll()
+        """Rebuild the sidebar, keeping expanded folders and the selection."""
+        self._update_config()
+        known, expanded, current = self._sidebar_state()
+        show_roots = len(self.accounts) > 1
+        groups = [(a.key, a.title(), a.config.connections) for a in self.accounts]
+        if self.local_connections or not show_roots:
+            groups.append(("", "Local", self.local_connections))
+        self.model.set_groups(groups, show_roots)
+        auto_expand = self._auto_expand()
+        for index in self.model.group_indexes() + self.model.folder_indexes():
+            key = self.model.node_key(index)
+            if key in expanded or (
+                key not in known and (key[0] == "group" or auto_expand)
+            ):
+                self.tree.expand(index)
+        if current is not None:
+            index = self.model.index_for_key(current)
+            if index.isValid():
+                self.tree.setCurrentIndex(index)
+        if len(self.config.connections):
+            startup.mark("sidebar populated")
+
+    def _sidebar_state(self) -> tuple[set, set, tuple | None]:
+        """Return the keys of all and of the expanded sidebar groups and
+        folders, and the key of the current row."""
+        known: set = set()
+        expanded: set = set()
+        for index in self.model.group_indexes() + self.model.folder_indexes():
+            key = self.model.node_key(index)
+            known.add(key)
+            if self.tree.isExpanded(index):
+                expanded.add(key)
+        return known, expanded, self.model.node_key(self.tree.currentIndex())
+
+    def _auto_expand(self) -> bool:
+        """Whether new folders are expanded; large vaults start collapsed."""
+        limit = settings.get_int("sidebar_expand_limit", 500)
+        return len(self.config.connections) <= limit
+
+    def _on_folder_added(self, index: QModelIndex) -> None:
+        if self._auto_expand():
+            self.tree.expand(index)
+
+    def apply_connection_diff(self, account: Account, diff: ConnectionDiff) -> None:
+        """Update only the changed sidebar entries, keeping expansion and selection."""
+        if not self.model.has_group(account.key):
+            self.load_connections()
+            return
+        current = self.model.node_key(self.tree.currentIndex())
+        self.model.apply_diff(account.key, diff)
+        # A connection moved to another folder stays selected
+        if current is not None and self.model.node_key(self.tree.currentIndex()) != current:
+            index = self.model.index_for_key(current)
+            if index.isValid():
+                self.tree.setCurrentIndex(index)
 
+    def _set_account_config(self, account: Account, cfg: Config) -> ConnectionDiff:
+        """Replace the connections of ``account`` and update the sidebar rows."""
+        diff = diff_connections(account.config.connections, cfg.connections)
+        account.config = cfg
+        self._update_config()
+        self.model.set_group_title(account.key, account.title())
+        if diff:
+            self.apply_connection_diff(account, diff)
+        if len(self.config.connections):
+            startup.mark("sidebar populated")
+        return diff
+
+    def _on_background_sync(self, account: Account, cfg: Config) -> None:
+        if account not in self.accounts:
+            return
+        diff = self._set_account_config(account, cfg)
+        if not diff:
+            return
+        self._save_snapshot(account)
+        self.statusBar().showMessage(
+            f"Connections of {account.email} updated: {len(diff.added)} added, "
+            f"{len(diff.removed)} removed, {len(diff.modified)} changed",
+            3000,
+        )
 
     def open_shell_tab(self) -> None:
         """Open a new tab running a local shell."""
-        tab = TerminalTab(None, self)
+        tab = TerminalTab(None, self, self.terminal_pool, start=False, lifecycle=self.lifecycle)
         self.tab_widget.addTab(tab, "Terminal")
         self.tab_widget.setCurrentWidget(tab)
+        self._schedule_session_save()
 
     def create_connection(self) -> None:
         """Open a dialog to create a new connection and add it to the tree."""
@@ -215,15 +600,50 @@ class MainWindow(QMainWindow):
         if dlg.exec() != dlg.Accepted:
             return
         conn = dlg.connection()
-        self.config.connections.append(conn)
-        self.load_connections()
+        self.local_connections.append(conn)
+        if not self.model.has_group(""):
+            # The "Local" root is only shown once it has connections
+            self.load_connections()
+            return
+        self.config.connections.add(conn)
+        self.model.add_connection("", conn)
+        self._rebuild_search_index()
+
+    def open_connection(self, index: QModelIndex):
+        conn = self.model.connection(index)
+        if conn is not None:
+            self.open_terminal(conn)
+
+    def open_terminal(self, conn: Connection) -> None:
+        """Open a terminal tab for ``conn`` and count the use for quick-open."""
+        tab = TerminalTab(conn, self, self.terminal_pool, start=False, lifecycle=self.lifecycle)
+        self.tab_widget.addTab(tab, conn.label)
+        self.tab_widget.setCurrentWidget(tab)
+        self.frecency.record(conn)
+        self._schedule_session_save()
+
+    def open_many(self, connections: list[Connection]) -> None:
+        """Open tabs for ``connections`` a few at a time in the background."""
+        self.open_scheduler.add(connections)
+
+    def _open_in_background(self, conn: Connection) -> TerminalTab:
+        # Not counted for quick-open; a whole folder would swamp the ranking
+        tab = TerminalTab(conn, self, self.terminal_pool, start=False, lifecycle=self.lifecycle)
+        self.tab_widget.addTab(tab, conn.label)
+        tab.start()
+        self._schedule_session_save()
+        return tab
+
+    def _on_open_progress(self, done: int, total: int) -> None:
+        self.open_progress.setRange(0, total)
+        self.open_progress.setValue(done)
+        self.open_progress.setFormat("Opening %v of %m")
+        self.open_progress.show()
+        self.open_cancel_btn.show()
 
-    def open_connection(self, item: QTreeWidgetItem):
-        conn = item.data(0, Qt.ItemDataRole.UserRole)
-        if isinstance(conn, Connection):
-            tab = TerminalTab(conn, self)
-            self.tab_widget.addTab(tab, conn.label)
-            self.tab_widget.setCurrentWidget(tab)
+    def _on_open_finished(self) -> None:
+        self.open_progress.hide()
+        self.open_cancel_btn.hide()
 
     def close_tab(self, index: int) -> None:
         """Close and delete the tab at the given index."""
@@ -231,7 +651,107 @@ class MainWindow(QMainWindow):
         if widget is not None:
             widget.close()
             widget.deleteLater()
+        if widget is self._current_tab:
+            self._current_tab = None
         self.tab_widget.removeTab(index)
+        self._schedule_session_save()
+
+    def _on_tab_changed(self, index: int) -> None:
+        now = time.monotonic()
+        # The tab being left starts its idle time now
+        if self._current_tab is not None:
+            self._current_tab.last_active = now
+        tab = self.tab_widget.widget(index)
+        self._current_tab = tab if isinstance(tab, TerminalTab) else None
+        if self._current_tab is not None:
+            self._current_tab.last_active = now
+            self._activate_tab(self._current_tab)
+        self._schedule_session_save()
+
+    def _activate_tab(self, tab: TerminalTab) -> None:
+        """Start the terminal of a new, restored or hibernated tab."""
+        if tab.running:
+            return
+        if tab.pending is not None:
+            conn = self._resolve_session_entry(tab.pending)
+            if conn is None:
+                tab.show_placeholder(
+                    f"{tab.pending.get('label', 'Connection')}\n"
+                    "Log in to the vault holding this connection to open it."
+                )
+                return
+            tab.start(conn)
+        else:
+            tab.start()
+        if tab.running:
+            startup.mark("first terminal usable")
+
+    def _resolve_session_entry(self, entry: dict) -> Connection | None:
+        if entry["type"] == "vault":
+            return self.config.connections.get(entry.get("item_id"))
+        if entry["type"] == "local":
+            return session.local_connection(entry)
+        return None
+
+    def _restore_session(self) -> bool:
+        """Recreate the saved tabs; only the current one starts a terminal."""
+        if not settings.get_bool("restore_session", False):
+            session.clear()
+            return False
+        entries, current = session.load()
+        if not entries:
+            return False
+        # Adding the first tab would make it current and start it
+        self.tab_widget.blockSignals(True)
+        for entry in entries:
+            tab = TerminalTab(None, self, self.terminal_pool, start=False, lifecycle=self.lifecycle)
+            if entry["type"] != "shell":
+                tab.pending = entry
+            self.tab_widget.addTab(tab, str(entry.get("label") or "Terminal"))
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(False)
+        self._on_tab_changed(current)
+        return True
+
+    def _schedule_session_save(self) -> None:
+        if self._painted:
+            self._session_timer.start(1000)
+
+    def _save_session(self) -> None:
+        self._session_timer.stop()
+        if not settings.get_bool("restore_session", False):
+            return
+        tabs = [self.tab_widget.widget(i) for i in range(self.tab_widget.count())]
+        entries = [t.session_entry() for t in tabs if isinstance(t, TerminalTab)]
+        session.save(entries, max(0, self.tab_widget.currentIndex()))
+
+    def _hibernate_idle_tabs(self) -> None:
+        """Release the terminals of connection tabs that were not shown for
+        longer than ``SSHMANAGER_HIBERNATE_AFTER`` minutes."""
+        deadline = time.monotonic() - self._hibernate_after
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i)
+            if (
+                isinstance(tab, TerminalTab)
+                and tab is not self._current_tab
+                and tab.last_active < deadline
+            ):
+                tab.hibernate()
+
+    def _check_ssh_masters(self) -> None:
+        if self._control_worker is not None:
+            return
+        worker = ControlCheckWorker(ssh.default_pool)
+        self._control_worker = worker
+
+        def finished(alive: int) -> None:
+            worker.wait()
+            self._control_worker = None
+            worker.deleteLater()
+            logging.debug("ssh masters alive: %d (%s)", alive, ssh.default_pool.stats())
+
+        worker.finished.connect(finished)
+        worker.start()
 
     def next_tab(self) -> None:
         """Switch to the next tab."""
@@ -248,91 +768,348 @@ class MainWindow(QMainWindow):
             self.tab_widget.setCurrentIndex(new_index)
 
     def show_context_menu(self, pos: QPoint) -> None:
-        item = self.tree.itemAt(pos)
-        if item is None:
+        index = self.tree.indexAt(pos)
+        if not index.isValid():
             return
-        conn = item.data(0, Qt.ItemDataRole.UserRole)
+        conn = self.model.connection(index)
         menu = QMenu(self)
-        if isinstance(conn, Connection):
+        if conn is not None:
             open_act = QAction("Open", self)
-            open_act.triggered.connect(lambda: self.open_connection(item))
+            open_act.triggered.connect(lambda: self.open_terminal(conn))
             menu.addAction(open_act)
+        selected = []
+        for selected_index in self.tree.selectionModel().selectedIndexes():
+            selected_conn = self.model.connection(selected_index)
+            if selected_conn is not None:
+                selected.append(selected_conn)
+        if conn is not None and len(selected) > 1 and conn in selected:
+            open_sel_act = QAction(f"Open {len(selected)} Selected", self)
+            open_sel_act.triggered.connect(lambda: self.open_many(selected))
+            menu.addAction(open_sel_act)
+        if conn is None:
+            under = self.model.connections_under(index)
+            open_all_act = QAction(f"Open All ({len(under)})", self)
+            open_all_act.setEnabled(bool(under))
+            open_all_act.triggered.connect(lambda: self.open_many(under))
+            menu.addAction(open_all_act)
+        key = self.model.node_key(index)
+        if key is not None and key[0] == "folder":
+            folder_tabs = [
+                t for t in self._terminal_tabs()
+                if t.connection is not None and t.connection.folder == key[2]
+            ]
+            broadcast_act = QAction("Broadcast to Open Tabs", self)
+            broadcast_act.setEnabled(bool(folder_tabs))
+            broadcast_act.triggered.connect(lambda: self.show_broadcast(folder_tabs))
+            menu.addAction(broadcast_act)
+        if menu.isEmpty():
+            return
 
         menu.exec(self.tree.viewport().mapToGlobal(pos))
 
+    def show_tab_context_menu(self, pos: QPoint) -> None:
+        tab_bar = self.tab_widget.tabBar()
+        index = tab_bar.tabAt(pos)
+        menu = QMenu(self)
+        if index >= 0:
+            close_act = QAction("Close Tab", self)
+            close_act.triggered.connect(lambda: self.close_tab(index))
+            menu.addAction(close_act)
+        broadcast_act = QAction("Broadcast Input...", self)
+        broadcast_act.triggered.connect(self.toggle_broadcast)
+        menu.addAction(broadcast_act)
+        usage_act = QAction("Resource Usage...", self)
+        usage_act.triggered.connect(self.show_tab_resources)
+        menu.addAction(usage_act)
+        menu.exec(tab_bar.mapToGlobal(pos))
+
+    def _terminal_tabs(self) -> list[TerminalTab]:
+        tabs = (self.tab_widget.widget(i) for i in range(self.tab_widget.count()))
+        return [t for t in tabs if isinstance(t, TerminalTab)]
+
+    def show_broadcast(self, tabs: list[TerminalTab]) -> None:
+        """Show the broadcast bar typing into ``tabs``."""
+        self.broadcast_bar.set_targets(tabs)
+        self.broadcast_bar.show()
+        self.broadcast_bar.edit.setFocus()
+
+    def toggle_broadcast(self) -> None:
+        if self.broadcast_bar.isVisible():
+            self.broadcast_bar.hide()
+        else:
+            self.show_broadcast(self.broadcast_bar.targets() or self._terminal_tabs())
+
+    def show_tab_resources(self) -> None:
+        """Show memory, open files and uptime of every running tab."""
+        dlg = TabResourcesDialog(self.lifecycle, self)
+        dlg.exec()
+        dlg.deleteLater()
+
+    def _account(self, key: str) -> Account | None:
+        for account in self.accounts:
+            if account.key == key:
+                return account
+        return None
+
+    def _start_worker(self, account: Account, worker: QThread, slot) -> None:
+        """Run ``worker`` for ``account`` and pass its result to ``slot``.
+
+        Results of accounts that were logged out in the meantime are dropped.
+        """
+        account.workers.add(worker)
+
+        def finished(*args) -> None:
+            account.workers.discard(worker)
+            worker.wait()
+            worker.deleteLater()
+            if account in self.accounts:
+                slot(account, *args)
+
+        worker.finished.connect(finished)
+        worker.start()
+
     def login_bitwarden(self) -> None:
-        """Prompt for credentials and reload connections."""
+        """Prompt for credentials and load the account's connections.
+
+        Each login adds an account; accounts load concurrently and are shown
+        as separate sidebar roots.
+        """
         dlg = LoginDialog(self)
         if dlg.exec() != dlg.Accepted:
             return
         email, password, server = dlg.values()
-        self._login_details = (email, server)
-        self.loading_dlg = LoadingDialog("Logging in...", self)
+        existing = self._account(Account.account_key(email, server))
+        if existing is not None:
+            if existing.vault_loaded or existing.workers:
+                QMessageBox.information(
+                    self, "Already Logged In", f"{email} is already logged in."
+                )
+                return
+            # Retry of an account whose login failed while its snapshot was shown
+            self._remove_account(existing)
+        account = Account(email, server, self)
+        account.scheduler.synced.connect(
+            lambda cfg, account=account: self._on_background_sync(account, cfg)
+        )
+        self.accounts.append(account)
+        use_snapshot = dlg.keep_snapshot()
+        self._store_in_keyring({"snapshot": "1" if use_snapshot else ""})
+        if use_snapshot:
+            self._start_worker(
+                account,
+                SnapshotWorker(password, email, server, account.snapshot_path),
+                self._on_snapshot_loaded,
+            )
+        else:
+            snapshot.delete(account.snapshot_path)
+        self._show_loading(account, "Logging in...")
+        self._start_worker(
+            account,
+            LoginWorker(account.client, email, password, server),
+            self._on_login_finished,
+        )
+        self.load_connections()
+        self.update_ui_state()
+
+    def _store_in_keyring(self, values: dict[str, str]) -> None:
+        worker = KeyringWorker(values)
+        self._keyring_workers.add(worker)
+
+        def finished() -> None:
+            worker.wait()
+            self._keyring_workers.discard(worker)
+            worker.deleteLater()
+
+        worker.finished.connect(finished)
+        worker.start()
+
+    def _show_loading(self, account: Account, text: str) -> None:
+        """Show a modal spinner while nothing can be shown in the sidebar.
+
+        Accounts added next to already loaded ones only show a status message
+        so other vaults stay usable while they load.
+        """
+        self._close_loading(account)
+        if account.offline:
+            return
+        if any(a.vault_loaded or a.offline for a in self.accounts if a is not account):
+            self.statusBar().showMessage(f"{account.email}: {text}")
+            return
+        if self.loading_dlg is not None:
+            return
+        self.loading_dlg = LoadingDialog(text, self, cancellable=True)
+        self._loading_account = account
+        # Kills the running bw command so the worker finishes promptly
+        self.loading_dlg.cancelled.connect(account.client.cancel)
         self.loading_dlg.show()
-        self.login_worker = LoginWorker(email, password, server)
-        self.login_worker.finished.connect(self._on_login_finished)
-        self.login_worker.start()
 
-    def _on_login_finished(self, success: bool, err: str) -> None:
-        self.loading_dlg.close()
-        self.login_worker.deleteLater()
+    def _close_loading(self, account: Account) -> None:
+        if self.loading_dlg is not None and self._loading_account is account:
+            self.loading_dlg.cancelled.disconnect()
+            self.loading_dlg.close()
+            self.loading_dlg = None
+            self._loading_account = None
+
+    def _on_snapshot_loaded(
+        self, account: Account, cfg: Config | None, revision, key
+    ) -> None:
+        account.snapshot_key = key
+        account.snapshot_revision = revision
+        if account.vault_loaded:
+            self._save_snapshot(account)
+            return
+        if cfg is None:
+            return
+        account.offline = True
+        self._close_loading(account)
+        self._set_account_config(account, cfg)
+        self.statusBar().showMessage(f"Showing offline copy of {account.email}, syncing...")
+        self.update_ui_state()
+
+    def _save_snapshot(self, account: Account) -> None:
+        """Rewrite the snapshot when the vault changed since it was taken."""
+        if account.snapshot_key is None:
+            return
+        revision = account.client.vault_revision()
+        if revision is not None and revision == account.snapshot_revision:
+            return
+        try:
+            snapshot.save(account.config, revision, account.snapshot_key, account.snapshot_path)
+        except OSError as exc:
+            logging.error("Failed to write snapshot: %s", exc)
+            return
+        account.snapshot_revision = revision
+
+    def _on_login_finished(self, account: Account, success: bool, err: str) -> None:
+        self._close_loading(account)
         if not success:
             QMessageBox.critical(
                 self,
                 "Login Failed",
-                err or "Invalid Bitwarden credentials",
+                f"{account.email}: {err or 'Invalid Bitwarden credentials'}",
             )
+            if account.offline:
+                self.statusBar().showMessage(f"Showing offline copy of {account.email}")
+            else:
+                self._remove_account(account)
             return
-        email, server = getattr(self, "_login_details", ("", ""))
-        keyring.set_password("sshmanager", "email", email)
-        keyring.set_password("sshmanager", "server", server or "")
-        info = bitwarden.user_info()
+        self._store_in_keyring({"email": account.email, "server": account.server or ""})
+        info = account.client.user_info()
         if info:
             name = info.get("name", "")
             email_addr = info.get("email", "")
             print(f"{name} ({email_addr})")
-        self.statusBar().showMessage("Bitwarden login successful", 3000)
-        self.loading_dlg = LoadingDialog("Fetching data...", self)
-        self.loading_dlg.show()
-        self.data_worker = DataWorker()
-        self.data_worker.finished.connect(self._on_data_loaded)
-        self.data_worker.start()
-
-    def _on_data_loaded(self, cfg: Config, avatar: bytes | None) -> None:
-        self.loading_dlg.close()
-        self.data_worker.deleteLater()
-        self.config = cfg
-        self.avatar_data = avatar
+        self.statusBar().showMessage(f"Bitwarden login of {account.email} successful", 3000)
+        self._show_loading(account, "Fetching data...")
+        self._start_worker(account, DataWorker(account.client), self._on_data_loaded)
+        self._start_worker(account, AvatarWorker(account.client), self._on_avatar_loaded)
+
+    def _on_avatar_loaded(self, account: Account, avatar: bytes | None) -> None:
+        account.avatar_data = avatar
+        account.avatar_icon = None
+        self.update_ui_state()
+
+    def _avatar_icon(self, account: Account) -> QIcon | None:
+        """Return the account's avatar scaled for the profile button.
+
+        The decoded icon is cached until the image, the icon size or the
+        screen's pixel ratio changes.
+        """
+        size = self.profile_btn.iconSize()
+        ratio = self.devicePixelRatioF()
+        key = (size.width(), size.height(), ratio)
+        if account.avatar_icon is not None and account.avatar_icon[0] == key:
+            return account.avatar_icon[1]
+        icon = None
+        pix = QPixmap()
+        if account.avatar_data and pix.loadFromData(account.avatar_data):
+            pix = pix.scaled(
+                size * ratio,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+            pix.setDevicePixelRatio(ratio)
+            icon = QIcon(pix)
+        account.avatar_icon = (key, icon)
+        return icon
+
+    def _on_data_loaded(self, account: Account, cfg: Config) -> None:
+        self._close_loading(account)
+        account.vault_loaded = True
+        if account.offline:
+            account.offline = False
+            self.statusBar().showMessage(f"Connections of {account.email} synced", 3000)
+        # Offline rows are updated in place rather than rebuilt
+        self._set_account_config(account, cfg)
+        self._save_snapshot(account)
+        self.update_ui_state()
+        # A vault unlocked from a cached profile is synced right away
+        account.scheduler.start(immediate=account.client.needs_sync())
+
+    def sync_all(self) -> None:
+        """Refresh every account now; the accounts sync concurrently."""
+        for account in self.accounts:
+            account.scheduler.run_now()
+
+    def _remove_account(self, account: Account) -> None:
+        if account not in self.accounts:
+            return
+        account.scheduler.stop()
+        account.scheduler.deleteLater()
+        self._close_loading(account)
+        self.accounts.remove(account)
+        # The rows go away now; the session ends in the background
+        worker = LogoutWorker(account.client)
+        self._logout_workers.add(worker)
+
+        def finished() -> None:
+            self._logout_workers.discard(worker)
+            worker.wait()
+            worker.deleteLater()
+
+        worker.finished.connect(finished)
+        worker.start()
         self.load_connections()
         self.update_ui_state()
 
+    def logout_account(self, account: Account) -> None:
+        """Log out of one vault and remove its connections."""
+        self._remove_account(account)
+        self.statusBar().showMessage(f"Logged out of {account.email}", 3000)
+
     def logout_bitwarden(self) -> None:
-        """Log out of Bitwarden and disable the UI."""
-        bitwarden.logout()
-        self.avatar_data = None
-        self.config = load_config()
-        self.load_connections()
+        """Log out of every vault and disable the UI."""
+        for account in list(self.accounts):
+            self._remove_account(account)
         self.statusBar().showMessage("Logged out", 3000)
-        self.update_ui_state()
 
     def update_ui_state(self) -> None:
         """Enable or disable widgets based on login status."""
-        logged_in = bitwarden.is_unlocked()
-        self.splitter.setEnabled(logged_in)
+        logged_in = any(a.client.is_unlocked() for a in self.accounts)
+        offline = any(a.offline for a in self.accounts)
+        self.splitter.setEnabled(logged_in or offline)
         self.profile_menu.clear()
-        if logged_in:
-            act = QAction("Logout", self)
-            act.triggered.connect(self.logout_bitwarden)
+        if self.accounts:
+            act = QAction("Add Account...", self)
+            act.triggered.connect(self.login_bitwarden)
             self.profile_menu.addAction(act)
-            avatar_data = self.avatar_data
-            if avatar_data:
-                pix = QPixmap()
-                if pix.loadFromData(avatar_data):
-                    self.profile_btn.setIcon(QIcon(pix))
-                else:
-                    self.profile_btn.setIcon(QIcon.fromTheme("user-identity"))
-            else:
-                self.profile_btn.setIcon(QIcon.fromTheme("user-identity"))
+            act = QAction("Sync Now", self)
+            act.triggered.connect(self.sync_all)
+            self.profile_menu.addAction(act)
+            self.profile_menu.addSeparator()
+            for account in self.accounts:
+                act = QAction(f"Logout {account.email}", self)
+                act.triggered.connect(
+                    lambda _=False, account=account: self.logout_account(account)
+                )
+                self.profile_menu.addAction(act)
+            if len(self.accounts) > 1:
+                act = QAction("Logout All", self)
+                act.triggered.connect(self.logout_bitwarden)
+                self.profile_menu.addAction(act)
+            account = next((a for a in self.accounts if a.avatar_data), None)
+            icon = self._avatar_icon(account) if account is not None else None
+            self.profile_btn.setIcon(icon or QIcon.fromTheme("user-identity"))
         else:
             act = QAction("Login", self)
             act.triggered.connect(self.login_bitwarden)
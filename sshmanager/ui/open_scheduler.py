@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .. import settings
+from ..models import Connection
+from .terminal_tab import TerminalTab
+
+
+class OpenScheduler(QObject):
+    """Open many connections without freezing the window.
+
+    One tab is created per timer slice, so the event loop runs in between.
+    At most ``SSHMANAGER_OPEN_CONCURRENCY`` tabs (4 by default) are
+    connecting at a time, and new ssh processes start at least
+    ``SSHMANAGER_OPEN_STAGGER`` milliseconds (250) apart so bastions are not
+    hit by a burst of handshakes. A tab stops counting as connecting when
+    ssh first prints something, when its terminal closes or after
+    ``SSHMANAGER_OPEN_CONNECT_TIMEOUT`` seconds (15).
+    """
+
+    # Tabs opened so far and the number requested
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    def __init__(self, open_tab: Callable[[Connection], TerminalTab], parent=None) -> None:
+        super().__init__(parent)
+        self._open_tab = open_tab
+        self.concurrency = max(1, settings.get_int("open_concurrency", 4))
+        self.stagger = max(0, settings.get_int("open_stagger", 250))
+        self.connect_timeout = settings.get_float("open_connect_timeout", 15.0)
+        self._queue: deque[Connection] = deque()
+        self._connecting: set[TerminalTab] = set()
+        self._last_spawn = 0.0
+        self.done = 0
+        self.total = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._open_next)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._queue)
+
+    def add(self, connections: Iterable[Connection]) -> None:
+        """Queue ``connections``; they open in the given order."""
+        before = len(self._queue)
+        self._queue.extend(connections)
+        self.total += len(self._queue) - before
+        self.progress.emit(self.done, self.total)
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Drop the connections that were not opened yet."""
+        self._queue.clear()
+        self._timer.stop()
+        self._finish()
+
+    def _schedule(self) -> None:
+        if not self._queue or self._timer.isActive():
+            return
+        if len(self._connecting) >= self.concurrency:
+            # A finished connection schedules the next one
+            return
+        wait = self._last_spawn + self.stagger / 1000 - time.monotonic()
+        self._timer.start(max(0, int(wait * 1000)))
+
+    def _open_next(self) -> None:
+        if not self._queue or len(self._connecting) >= self.concurrency:
+            return
+        tab = self._open_tab(self._queue.popleft())
+        self._last_spawn = time.monotonic()
+        self.done += 1
+        if tab.running:
+            self._connecting.add(tab)
+            tab.settled.connect(lambda: self._release(tab))
+            tab.destroyed.connect(lambda: self._release(tab))
+            QTimer.singleShot(int(self.connect_timeout * 1000), lambda: self._release(tab))
+        self.progress.emit(self.done, self.total)
+        if self._queue:
+            self._schedule()
+        else:
+            self._finish()
+
+    def _release(self, tab: TerminalTab) -> None:
+        if tab in self._connecting:
+            self._connecting.discard(tab)
+            self._schedule()
+
+    def _finish(self) -> None:
+        self.done = 0
+        self.total = 0
+        self.finished.emit()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QVBoxLayout,
+)
+
+from ..models import Connection
+from ..search import Frecency, SearchIndex
+
+
+class IndexWorker(QThread):
+    """Build the quick-open search index in the background."""
+
+    finished = pyqtSignal(object)
+
+    def __init__(self, connections: list[Connection]):
+        super().__init__()
+        self.connections = connections
+
+    def run(self) -> None:
+        self.finished.emit(SearchIndex(self.connections))
+
+
+class QuickOpenDialog(QDialog):
+    """Search all connections by label, host, user and folder.
+
+    The results are updated on every keystroke; Enter or a double-click
+    emits ``selected`` with the chosen connection.
+    """
+
+    selected = pyqtSignal(object)
+
+    def __init__(self, index: SearchIndex | None, frecency: Frecency, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Open Connection")
+        self.index = index
+        self.frecency = frecency
+        self.edit = QLineEdit(self)
+        self.edit.setPlaceholderText("Search connections...")
+        self.edit.textChanged.connect(self.update_results)
+        self.edit.installEventFilter(self)
+        self.results = QListWidget(self)
+        self.results.itemActivated.connect(self._activate)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(self.edit)
+        layout.addWidget(self.results)
+        self.resize(520, 360)
+        self.update_results()
+
+    def set_index(self, index: SearchIndex) -> None:
+        """Replace the index, e.g. when it was rebuilt while the dialog is open."""
+        self.index = index
+        self.update_results()
+
+    def update_results(self) -> None:
+        self.results.clear()
+        if self.index is None:
+            self.results.addItem("Indexing connections...")
+            return
+        for conn in self.index.search(self.edit.text(), self.frecency):
+            item = QListWidgetItem(
+                f"{conn.label}  —  {conn.username}@{conn.host}  ({conn.folder})"
+            )
+            item.setData(Qt.ItemDataRole.UserRole, conn)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def eventFilter(self, obj, event) -> bool:
+        # Arrow keys move the selection while the search field keeps focus
+        if obj is self.edit and event.type() == event.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if key == Qt.Key.Key_Down else -1
+                row = self.results.currentRow() + step
+                if 0 <= row < self.results.count():
+                    self.results.setCurrentRow(row)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                item = self.results.currentItem()
+                if item is not None:
+                    self._activate(item)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _activate(self, item: QListWidgetItem) -> None:
+        conn = item.data(Qt.ItemDataRole.UserRole)
+        if isinstance(conn, Connection):
+            self.accept()
+            self.selected.emit(conn)
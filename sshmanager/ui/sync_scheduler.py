@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from .. import settings
+from ..bitwarden import BitwardenClient
+from ..sync import SyncResult, SyncStats, refresh
+
+
+class SyncWorker(QThread):
+    """Run one incremental refresh in the background."""
+
+    finished = pyqtSignal(object)
+
+    def __init__(self, client: BitwardenClient, known_revision: str | None):
+        super().__init__()
+        self.client = client
+        self.known_revision = known_revision
+
+    def run(self) -> None:
+        self.finished.emit(refresh(self.client, self.known_revision))
+
+
+class SyncScheduler(QObject):
+    """Periodically refresh the vault and report changed connection lists.
+
+    The interval is ``SSHMANAGER_SYNC_INTERVAL`` seconds (default 300). After
+    a failure it doubles up to ``SSHMANAGER_SYNC_BACKOFF_MAX`` seconds and is
+    reset by the next successful refresh.
+    """
+
+    synced = pyqtSignal(object)
+
+    def __init__(self, client: BitwardenClient, parent=None) -> None:
+        super().__init__(parent)
+        self.client = client
+        self.interval = max(5.0, settings.get_float("sync_interval", 300.0))
+        self.max_interval = max(
+            self.interval, settings.get_float("sync_backoff_max", 1800.0)
+        )
+        self.stats = SyncStats()
+        self._delay = self.interval
+        self._revision: str | None = None
+        self._worker: SyncWorker | None = None
+        self._running = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.run_now)
+
+    def start(self, immediate: bool = False) -> None:
+        """Start refreshing; with ``immediate`` the first refresh runs right away."""
+        self._running = True
+        self._delay = self.interval
+        self._revision = None
+        self._timer.start(0 if immediate else int(self._delay * 1000))
+
+    def stop(self) -> None:
+        self._running = False
+        self._timer.stop()
+
+    def is_active(self) -> bool:
+        return self._running
+
+    def run_now(self) -> None:
+        """Refresh immediately unless a refresh is already running."""
+        if not self._running or self._worker is not None:
+            return
+        self._timer.stop()
+        self._worker = SyncWorker(self.client, self._revision)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.start()
+
+    def _on_finished(self, result: SyncResult) -> None:
+        self._worker.deleteLater()
+        self._worker = None
+        self.stats.record(result)
+        if result.ok:
+            self._delay = self.interval
+            self._revision = result.remote_revision
+        else:
+            self._delay = min(self._delay * 2, self.max_interval)
+        logging.info(
+            "Background sync: ok=%s skipped=%s %.2fs (syncs=%d skipped=%d failures=%d, next in %.0fs)",
+            result.ok,
+            result.skipped,
+            result.duration,
+            self.stats.syncs,
+            self.stats.skipped,
+            self.stats.failures,
+            self._delay,
+        )
+        if not self._running:
+            return
+        self._timer.start(int(self._delay * 1000))
+        if result.config is not None:
+            self.synced.emit(result.config)
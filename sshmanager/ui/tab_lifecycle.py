@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer
+from PyQt5.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .. import procstat
+
+if TYPE_CHECKING:
+    from .terminal_tab import TerminalTab
+
+
+class TabUsage(NamedTuple):
+    tab: "TerminalTab"
+    pid: Optional[int]
+    usage: procstat.Usage
+    uptime: float
+
+
+class _Watch:
+    __slots__ = ("pid", "started", "fd", "notifier")
+
+    def __init__(self, pid: Optional[int]) -> None:
+        self.pid = pid
+        self.started = time.monotonic()
+        # pidfd of the terminal's program, readable once it exited
+        self.fd: Optional[int] = None
+        self.notifier: Optional[QSocketNotifier] = None
+
+    def close(self) -> None:
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class TabLifecycle(QObject):
+    """Watch the terminals of all tabs from one place.
+
+    A Konsole part deletes itself when its shell exits, so the widget's
+    ``destroyed`` signal reports both exits and crashes as they happen and
+    no tab has to poll. konsolepart has no signal for the exit of its
+    program, so on Linux the program is also watched through a pidfd; the
+    tab is told as soon as the process ends even if its part stays alive.
+    Resource usage of a tab is read from ``/proc`` for
+    its shell and everything the shell started, only when asked for.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._watches: dict[TerminalTab, _Watch] = {}
+
+    def register(self, tab: TerminalTab, widget: QWidget) -> None:
+        from ..util.konsole_embed import terminal_pid
+
+        watch = _Watch(terminal_pid(widget))
+        old = self._watches.get(tab)
+        if old is not None:
+            old.close()
+        self._watches[tab] = watch
+        widget.destroyed.connect(lambda *_: self._on_destroyed(tab, watch))
+        if watch.pid and hasattr(os, "pidfd_open"):
+            try:
+                watch.fd = os.pidfd_open(watch.pid)
+            except OSError as exc:
+                logging.debug("Cannot watch process %d: %s", watch.pid, exc)
+                return
+            watch.notifier = QSocketNotifier(watch.fd, QSocketNotifier.Type.Read, self)
+            watch.notifier.activated.connect(lambda *_: self._check_exited(tab, watch))
+
+    def unregister(self, tab: TerminalTab) -> None:
+        """Stop watching ``tab``, e.g. before it releases its terminal."""
+        watch = self._watches.pop(tab, None)
+        if watch is not None:
+            watch.close()
+
+    def _on_destroyed(self, tab: TerminalTab, watch: _Watch) -> None:
+        # The terminal is also destroyed along with its tab; that is only
+        # known once the tab's deletion has finished
+        QTimer.singleShot(0, lambda: self._check_exited(tab, watch))
+
+    def _check_exited(self, tab: TerminalTab, watch: _Watch) -> None:
+        # A later watch of the same tab replaced this one
+        if self._watches.get(tab) is not watch:
+            return
+        del self._watches[tab]
+        watch.close()
+        if not sip.isdeleted(tab):
+            tab.terminal_exited()
+
+    def usage(self) -> list[TabUsage]:
+        """Return the usage of every running tab, largest memory first."""
+        now = time.monotonic()
+        result = [
+            TabUsage(
+                tab,
+                watch.pid,
+                procstat.tree_usage(watch.pid) if watch.pid else procstat.Usage(0, 0, 0),
+                now - watch.started,
+            )
+            for tab, watch in self._watches.items()
+        ]
+        result.sort(key=lambda u: u.usage.rss_kib, reverse=True)
+        return result
+
+    def dump(self) -> str:
+        """Return a plain-text table of :meth:`usage`."""
+        lines = [f"{'tab':<40} {'pid':>7} {'RSS MiB':>8} {'fds':>5} {'procs':>5} {'uptime s':>9}"]
+        for item in self.usage():
+            lines.append(
+                f"{item.tab.describe():<40} {item.pid or '-':>7} "
+                f"{item.usage.rss_kib / 1024:8.1f} {item.usage.fds:5d} "
+                f"{item.usage.processes:5d} {item.uptime:9.0f}"
+            )
+        return "\n".join(lines)
+
+
+class TabResourcesDialog(QDialog):
+    """Table of the running tabs, refreshed every two seconds."""
+
+    COLUMNS = ("Tab", "PID", "RSS MiB", "Open files", "Processes", "Uptime")
+
+    def __init__(self, lifecycle: TabLifecycle, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Tab Resource Usage")
+        self.lifecycle = lifecycle
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttons.rejected.connect(self.reject)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addWidget(buttons)
+        self.resize(640, 360)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(2000)
+        self.refresh()
+
+    def refresh(self) -> None:
+        rows = self.lifecycle.usage()
+        self.table.setRowCount(len(rows))
+        for row, item in enumerate(rows):
+            minutes, seconds = divmod(int(item.uptime), 60)
+            values = (
+                item.tab.describe(),
+                str(item.pid or "-"),
+                f"{item.usage.rss_kib / 1024:.1f}",
+                str(item.usage.fds),
+                str(item.usage.processes),
+                f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}",
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
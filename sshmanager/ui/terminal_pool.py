@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QWidget
+
+
+class TerminalPool(QObject):
+    """Konsole parts created ahead of time so new tabs open instantly.
+
+    Instantiating the Konsole plugin is the slowest part of opening a tab.
+    The pool keeps up to ``size`` parts that run no program yet. It creates
+    one part at a time after ``REFILL_DELAY`` ms, so refilling does not
+    compete with the tab that was just opened. A tab that finds the pool
+    empty creates its part directly and counts as a miss.
+    """
+
+    REFILL_DELAY = 300
+
+    def __init__(self, size: int, parent=None) -> None:
+        super().__init__(parent)
+        self.size = max(0, size)
+        self._parts: list[QWidget] = []
+        self.hits = 0
+        self.misses = 0
+        # Milliseconds from tab creation to its first paint, latest tabs
+        self.ready_times: deque[float] = deque(maxlen=100)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._refill)
+        self._available = True
+
+    def start(self) -> None:
+        """Begin filling the pool."""
+        if self.size and self._available:
+            self._timer.start(self.REFILL_DELAY)
+
+    def acquire(self) -> tuple[QWidget | None, bool]:
+        """Return an unparented part without a program and whether it came
+        from the pool.
+
+        The part is ``None`` when the installed helper library cannot create
+        parts; the caller then creates its terminal the old way.
+        """
+        from ..util.konsole_embed import create_part
+
+        hit = bool(self._parts)
+        if hit:
+            self.hits += 1
+            part = self._parts.pop()
+        else:
+            self.misses += 1
+            part = create_part()
+            if part is None:
+                self._available = False
+        self.start()
+        return part, hit
+
+    def record_ready(self, ms: float) -> None:
+        self.ready_times.append(ms)
+
+    def stats(self) -> dict:
+        """Return hit and miss counts and the median time to first paint."""
+        times = sorted(self.ready_times)
+        return {
+            "size": self.size,
+            "idle": len(self._parts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "median_ready_ms": times[len(times) // 2] if times else None,
+        }
+
+    def _refill(self) -> None:
+        from ..util.konsole_embed import create_part
+
+        if len(self._parts) >= self.size:
+            return
+        part = create_part()
+        if part is None:
+            logging.error("Terminal pool disabled: could not create a Konsole part")
+            self._available = False
+            return
+        self._parts.append(part)
+        if len(self._parts) < self.size:
+            self._timer.start(self.REFILL_DELAY)
+
+    def clear(self) -> None:
+        """Delete the idle parts."""
+        self._timer.stop()
+        for part in self._parts:
+            part.deleteLater()
+        self._parts = []
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import logging
+import os
+import shlex
+import time
+
+from PyQt5.QtCore import QEvent, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from .. import resolver, session, settings, ssh
+from ..models import Connection
+from .tab_lifecycle import TabLifecycle
+from .terminal_pool import TerminalPool
+
+
+# Runs ssh with its arguments; waits for Enter before the terminal closes
+# when ssh itself failed. Other statuses are those of the remote shell or
+# command, e.g. after "exit 1", and close the terminal like a logout.
+_SSH_WRAPPER = (
+    '"$@"; status=$?; '
+    'if [ "$status" -eq 255 ]; then '
+    'printf "\\n[ssh failed, press Enter to close] "; read -r _; fi; '
+    'exit "$status"'
+)
+
+
+# Time the session gets before the initial command is typed into it
+INITIAL_CMD_DELAY_MS = 1000
+
+
+class TerminalTab(QWidget):
+    """Embeds KDE Konsole for an SSH connection or local shell.
+
+    Connection tabs run ``ssh`` directly in the terminal. The initial
+    command is typed into the session once it had time to start, like a
+    user would, or passed as the remote command when
+    ``SSHMANAGER_INITIAL_CMD_REMOTE`` is set.
+
+    The Konsole part is created by :meth:`start`. Tabs restored from the
+    session stay placeholders until they are first shown, and
+    :meth:`hibernate` releases the part of an idle tab until it is shown
+    again.
+    """
+
+    # ssh printed its first output, or the terminal closed
+    settled = pyqtSignal()
+
+    def __init__(
+        self,
+        connection: Connection | None = None,
+        parent=None,
+        pool: TerminalPool | None = None,
+        start: bool = True,
+        lifecycle: TabLifecycle | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._conn = connection
+        self._term_widget = None
+        self._pool = pool
+        self._lifecycle = lifecycle
+        self._pool_hit = False
+        self._created = 0.0
+        self._ready = False
+        # Started by the first output of ssh, to time connecting
+        self._usable = False
+        self._output_timer = QTimer(self)
+        self._output_timer.setSingleShot(True)
+        self._output_timer.setInterval(0)
+        self._output_timer.timeout.connect(self._on_output)
+        # Types the initial command into the started session
+        self._initial_cmd_timer = QTimer(self)
+        self._initial_cmd_timer.setSingleShot(True)
+        self._initial_cmd_timer.setInterval(INITIAL_CMD_DELAY_MS)
+        self._initial_cmd_timer.timeout.connect(self._type_initial_cmd)
+        # Session entry of a restored tab whose connection is not resolved yet
+        self.pending: dict | None = None
+        self.hibernated = False
+        # When the tab was last current, for the hibernation policy
+        self.last_active = time.monotonic()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.container = QLabel(self)
+        self.container.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.container)
+        if start:
+            self.start()
+
+    @property
+    def connection(self) -> Connection | None:
+        return self._conn
+
+    @property
+    def running(self) -> bool:
+        return self._term_widget is not None
+
+    @property
+    def terminal(self) -> QWidget | None:
+        """The Konsole widget while the terminal runs."""
+        return self._term_widget
+
+    def session_entry(self) -> dict:
+        if self.pending is not None:
+            return self.pending
+        return session.entry(self._conn)
+
+    def _set_container(self, widget: QWidget) -> None:
+        layout = self.layout()
+        layout.removeWidget(self.container)
+        # Deleting an embed container deletes the Konsole part and its shell
+        self.container.deleteLater()
+        self.container = widget
+        layout.addWidget(widget)
+
+    def show_placeholder(self, text: str) -> None:
+        label = QLabel(text, self)
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._set_container(label)
+
+    def start(self, connection: Connection | None = None) -> None:
+        """Create the Konsole part and run the shell or ssh in it."""
+        if self.running:
+            return
+        if connection is not None:
+            self._conn = connection
+        connection = self._conn
+        self.pending = None
+        self.hibernated = False
+        self._created = time.perf_counter()
+        self._ready = False
+
+        from ..util.konsole_embed import (
+            create_part,
+            create_shell_widget,
+            get_last_error,
+            send_input,
+            start_program,
+            watch_output,
+        )
+
+        # Use a dedicated container so the helper library can set up its own
+        # layout without touching this widget's layout. This avoids duplicate
+        # layout warnings when opening terminal tabs.
+        embed_container = QWidget(self)
+        widget = None
+        if self._pool is not None:
+            widget, self._pool_hit = self._pool.acquire()
+        if widget is not None:
+            embed_layout = QVBoxLayout(embed_container)
+            embed_layout.setContentsMargins(0, 0, 0, 0)
+            embed_layout.addWidget(widget)
+        elif connection is not None:
+            widget = create_part(parent=embed_container)
+        # Libraries without createKonsolePart only run a shell, and ssh is
+        # typed into it
+        typed = widget is None
+        if typed:
+            widget = create_shell_widget(parent=embed_container)
+        else:
+            start_program(widget, *self._program())
+
+        if widget is None:
+            error_msg = get_last_error() or "Failed to load Konsole"
+            logging.error(
+                "Failed to create Konsole widget%s: %s",
+                f" for {connection.username}@{connection.host}" if connection else "",
+                error_msg,
+            )
+            embed_container.deleteLater()
+            self.show_placeholder(error_msg)
+            return
+        self._set_container(embed_container)
+        self._term_widget = widget
+        if connection is not None:
+            if typed:
+                send_input(widget, f"clear && {shlex.join(self._ssh_args())}")
+            self._usable = False
+            watch_output(widget, self._output_timer)
+            if connection.initial_cmd and not self._remote_initial_cmd():
+                # Not on the first output, which may be a password prompt
+                self._initial_cmd_timer.start()
+        if self._lifecycle is not None:
+            self._lifecycle.register(self, widget)
+
+    @staticmethod
+    def _remote_initial_cmd() -> bool:
+        return settings.get_bool("initial_cmd_remote", False)
+
+    def _ssh_args(self) -> list[str]:
+        conn = self._conn
+        return ssh.build_ssh_args(
+            conn,
+            ssh.default_pool,
+            ssh.interactive_command(conn) if self._remote_initial_cmd() else None,
+            resolver.ssh_address(conn),
+        )
+
+    def _type_initial_cmd(self) -> None:
+        if not self.running or self._conn is None or not self._conn.initial_cmd:
+            return
+        from ..util.konsole_embed import send_input
+
+        send_input(self._term_widget, self._conn.initial_cmd)
+
+    def _program(self) -> tuple[str, list[str]]:
+        """Return the program and arguments that run in the terminal."""
+        if self._conn is None:
+            return os.environ.get("SHELL") or "bash", []
+        args = self._ssh_args()
+        # The terminal closes with its program; keep the message of a failed
+        # connection readable until Enter is pressed
+        return "/bin/sh", ["-c", _SSH_WRAPPER, "sshmanager", *args]
+
+    def _on_output(self) -> None:
+        if self._usable or not self.running:
+            return
+        self._usable = True
+        from ..util.konsole_embed import watch_output
+
+        # Konsole would keep reporting activity, and may notify about it
+        watch_output(self._term_widget, None)
+        ms = (time.perf_counter() - self._created) * 1000
+        logging.info("Connection %s answered %.0f ms after opening", self.describe(), ms)
+        self.settled.emit()
+
+    def hibernate(self) -> bool:
+        """Release the Konsole part of a connection tab.
+
+        The ssh session ends; showing the tab again reconnects. Local shell
+        tabs are never hibernated since their state cannot be restored.
+        """
+        if not self.running or self._conn is None:
+            return False
+        if self._lifecycle is not None:
+            self._lifecycle.unregister(self)
+        self._initial_cmd_timer.stop()
+        self._term_widget = None
+        self.hibernated = True
+        self.show_placeholder(
+            f"{self._conn.label} was closed while idle.\nSelect the tab to reconnect."
+        )
+        logging.info("Hibernated terminal %s", self.describe())
+        return True
+
+    def event(self, event) -> bool:
+        handled = super().event(event)
+        if event.type() == QEvent.Type.Paint and not self._ready and self.running:
+            self._ready = True
+            ms = (time.perf_counter() - self._created) * 1000
+            source = "no pool" if self._pool is None else ("pool hit" if self._pool_hit else "pool miss")
+            logging.info("Terminal %s ready in %.0f ms (%s)", self.describe(), ms, source)
+            if self._pool is not None:
+                self._pool.record_ready(ms)
+        return handled
+
+    def describe(self) -> str:
+        if self._conn is None:
+            return "shell"
+        return f"{self._conn.username}@{self._conn.host}"
+
+    def terminal_exited(self) -> None:
+        """Show that the Konsole part is gone; called by the lifecycle manager."""
+        self._initial_cmd_timer.stop()
+        self._term_widget = None
+        if self._conn is None:
+            logging.error("Konsole widget closed unexpectedly for %s", self.describe())
+            self.show_placeholder("Konsole closed unexpectedly")
+            return
+        # ssh runs without a shell around it, so logging out closes the part
+        logging.info("Connection %s closed", self.describe())
+        self.show_placeholder(f"{self._conn.label} was closed.\nClick to reconnect.")
+        self.settled.emit()
+
+    def mousePressEvent(self, event) -> None:
+        if self._conn is not None and not self.running and self.pending is None:
+            self.start()
+            return
+        super().mousePressEvent(event)
+
+    def closeEvent(self, event) -> None:
+        if self._lifecycle is not None:
+            self._lifecycle.unregister(self)
+        super().closeEvent(event)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from ctypes import CDLL, c_void_p, c_char_p, c_int
+from ctypes import CDLL, POINTER, c_void_p, c_char_p, c_int
+import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QWidget
 from PyQt5 import sip
 
@@ -11,11 +13,17 @@ from PyQt5 import sip
 _lib: Optional[CDLL] = None
 # Store the last error so the UI can display a helpful message
 _last_error: Optional[str] = None
+# False when the library was built before createKonsolePart existed
+_has_parts = False
+# False when the library cannot report terminal output
+_has_activity = False
+# False when the library can only send input to one widget per call
+_has_broadcast = False
 
 
 def _load_lib() -> Optional[CDLL]:
     """Load the helper library, printing errors when it fails."""
-    global _lib, _last_error
+    global _lib, _last_error, _has_parts, _has_activity, _has_broadcast
     if _lib is None:
         lib_path = Path(__file__).resolve().parent.parent / "libkonsole_embed.so"
         try:
@@ -40,6 +48,28 @@ def _load_lib() -> Optional[CDLL]:
         _lib.createKonsoleShellWidget.restype = c_void_p
         _lib.sendInputToWidget.argtypes = [c_void_p, c_char_p]
         _lib.sendInputToWidget.restype = None
+        try:
+            _lib.createKonsolePart.argtypes = [c_void_p]
+            _lib.createKonsolePart.restype = c_void_p
+            _lib.startProgramInWidget.argtypes = [c_void_p, c_char_p, POINTER(c_char_p)]
+            _lib.startProgramInWidget.restype = c_int
+            _lib.terminalProcessIdOfWidget.argtypes = [c_void_p]
+            _lib.terminalProcessIdOfWidget.restype = c_int
+            _has_parts = True
+        except AttributeError:
+            logging.error("libkonsole_embed.so is outdated; run setup.sh to enable pre-created terminals")
+        try:
+            _lib.watchActivityOfWidget.argtypes = [c_void_p, c_void_p]
+            _lib.watchActivityOfWidget.restype = c_int
+            _has_activity = True
+        except AttributeError:
+            logging.error("libkonsole_embed.so is outdated; run setup.sh to time connections")
+        try:
+            _lib.sendInputToWidgets.argtypes = [POINTER(c_void_p), c_int, c_char_p, c_int]
+            _lib.sendInputToWidgets.restype = c_int
+            _has_broadcast = True
+        except AttributeError:
+            logging.error("libkonsole_embed.so is outdated; run setup.sh for faster broadcast input")
     return _lib
 
 
@@ -93,6 +123,57 @@ def create_shell_widget(
     return sip.wrapinstance(ptr, QWidget)
 
 
+def create_part(parent: Optional[QWidget] = None) -> Optional[QWidget]:
+    """Create a Konsole widget that does not run a program yet.
+
+    Start one with :func:`start_program`. Without ``parent`` the widget is a
+    hidden top-level widget meant to be added to a layout later.
+    """
+    global _last_error
+    lib = _load_lib()
+    if lib is None or not _has_parts:
+        return None
+    parent_ptr = sip.unwrapinstance(parent) if parent else None
+    ptr = lib.createKonsolePart(parent_ptr)
+    if not ptr:
+        _last_error = (
+            "Could not start Konsole. Ensure the 'konsole' and 'konsole-kpart' packages are installed."
+        )
+        return None
+    return sip.wrapinstance(ptr, QWidget)
+
+
+def start_program(widget: QWidget, program: str, args: Sequence[str] = ()) -> bool:
+    """Run ``program`` in a widget created by :func:`create_part`."""
+    lib = _load_lib()
+    if lib is None or not _has_parts:
+        return False
+    argv = (c_char_p * (len(args) + 1))(*[a.encode() for a in args], None)
+    return bool(lib.startProgramInWidget(sip.unwrapinstance(widget), program.encode(), argv))
+
+
+def terminal_pid(widget: QWidget) -> Optional[int]:
+    """Return the PID of the shell or program running in ``widget``."""
+    lib = _load_lib()
+    if lib is None or not _has_parts:
+        return None
+    return lib.terminalProcessIdOfWidget(sip.unwrapinstance(widget)) or None
+
+
+def watch_output(widget: QWidget, timer: Optional[QTimer]) -> bool:
+    """Start ``timer`` when the program in ``widget`` prints output.
+
+    Konsole reports output after a quiet period, so a single-shot timer
+    with a zero interval fires once the remote side first answers. Passing
+    ``None`` stops watching.
+    """
+    lib = _load_lib()
+    if lib is None or not _has_activity:
+        return False
+    timer_ptr = sip.unwrapinstance(timer) if timer is not None else None
+    return bool(lib.watchActivityOfWidget(sip.unwrapinstance(widget), timer_ptr))
+
+
 def send_input(widget: QWidget, command: str) -> None:
     """Send a command to the given Konsole widget."""
     lib = _load_lib()
@@ -102,6 +183,25 @@ def send_input(widget: QWidget, command: str) -> None:
     lib.sendInputToWidget(widget_ptr, command.encode())
 
 
+def send_input_many(widgets: Sequence[QWidget], text: str, newline: bool = True) -> int:
+    """Send ``text`` to all ``widgets`` and return how many received it.
+
+    Without ``newline`` the text is sent as typed, e.g. a single key.
+    """
+    lib = _load_lib()
+    if lib is None or not widgets:
+        return 0
+    if not _has_broadcast:
+        # Older libraries always end the input with a newline
+        if not newline:
+            return 0
+        for widget in widgets:
+            send_input(widget, text)
+        return len(widgets)
+    pointers = (c_void_p * len(widgets))(*[sip.unwrapinstance(w) for w in widgets])
+    return lib.sendInputToWidgets(pointers, len(widgets), text.encode(), int(newline))
+
+
 def get_last_error() -> Optional[str]:
     """Return the most recent error from library loading or widget creation."""
     return _last_error
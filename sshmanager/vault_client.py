@@ -0,0 +1,377 @@
+"""In-process Bitwarden/Vaultwarden client.
+
+Talks to the server's HTTP API directly instead of spawning the ``bw`` CLI:
+prelogin, KDF derivation, token exchange and a single ``/api/sync`` fetch.
+Items are decrypted in memory and handed out in the same JSON shape the CLI
+prints, so the rest of the application does not care which backend is used.
+
+Only items owned by the user are decrypted; organisation items require the
+organisation keys and are skipped.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Any, List, Optional
+
+from argon2.low_level import Type, hash_secret_raw
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from .items import ConnectionCache, notes_config
+from .models import Connection
+
+DEFAULT_SERVER = "https://vault.bitwarden.com"
+# Bitwarden device type for a Linux command line client
+DEVICE_TYPE = 25
+CLIENT_ID = "cli"
+REQUEST_TIMEOUT = 30.0
+
+KDF_PBKDF2 = 0
+KDF_ARGON2ID = 1
+
+
+class VaultError(Exception):
+    """Raised when the server rejects a request or data cannot be decrypted."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _field(data: dict[str, Any], name: str, default: Any = None) -> Any:
+    """Return ``name`` from server JSON regardless of key casing."""
+    if name in data:
+        return data[name]
+    pascal = name[:1].upper() + name[1:]
+    if pascal in data:
+        return data[pascal]
+    return default
+
+
+def _hkdf_expand(prk: bytes, info: bytes, length: int = 32) -> bytes:
+    output = b""
+    block = b""
+    counter = 1
+    while len(output) < length:
+        block = hmac.new(prk, block + info + bytes([counter]), hashlib.sha256).digest()
+        output += block
+        counter += 1
+    return output[:length]
+
+
+def derive_master_key(
+    password: str,
+    email: str,
+    kdf: int,
+    iterations: int,
+    memory: int | None = None,
+    parallelism: int | None = None,
+) -> bytes:
+    """Derive the 32 byte master key using the account's KDF settings."""
+    salt = email.strip().lower().encode()
+    if kdf == KDF_PBKDF2:
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, 32)
+    if kdf == KDF_ARGON2ID:
+        return hash_secret_raw(
+            password.encode(),
+            hashlib.sha256(salt).digest(),
+            time_cost=iterations,
+            memory_cost=(memory or 64) * 1024,
+            parallelism=parallelism or 4,
+            hash_len=32,
+            type=Type.ID,
+        )
+    raise VaultError(f"Unsupported KDF type {kdf}")
+
+
+def master_password_hash(master_key: bytes, password: str) -> str:
+    """Return the hash sent to the server instead of the master password."""
+    digest = hashlib.pbkdf2_hmac("sha256", master_key, password.encode(), 1, 32)
+    return base64.b64encode(digest).decode()
+
+
+def stretch_key(master_key: bytes) -> bytes:
+    """Expand the master key into a 64 byte encryption and MAC key."""
+    return _hkdf_expand(master_key, b"enc") + _hkdf_expand(master_key, b"mac")
+
+
+def decrypt(enc: str, key: bytes) -> bytes:
+    """Decrypt a type 2 (AES-256-CBC + HMAC-SHA256) encrypted string."""
+    kind, _, payload = enc.partition(".")
+    if kind != "2":
+        raise VaultError(f"Unsupported encryption type {kind}")
+    try:
+        iv, data, mac = (base64.b64decode(part) for part in payload.split("|"))
+    except ValueError as exc:
+        raise VaultError("Malformed encrypted string") from exc
+    enc_key, mac_key = key[:32], key[32:]
+    expected = hmac.new(mac_key, iv + data, hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, mac):
+        raise VaultError("MAC mismatch")
+    decryptor = Cipher(algorithms.AES(enc_key), modes.CBC(iv)).decryptor()
+    padded = decryptor.update(data) + decryptor.finalize()
+    unpadder = padding.PKCS7(128).unpadder()
+    return unpadder.update(padded) + unpadder.finalize()
+
+
+def _decrypt_str(value: Optional[str], key: bytes) -> Optional[str]:
+    if not value:
+        return None
+    return decrypt(value, key).decode()
+
+
+class VaultClient:
+    """Minimal native client exposing the same operations as the CLI wrapper."""
+
+    def __init__(
+        self,
+        server: str | None = None,
+        device_name: str | None = None,
+        device_identifier: str | None = None,
+    ) -> None:
+        self.server = (server or DEFAULT_SERVER).rstrip("/")
+        if self.server == DEFAULT_SERVER:
+            self._identity_url = "https://identity.bitwarden.com"
+            self._api_url = "https://api.bitwarden.com"
+        else:
+            self._identity_url = self.server + "/identity"
+            self._api_url = self.server + "/api"
+        self.device_name = device_name or "sshmanager"
+        self.device_identifier = device_identifier or str(uuid.uuid4())
+        self.access_token: Optional[str] = None
+        self.profile: dict[str, Any] = {}
+        self.last_error: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._user_key: Optional[bytes] = None
+        self._items: dict[str, dict[str, Any]] = {}
+        self._folders: dict[str, str] = {}
+        self._cache = ConnectionCache()
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        json_body: Any = None,
+        form: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Any:
+        data = None
+        req_headers = {"Accept": "application/json", **(headers or {})}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            req_headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            req_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
+        if self.access_token and url.startswith(self._api_url):
+            req_headers["Authorization"] = f"Bearer {self.access_token}"
+        req = urllib.request.Request(url, data=data, headers=req_headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+                body = resp.read()
+        except urllib.error.HTTPError as exc:
+            detail = exc.read().decode(errors="replace")
+            raise VaultError(self._error_message(exc.code, detail), exc.code) from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise VaultError(f"Cannot reach {url}: {exc}") from exc
+        if not body:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError as exc:
+            # E.g. the error page of a proxy or captive portal
+            raise VaultError(f"Unexpected response from {url}: {body[:200]!r}") from exc
+
+    @staticmethod
+    def _error_message(status: int, body: str) -> str:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return f"HTTP {status}: {body.strip()[:200]}"
+        if _field(data, "twoFactorProviders") or _field(data, "twoFactorProviders2"):
+            return "Two-step login is not supported by the native client"
+        return (
+            _field(data, "error_description")
+            or _field(data, "message")
+            or _field(data, "error")
+            or f"HTTP {status}"
+        )
+
+    def login(self, email: str, password: str) -> bool:
+        """Authenticate and load the vault with a single sync request."""
+        self.last_error = None
+        start = time.perf_counter()
+        try:
+            pre = self._request(
+                "POST", self._identity_url + "/accounts/prelogin", json_body={"email": email}
+            ) or {}
+            master_key = derive_master_key(
+                password,
+                email,
+                _field(pre, "kdf", KDF_PBKDF2),
+                _field(pre, "kdfIterations", 600000),
+                _field(pre, "kdfMemory"),
+                _field(pre, "kdfParallelism"),
+            )
+            token = self._request(
+                "POST",
+                self._identity_url + "/connect/token",
+                form={
+                    "grant_type": "password",
+                    "username": email,
+                    "password": master_password_hash(master_key, password),
+                    "scope": "api offline_access",
+                    "client_id": CLIENT_ID,
+                    "deviceType": DEVICE_TYPE,
+                    "deviceIdentifier": self.device_identifier,
+                    "deviceName": self.device_name,
+                },
+                headers={
+                    "Auth-Email": base64.urlsafe_b64encode(email.encode()).decode().rstrip("=")
+                },
+            )
+            self.access_token = _field(token, "access_token")
+            self._refresh_token = _field(token, "refresh_token")
+            self._user_key = decrypt(_field(token, "key"), stretch_key(master_key))
+            self.sync()
+        except VaultError as exc:
+            self.last_error = str(exc)
+            logging.error("Native vault login failed: %s", exc)
+            self.logout()
+            return False
+        logging.debug("Native vault login took %.3fs", time.perf_counter() - start)
+        return True
+
+    def _refresh(self) -> None:
+        if not self._refresh_token:
+            raise VaultError("Session expired")
+        self.access_token = None
+        token = self._request(
+            "POST",
+            self._identity_url + "/connect/token",
+            form={
+                "grant_type": "refresh_token",
+                "client_id": CLIENT_ID,
+                "refresh_token": self._refresh_token,
+            },
+        )
+        self.access_token = _field(token, "access_token")
+        self._refresh_token = _field(token, "refresh_token", self._refresh_token)
+
+    def _api_get(self, path: str) -> Any:
+        try:
+            return self._request("GET", self._api_url + path)
+        except VaultError as exc:
+            if exc.status != 401:
+                raise
+        self._refresh()
+        return self._request("GET", self._api_url + path)
+
+    def revision_date(self) -> Optional[str]:
+        """Return the server's account revision date without a full sync."""
+        value = self._api_get("/accounts/revision-date")
+        return None if value is None else str(value)
+
+    def sync(self) -> bool:
+        """Fetch the whole vault and decrypt folder names and items."""
+        if self._user_key is None:
+            return False
+        data = self._api_get("/sync?excludeDomains=true") or {}
+        self.profile = _field(data, "profile", {}) or {}
+        folders: dict[str, str] = {}
+        for folder in _field(data, "folders", []) or []:
+            try:
+                folders[_field(folder, "id")] = _decrypt_str(_field(folder, "name"), self._user_key) or ""
+            except VaultError as exc:
+                logging.error("Failed to decrypt folder %s: %s", _field(folder, "id"), exc)
+        items: dict[str, dict[str, Any]] = {}
+        skipped = 0
+        for cipher in _field(data, "ciphers", []) or []:
+            if _field(cipher, "deletedDate") or _field(cipher, "organizationId"):
+                skipped += 1
+                continue
+            try:
+                item = self._decrypt_cipher(cipher)
+            except VaultError as exc:
+                logging.error("Failed to decrypt item %s: %s", _field(cipher, "id"), exc)
+                continue
+            items[item["id"]] = item
+        if skipped:
+            logging.debug("Skipped %d deleted or organisation items", skipped)
+        self._folders = folders
+        self._items = items
+        return True
+
+    def _decrypt_cipher(self, cipher: dict[str, Any]) -> dict[str, Any]:
+        assert self._user_key is not None
+        key = self._user_key
+        cipher_key = _field(cipher, "key")
+        if cipher_key:
+            key = decrypt(cipher_key, key)
+        login = _field(cipher, "login") or {}
+        uris = [
+            {"uri": _decrypt_str(_field(uri, "uri"), key)}
+            for uri in _field(login, "uris") or []
+        ]
+        return {
+            "object": "item",
+            "id": _field(cipher, "id"),
+            "folderId": _field(cipher, "folderId"),
+            "type": _field(cipher, "type"),
+            "name": _decrypt_str(_field(cipher, "name"), key),
+            "notes": _decrypt_str(_field(cipher, "notes"), key),
+            "revisionDate": _field(cipher, "revisionDate"),
+            "login": {
+                "username": _decrypt_str(_field(login, "username"), key),
+                "uris": uris,
+            },
+        }
+
+    def list_items(self, folder_name: str) -> List[dict[str, Any]]:
+        """Return the decrypted items stored in the folder ``folder_name``."""
+        folder_ids = {fid for fid, name in self._folders.items() if name == folder_name}
+        return [item for item in self._items.values() if item.get("folderId") in folder_ids]
+
+    def get_item(self, item: str) -> Optional[dict[str, Any]]:
+        """Return a decrypted item by id or exact name."""
+        found = self._items.get(item)
+        if found is not None:
+            return found
+        for candidate in self._items.values():
+            if candidate.get("name") == item:
+                return candidate
+        return None
+
+    def list_connections(self, folder_name: str = "SSH") -> List[Connection]:
+        return self._cache.connections(self.list_items(folder_name))
+
+    def fetch_credentials(self, item: str) -> Optional[dict[str, Any]]:
+        data = self.get_item(item)
+        return notes_config(data) if data else None
+
+    @property
+    def revision(self) -> Optional[str]:
+        """Revision digest of the last connection listing."""
+        return self._cache.revision
+
+    def logout(self) -> None:
+        """Forget the tokens and all decrypted data."""
+        self.access_token = None
+        self._refresh_token = None
+        self._user_key = None
+        self._items = {}
+        self._folders = {}
+        self._cache.clear()
+        self.profile = {}